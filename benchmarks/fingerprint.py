@@ -0,0 +1,64 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+"""Measures the throughput of ``circuit_fingerprint`` in gates per second.
+
+Usage::
+
+    python benchmarks/fingerprint.py [--gates 300000] [--qubits 20] [--repeat 15]
+        [--target 1000000]
+
+The best throughput over the repeats is compared against the target and the
+script exits with a non-zero status when it is missed. The repeats span a few
+seconds so that the best of them is not taken from a short slowdown of a
+shared machine.
+"""
+import argparse
+import sys
+import time
+
+from qiskit import QuantumCircuit
+
+from qiskit_qir.fingerprint import circuit_fingerprint
+
+DEFAULT_TARGET = 1_000_000
+
+
+def layered_circuit(num_gates: int, num_qubits: int) -> QuantumCircuit:
+    circuit = QuantumCircuit(num_qubits, num_qubits, name="layered")
+    for i in range(num_gates // 3):
+        circuit.h(i % num_qubits)
+        circuit.cx(i % num_qubits, (i + 1) % num_qubits)
+        circuit.rz(0.001 * (i % 1000), (i + 2) % num_qubits)
+    circuit.measure(range(num_qubits), range(num_qubits))
+    return circuit
+
+
+def fingerprint_seconds(circuit: QuantumCircuit) -> float:
+    start = time.perf_counter()
+    circuit_fingerprint(circuit)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--gates", type=int, default=300000)
+    parser.add_argument("--qubits", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--target", type=float, default=DEFAULT_TARGET)
+    args = parser.parse_args()
+
+    circuit = layered_circuit(args.gates, args.qubits)
+    num_gates = len(circuit.data)
+    seconds = min(fingerprint_seconds(circuit) for _ in range(args.repeat))
+    rate = num_gates / seconds
+    print(f"fingerprint: {rate:,.0f} gates/s over {num_gates} gates")
+    if rate < args.target:
+        print(f"below the target of {args.target:,.0f} gates/s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+"""Measures the import time of qiskit_qir with ``python -X importtime``.
+
+Usage::
+
+    python benchmarks/import_time.py [--budget-ms 50]
+        [--translate-budget-ms 2000] [--repeat 5]
+
+The best cumulative times of ``import qiskit_qir`` and of
+``import qiskit_qir.translate``, which loads qiskit and pyqir as the first
+translation does, over the repeats are compared against their budgets and the
+script exits with a non-zero status when either is exceeded. Most of the
+translation import is spent in qiskit and pyqir, so its budget is loose and
+catches regressions such as eagerly importing further heavy dependencies.
+"""
+import argparse
+import subprocess
+import sys
+
+DEFAULT_BUDGET_MS = 50.0
+DEFAULT_TRANSLATE_BUDGET_MS = 2000.0
+
+
+def cumulative_import_ms(statement: str, module: str) -> float:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if name.strip() == module:
+            return int(cumulative) / 1000.0
+    raise RuntimeError(f"{module} was not imported by: {statement}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument(
+        "--translate-budget-ms", type=float, default=DEFAULT_TRANSLATE_BUDGET_MS
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    package_ms = min(
+        cumulative_import_ms("import qiskit_qir", "qiskit_qir")
+        for _ in range(args.repeat)
+    )
+    translate_ms = min(
+        cumulative_import_ms("import qiskit_qir.translate", "qiskit_qir.translate")
+        for _ in range(args.repeat)
+    )
+    print(f"import qiskit_qir:           {package_ms:8.1f} ms")
+    print(f"import qiskit_qir.translate: {translate_ms:8.1f} ms (first translation)")
+    failed = False
+    for name, ms, budget_ms in [
+        ("qiskit_qir", package_ms, args.budget_ms),
+        ("qiskit_qir.translate", translate_ms, args.translate_budget_ms),
+    ]:
+        if ms > budget_ms:
+            print(f"FAILED: import {name} exceeds the budget of {budget_ms} ms")
+            failed = True
+    if failed:
+        return 1
+    print(
+        f"OK: within the budgets of {args.budget_ms} ms and "
+        f"{args.translate_budget_ms} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
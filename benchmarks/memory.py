@@ -0,0 +1,65 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+"""Measures the memory ``to_qir_module`` uses per gate.
+
+Usage::
+
+    python benchmarks/memory.py [--gates 60000] [--qubits 10] [--budget 64]
+
+The peak Python memory traced while a circuit is emitted, in bytes per gate,
+is compared against the budget and the script exits with a non-zero status
+when it is exceeded. The growth of the resident set size, which includes the
+memory held by LLVM but depends on the allocator, is reported for reference
+only.
+"""
+import argparse
+import sys
+
+from qiskit import QuantumCircuit
+
+from qiskit_qir.translate import to_qir_module
+
+DEFAULT_BUDGET = 64.0
+
+
+def layered_circuit(num_gates: int, num_qubits: int) -> QuantumCircuit:
+    circuit = QuantumCircuit(num_qubits, num_qubits, name="layered")
+    for i in range(num_gates // 3):
+        circuit.h(i % num_qubits)
+        circuit.cx(i % num_qubits, (i + 1) % num_qubits)
+        circuit.rz(0.001 * i, (i + 2) % num_qubits)
+    circuit.measure(range(num_qubits), range(num_qubits))
+    return circuit
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--gates", type=int, default=60000)
+    parser.add_argument("--qubits", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET)
+    args = parser.parse_args()
+
+    circuit = layered_circuit(args.gates, args.qubits)
+    num_gates = len(circuit.data)
+    _, _, report = to_qir_module(circuit, memory_profile=True, return_report=True)
+    (usage,) = report.circuit_memory
+    for phase in report.memory + [usage]:
+        rss = "n/a" if phase.rss is None else f"{phase.rss / 2**20:.1f} MiB"
+        print(
+            f"{phase.name:>8}: peak {phase.peak / 2**20:.1f} MiB, "
+            f"retained {phase.retained / 2**20:.1f} MiB, rss {rss}"
+        )
+    per_gate = usage.peak / num_gates
+    print(f"peak: {per_gate:.1f} bytes/gate over {num_gates} gates")
+    if usage.rss is not None:
+        print(f"rss: {usage.rss / num_gates:.1f} bytes/gate (reference only)")
+    if per_gate > args.budget:
+        print(f"above the budget of {args.budget:.1f} bytes/gate")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+"""Measures translation time over a matrix of profiles, ``to_qir_module``
+options and circuit families.
+
+Usage::
+
+    python benchmarks/options.py [--scale 2000] [--repeat 3] [--seed 0]
+        [--json report.json] [--baseline baseline.json]
+
+Every circuit family is translated with every combination of ``profile``,
+``record_output`` and ``emit_barrier_calls``. The report lists the best time
+per gate over the repeats; combinations a profile does not support are
+listed as such. With ``--json`` the report is also written as JSON, and
+with ``--baseline`` every time is compared with the same combination of an
+earlier JSON report.
+"""
+import argparse
+import itertools
+import warnings
+import json
+import platform
+import time
+from typing import Callable, Dict, List, Optional
+
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister, transpile
+from qiskit.circuit.random import random_circuit
+
+import qiskit_qir
+from qiskit_qir.capability import CapabilityError
+from qiskit_qir.translate import to_qir_module
+from qiskit_qir.visitor import SUPPORTED_INSTRUCTIONS
+
+PROFILES = ["BasicExecution", "AdaptiveExecution"]
+OPTIONS = {
+    "record_output": [True, False],
+    "emit_barrier_calls": [False, True],
+}
+
+
+# The families scale up the circuits the tests use as fixtures.
+def ghz(scale: int, seed: int) -> QuantumCircuit:
+    num_qubits = max(2, scale // 2)
+    circuit = QuantumCircuit(num_qubits, num_qubits, name="ghz")
+    circuit.h(0)
+    for qubit in range(1, num_qubits):
+        circuit.cx(qubit - 1, qubit)
+    circuit.measure(range(num_qubits), range(num_qubits))
+    return circuit
+
+
+def basic_gates(scale: int, seed: int) -> QuantumCircuit:
+    circuit = QuantumCircuit(3, 3, name="basic_gates")
+    layer = 0
+    while len(circuit.data) < scale:
+        for gate in ["h", "reset", "s", "sdg", "t", "tdg", "x", "y", "z"]:
+            getattr(circuit, gate)(layer % 3)
+        for gate in ["rx", "ry", "rz"]:
+            getattr(circuit, gate)(0.01 * layer, layer % 3)
+        circuit.cx(0, 1)
+        circuit.cz(1, 2)
+        circuit.swap(2, 0)
+        circuit.ccx(0, 1, 2)
+        circuit.barrier()
+        layer += 1
+    circuit.measure([0, 1, 2], [0, 1, 2])
+    return circuit
+
+
+def c_if(scale: int, seed: int) -> QuantumCircuit:
+    # Repeated teleportation with its register conditions
+    qubits = QuantumRegister(3, name="q")
+    results = ClassicalRegister(2, name="cr")
+    circuit = QuantumCircuit(qubits, results, name="c_if")
+    while len(circuit.data) < scale:
+        circuit.h(1)
+        circuit.cx(1, 2)
+        circuit.cx(0, 1)
+        circuit.h(0)
+        circuit.measure(0, 0)
+        circuit.measure(1, 1)
+        circuit.x(2).c_if(results, 2)
+        circuit.z(2).c_if(results, 1)
+        circuit.barrier()
+    return circuit
+
+
+def random_family(scale: int, seed: int) -> QuantumCircuit:
+    num_qubits = 10
+    circuit = random_circuit(
+        num_qubits, max(1, scale // num_qubits), measure=True, seed=seed
+    )
+    circuit = transpile(
+        circuit, basis_gates=SUPPORTED_INSTRUCTIONS, seed_transpiler=seed
+    )
+    circuit.name = "random"
+    return circuit
+
+
+FAMILIES: Dict[str, Callable[[int, int], QuantumCircuit]] = {
+    "ghz": ghz,
+    "basic_gates": basic_gates,
+    "c_if": c_if,
+    "random": random_family,
+}
+
+
+def translate_seconds(circuit: QuantumCircuit, profile: str, **kwargs) -> float:
+    start = time.perf_counter()
+    to_qir_module(circuit, profile, **kwargs)
+    return time.perf_counter() - start
+
+
+def measure(
+    circuit: QuantumCircuit, profile: str, repeat: int, **kwargs
+) -> Optional[float]:
+    try:
+        return min(translate_seconds(circuit, profile, **kwargs) for _ in range(repeat))
+    except CapabilityError:
+        # The profile does not support the circuit
+        return None
+
+
+def run(scale: int, repeat: int, seed: int) -> List[Dict]:
+    rows = []
+    names = list(OPTIONS)
+    for family, build in FAMILIES.items():
+        circuit = build(scale, seed)
+        num_gates = len(circuit.data)
+        for profile in PROFILES:
+            for values in itertools.product(*OPTIONS.values()):
+                options = dict(zip(names, values))
+                seconds = measure(circuit, profile, repeat, **options)
+                rows.append(
+                    {
+                        "family": family,
+                        "gates": num_gates,
+                        "profile": profile,
+                        **options,
+                        "us_per_gate": (
+                            None if seconds is None else seconds * 1e6 / num_gates
+                        ),
+                    }
+                )
+    return rows
+
+
+def _key(row: Dict):
+    return (row["family"], row["profile"], *(row[option] for option in OPTIONS))
+
+
+def print_report(rows: List[Dict], baseline: Optional[List[Dict]] = None) -> None:
+    columns = ["family", "gates", "profile", *OPTIONS, "us_per_gate"]
+    if baseline is not None:
+        columns.append("vs_baseline")
+        baseline_times = {_key(row): row["us_per_gate"] for row in baseline}
+    header = [f"{column:>18}" for column in columns]
+    print(" ".join(header))
+    for row in rows:
+        cells = []
+        for column in columns:
+            if column == "vs_baseline":
+                before = baseline_times.get(_key(row))
+                after = row["us_per_gate"]
+                value = "-" if not before or after is None else f"{after / before:.2f}x"
+            else:
+                value = row[column]
+            if column == "us_per_gate":
+                value = "unsupported" if value is None else f"{value:.2f}"
+            cells.append(f"{str(value):>18}")
+        print(" ".join(cells))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", default=None)
+    parser.add_argument("--baseline", default=None)
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        # c_if is deprecated in qiskit but still translated
+        warnings.simplefilter("ignore", DeprecationWarning)
+        rows = run(args.scale, args.repeat, args.seed)
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+    print_report(rows, baseline)
+    if args.json_path is not None:
+        report = {
+            "version": qiskit_qir.__version__,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "scale": args.scale,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "results": rows,
+        }
+        with open(args.json_path, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
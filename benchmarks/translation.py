@@ -0,0 +1,63 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+"""Compares the per-gate cost of the fused translation driver with the
+element/visitor dispatch.
+
+Usage::
+
+    python benchmarks/translation.py [--gates 60000] [--qubits 10] [--repeat 3]
+"""
+import argparse
+import time
+
+from pyqir import Context, qir_module
+from qiskit import QuantumCircuit
+
+from qiskit_qir.elements import QiskitModule
+from qiskit_qir.visitor import BasicQisVisitor
+
+
+def layered_circuit(num_gates: int, num_qubits: int) -> QuantumCircuit:
+    circuit = QuantumCircuit(num_qubits, num_qubits, name="layered")
+    for i in range(num_gates // 3):
+        circuit.h(i % num_qubits)
+        circuit.cx(i % num_qubits, (i + 1) % num_qubits)
+        circuit.rz(0.001 * i, (i + 2) % num_qubits)
+    circuit.measure(range(num_qubits), range(num_qubits))
+    return circuit
+
+
+def translate_seconds(circuit: QuantumCircuit, fused: bool) -> float:
+    module = QiskitModule.from_quantum_circuit(
+        circuit, qir_module(Context(), circuit.name)
+    )
+    start = time.perf_counter()
+    if not fused:
+        # Building the elements makes accept dispatch through them
+        _ = module.elements
+    module.accept(BasicQisVisitor())
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--gates", type=int, default=60000)
+    parser.add_argument("--qubits", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    circuit = layered_circuit(args.gates, args.qubits)
+    num_gates = len(circuit.data)
+    results = {}
+    for label, fused in (("element dispatch", False), ("fused", True)):
+        seconds = min(translate_seconds(circuit, fused) for _ in range(args.repeat))
+        results[label] = seconds
+        print(f"{label:>16}: {seconds * 1e6 / num_gates:6.2f} us/gate")
+    speedup = results["element dispatch"] / results["fused"]
+    print(f"{'speedup':>16}: {speedup:6.2f}x over {num_gates} gates")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,4 +6,41 @@ __author__ = """Microsoft Corporation"""
 __email__ = "que-contacts@microsoft.com"
 __version__ = "0.5.0"
 
-from qiskit_qir.translate import to_qir_module
+# Importing qiskit and pyqir dominates start-up time, so the public API is
+# resolved on first access instead of when the package is imported.
+_LAZY_ATTRIBUTES = {
+    "BatchValidationError": "qiskit_qir.preflight",
+    "CircuitIR": "qiskit_qir.ir",
+    "ResourceEstimate": "qiskit_qir.resources",
+    "TranslationReport": "qiskit_qir.translate",
+    "TranslationSession": "qiskit_qir.session",
+    "circuit_fingerprint": "qiskit_qir.fingerprint",
+    "estimate_resources": "qiskit_qir.resources",
+    "to_qir_module": "qiskit_qir.translate",
+    "translate_parallel": "qiskit_qir.parallel",
+    "translate_threaded": "qiskit_qir.parallel",
+    "validate_batch": "qiskit_qir.preflight",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    import importlib
+
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    # Submodules such as qiskit_qir.visitor were reachable as attributes when
+    # the package imported them eagerly.
+    try:
+        return importlib.import_module(f"{__name__}.{name}")
+    except ModuleNotFoundError as error:
+        if error.name != f"{__name__}.{name}":
+            raise
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
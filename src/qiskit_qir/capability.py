@@ -4,10 +4,12 @@
 ##
 from enum import Flag, auto
 import os
-from typing import Dict, List, Union
-from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
-from qiskit.circuit import Qubit, Clbit
-from qiskit.circuit.instruction import Instruction
+from typing import TYPE_CHECKING, Dict, List, Union
+
+if TYPE_CHECKING:
+    from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
+    from qiskit.circuit import Qubit, Clbit
+    from qiskit.circuit.instruction import Instruction
 
 
 class Capability(Flag):
@@ -22,13 +24,13 @@ class CapabilityError(Exception):
 
     def _get_bit_labels(
         self,
-        circuit: QuantumCircuit,
-    ) -> Dict[Union[Qubit, Clbit], str]:
-        register_names: Dict[str, Union[QuantumRegister, ClassicalRegister]] = {}
+        circuit: "QuantumCircuit",
+    ) -> Dict[Union["Qubit", "Clbit"], str]:
+        register_names: Dict[str, Union["QuantumRegister", "ClassicalRegister"]] = {}
         for registers in (circuit.qregs, circuit.cregs):
             for register in registers:
                 register_names[register.name] = register
-        bit_labels: Dict[Union[Qubit, Clbit], str] = {
+        bit_labels: Dict[Union["Qubit", "Clbit"], str] = {
             bit: "%s[%d]" % (name, idx)
             for name, register in register_names.items()
             for (idx, bit) in enumerate(register)
@@ -37,11 +39,13 @@ class CapabilityError(Exception):
 
     def _get_instruction_string(
         self,
-        bit_labels: Dict[Union[Qubit, Clbit], str],
-        instruction: Instruction,
-        qargs: List[Qubit],
-        cargs: List[Clbit],
+        bit_labels: Dict[Union["Qubit", "Clbit"], str],
+        instruction: "Instruction",
+        qargs: List["Qubit"],
+        cargs: List["Clbit"],
     ):
+        from qiskit.circuit import Clbit
+
         gate_params = ",".join(["param(%s)" % bit_labels[c] for c in cargs])
         qubit_params = ",".join(["%s" % bit_labels[q] for q in qargs])
         instruction_name = instruction.name
@@ -51,7 +55,7 @@ class CapabilityError(Exception):
             # - tuple (Clbit, bool)
             # - tuple (Clbit, int)
             if isinstance(instruction.condition[0], Clbit):
-                bit: Clbit = instruction.condition[0]
+                bit: "Clbit" = instruction.condition[0]
                 value: Union[int, bool] = instruction.condition[1]
                 instruction_name = "if(%s[%d] == %s) %s" % (
                     bit._register.name,
@@ -60,7 +64,7 @@ class CapabilityError(Exception):
                     instruction_name,
                 )
             else:
-                register: ClassicalRegister = instruction.condition[0]
+                register: "ClassicalRegister" = instruction.condition[0]
                 value: int = instruction.condition[1]
                 instruction_name = "if(%s == %d) %s" % (
                     register._name,
@@ -77,13 +81,13 @@ class CapabilityError(Exception):
 class ConditionalBranchingOnResultError(CapabilityError):
     def __init__(
         self,
-        circuit: QuantumCircuit,
-        instruction: Instruction,
-        qargs: List[Qubit],
-        cargs: List[Clbit],
+        circuit: "QuantumCircuit",
+        instruction: "Instruction",
+        qargs: List["Qubit"],
+        cargs: List["Clbit"],
         profile: str,
     ):
-        bit_labels: Dict[Union[Qubit, Clbit], str] = self._get_bit_labels(circuit)
+        bit_labels: Dict[Union["Qubit", "Clbit"], str] = self._get_bit_labels(circuit)
         instruction_string = self._get_instruction_string(
             bit_labels, instruction, qargs, cargs
         )
@@ -100,13 +104,13 @@ class ConditionalBranchingOnResultError(CapabilityError):
 class QubitUseAfterMeasurementError(CapabilityError):
     def __init__(
         self,
-        circuit: QuantumCircuit,
-        instruction: Instruction,
-        qargs: List[Qubit],
-        cargs: List[Clbit],
+        circuit: "QuantumCircuit",
+        instruction: "Instruction",
+        qargs: List["Qubit"],
+        cargs: List["Clbit"],
         profile: str,
     ):
-        bit_labels: Dict[Union[Qubit, Clbit], str] = self._get_bit_labels(circuit)
+        bit_labels: Dict[Union["Qubit", "Clbit"], str] = self._get_bit_labels(circuit)
         instruction_string = self._get_instruction_string(
             bit_labels, instruction, qargs, cargs
         )
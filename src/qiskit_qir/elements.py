@@ -2,13 +2,15 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 ##
-from typing import List, Optional, Union
-from pyqir import Module, Context
-from qiskit import ClassicalRegister, QuantumRegister
-from qiskit.circuit.bit import Bit
-from qiskit.circuit.quantumcircuit import QuantumCircuit, Instruction
+from typing import TYPE_CHECKING, List, Optional, Union
 from abc import ABCMeta, abstractmethod
 
+if TYPE_CHECKING:
+    from pyqir import Module
+    from qiskit import ClassicalRegister, QuantumRegister
+    from qiskit.circuit.bit import Bit
+    from qiskit.circuit.quantumcircuit import QuantumCircuit, Instruction
+
 
 class _QuantumCircuitElement(metaclass=ABCMeta):
     @classmethod
@@ -21,16 +23,18 @@ class _QuantumCircuitElement(metaclass=ABCMeta):
 
 
 class _Register(_QuantumCircuitElement):
-    def __init__(self, register: Union[QuantumRegister, ClassicalRegister]):
-        self._register: Union[QuantumRegister, ClassicalRegister] = register
+    def __init__(self, register: Union["QuantumRegister", "ClassicalRegister"]):
+        self._register: Union["QuantumRegister", "ClassicalRegister"] = register
 
     def accept(self, visitor):
         visitor.visit_register(self._register)
 
 
 class _Instruction(_QuantumCircuitElement):
-    def __init__(self, instruction: Instruction, qargs: List[Bit], cargs: List[Bit]):
-        self._instruction: Instruction = instruction
+    def __init__(
+        self, instruction: "Instruction", qargs: List["Bit"], cargs: List["Bit"]
+    ):
+        self._instruction: "Instruction" = instruction
         self._qargs = qargs
         self._cargs = cargs
 
@@ -41,13 +45,13 @@ class _Instruction(_QuantumCircuitElement):
 class QiskitModule:
     def __init__(
         self,
-        circuit: QuantumCircuit,
+        circuit: "QuantumCircuit",
         name: str,
-        module: Module,
+        module: "Module",
         num_qubits: int,
         num_clbits: int,
         reg_sizes: List[int],
-        elements: List[_QuantumCircuitElement],
+        elements: Optional[List[_QuantumCircuitElement]] = None,
     ):
         self._circuit = circuit
         self._name = name
@@ -58,7 +62,7 @@ class QiskitModule:
         self.reg_sizes = reg_sizes
 
     @property
-    def circuit(self) -> QuantumCircuit:
+    def circuit(self) -> "QuantumCircuit":
         return self._circuit
 
     @property
@@ -66,7 +70,7 @@ class QiskitModule:
         return self._name
 
     @property
-    def module(self) -> Module:
+    def module(self) -> "Module":
         return self._module
 
     @property
@@ -77,13 +81,17 @@ class QiskitModule:
     def num_clbits(self) -> int:
         return self._num_clbits
 
-    @classmethod
-    def from_quantum_circuit(
-        cls, circuit: QuantumCircuit, module: Optional[Module] = None
-    ) -> "QiskitModule":
-        """Create a new QiskitModule from a qiskit.QuantumCircuit object."""
+    @property
+    def elements(self) -> List[_QuantumCircuitElement]:
+        if self._elements is None:
+            self._elements = self._elements_from_circuit(self._circuit)
+        return self._elements
+
+    @staticmethod
+    def _elements_from_circuit(
+        circuit: "QuantumCircuit",
+    ) -> List[_QuantumCircuitElement]:
         elements: List[_QuantumCircuitElement] = []
-        reg_sizes = [len(creg) for creg in circuit.cregs]
 
         # Registers
         elements.extend(_Register.from_element_list(circuit.qregs))
@@ -92,22 +100,42 @@ class QiskitModule:
         # Instructions
         for instruction, qargs, cargs in circuit._data:
             elements.append(_Instruction(instruction, qargs, cargs))
+        return elements
+
+    @classmethod
+    def from_quantum_circuit(
+        cls,
+        circuit: "QuantumCircuit",
+        module: Optional["Module"] = None,
+        name: Optional[str] = None,
+    ) -> "QiskitModule":
+        """Create a new QiskitModule from a qiskit.QuantumCircuit object.
+
+        The circuit elements are only created when ``elements`` is accessed,
+        visitors supporting ``visit_circuit_data`` read the circuit directly.
+        ``name`` replaces the circuit name as the name of the entry point.
+        """
+        reg_sizes = [len(creg) for creg in circuit.cregs]
 
         if module is None:
+            from pyqir import Context, Module
+
             module = Module(Context(), circuit.name)
         return cls(
             circuit=circuit,
-            name=circuit.name,
+            name=circuit.name if name is None else name,
             module=module,
             num_qubits=circuit.num_qubits,
             num_clbits=circuit.num_clbits,
             reg_sizes=reg_sizes,
-            elements=elements,
         )
 
     def accept(self, visitor):
         visitor.visit_qiskit_module(self)
-        for element in self._elements:
-            element.accept(visitor)
+        if self._elements is None and hasattr(visitor, "visit_circuit_data"):
+            visitor.visit_circuit_data(self._circuit)
+        else:
+            for element in self.elements:
+                element.accept(visitor)
         visitor.record_output(self)
         visitor.finalize()
@@ -0,0 +1,207 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import hashlib
+from array import array
+from typing import Dict, Optional
+
+import numpy as np
+from qiskit.circuit import Clbit
+from qiskit.circuit.quantumcircuit import QuantumCircuit
+
+from qiskit_qir.lowering import LOWERINGS
+from qiskit_qir.visitor import _QIS_GATES, _QIS_ROTATIONS, _SUPPORTED_INSTRUCTIONS
+
+_EXPANDED_INSTRUCTIONS = frozenset(_SUPPORTED_INSTRUCTIONS) | frozenset(LOWERINGS)
+
+
+def circuit_fingerprint(
+    circuit: QuantumCircuit, decimals: Optional[int] = None, **options
+) -> bytes:
+    r"""Returns a stable 128-bit structural fingerprint of a circuit.
+
+    The fingerprint covers instruction names, qubit and clbit indices,
+    parameters, conditions, the definitions of composite instructions and the
+    register layout, but not the circuit name. Circuits with equal
+    fingerprints translate to the same QIR apart from the entry point name.
+
+    :param circuit:
+        Qiskit circuit to fingerprint
+    :type circuit: ``QuantumCircuit``
+    :param decimals:
+        When set, numeric parameters are rounded to this many decimals first,
+        default `None`
+    :type decimals: ``Optional[int]``
+    :param \**options:
+        Translation options of ``to_qir_module`` to include in the fingerprint
+    :returns: A 16 byte digest.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(
+        repr(
+            (
+                [[circuit.find_bit(bit).index for bit in reg] for reg in circuit.qregs],
+                [[circuit.find_bit(bit).index for bit in reg] for reg in circuit.cregs],
+                sorted(options.items()),
+            )
+        ).encode()
+    )
+    _update(hasher, circuit, decimals)
+    return hasher.digest()
+
+
+class _Frame:
+    # State of a circuit being hashed, kept while the definition of one of its
+    # composite instructions is hashed first.
+    __slots__ = [
+        "circuit",
+        "hasher",
+        "operation",
+        "instructions",
+        "tokens",
+        "canonical",
+        "stream",
+        "angles",
+        "pending",
+    ]
+
+    def __init__(self, circuit: QuantumCircuit, hasher, operation=None):
+        self.circuit = circuit
+        self.hasher = hasher
+        self.operation = operation
+        self.instructions = iter(circuit._data)
+        self.tokens: Dict = {}
+        self.canonical: Dict = {}
+        self.stream = array("q")
+        self.angles = array("d")
+        self.pending = None
+
+
+def _update(hasher, circuit: QuantumCircuit, decimals) -> None:
+    # Definitions are hashed before the circuits using them with an explicit
+    # stack, so the nesting depth is not bound by the recursion limit. The
+    # digest of every composite operation is cached by its id, keeping the
+    # operation alive so that the id cannot be reused during the call.
+    definitions: Dict = {}
+    stack = [_Frame(circuit, hasher)]
+    while stack:
+        frame = stack[-1]
+        operation = _hash_instructions(frame, decimals, definitions)
+        if operation is not None:
+            stack.append(
+                _Frame(operation.definition, hashlib.blake2b(digest_size=16), operation)
+            )
+            continue
+        stack.pop()
+        _finish(frame, decimals)
+        if frame.operation is not None:
+            definitions[id(frame.operation)] = (
+                frame.operation,
+                frame.hasher.hexdigest(),
+            )
+
+
+def _hash_instructions(frame: _Frame, decimals, definitions: Dict):
+    # Instructions are reduced to tokens, numbered in order of first
+    # appearance, plus their numeric parameters. A token stands for a
+    # distinct (name, bits, condition) and its canonical form, with bit
+    # indices instead of bit objects, is only computed once. Returns the
+    # operation whose definition has to be hashed before the instructions
+    # can continue, or None when the circuit is done.
+    circuit = frame.circuit
+    tokens = frame.tokens
+    canonical = frame.canonical
+    push = frame.stream.append
+    angles = frame.angles
+    append = angles.append
+    extend = angles.extend
+    lookup = tokens.get
+    expanded = _EXPANDED_INSTRUCTIONS
+    gates = _QIS_GATES
+    rotations = _QIS_ROTATIONS
+    if frame.pending is not None:
+        key, operation = frame.pending
+        frame.pending = None
+        form = _canonical_form(circuit, key, operation, definitions)
+        push(tokens.setdefault(key, canonical.setdefault(form, len(canonical))))
+    for instruction in frame.instructions:
+        name = instruction.name
+        operation = None
+        # Gates and rotations are emitted from their name, qubits and angle
+        # alone, so their clbits and other parameters are not read.
+        if name in gates:
+            key = (name, instruction.qubits, (), instruction.condition)
+        elif name in rotations:
+            key = (name, instruction.qubits, (), instruction.condition)
+            theta = instruction.params[0]
+            try:
+                append(theta)
+            except TypeError:
+                # Unbound parameters and other non-numeric values
+                key += (str(theta),)
+        else:
+            params = instruction.params
+            key = (name, instruction.qubits, instruction.clbits, instruction.condition)
+            if params:
+                size = len(angles)
+                try:
+                    extend(params)
+                except TypeError:
+                    del angles[size:]
+                    key += tuple(str(param) for param in params)
+            if name not in expanded:
+                # Different composite instructions can share a name
+                operation = instruction.operation
+                key += (id(operation),)
+        token = lookup(key)
+        if token is None:
+            if (
+                operation is not None
+                and id(operation) not in definitions
+                and operation.definition is not None
+            ):
+                frame.pending = (key, operation)
+                return operation
+            form = _canonical_form(circuit, key, operation, definitions)
+            token = tokens[key] = canonical.setdefault(form, len(canonical))
+        push(token)
+    return None
+
+
+def _finish(frame: _Frame, decimals) -> None:
+    hasher = frame.hasher
+    hasher.update(repr(list(frame.canonical)).encode())
+    hasher.update(frame.stream.tobytes())
+    values = np.frombuffer(frame.angles, dtype=np.float64)
+    if decimals is not None:
+        values = np.round(values, decimals)
+    # -0.0 and 0.0 must hash the same
+    hasher.update((values + 0.0).tobytes())
+
+
+def _canonical_form(circuit, key, operation, definitions):
+    name, qubits, clbits, condition = key[:4]
+    extra = key[4:]
+    if condition is not None:
+        bits = [condition[0]] if isinstance(condition[0], Clbit) else condition[0]
+        condition = (
+            tuple(circuit.find_bit(bit).index for bit in bits),
+            int(condition[1]),
+        )
+    definition = None
+    if operation is not None:
+        extra = extra[:-1]
+        cached = definitions.get(id(operation))
+        if cached is None:
+            # Operations without a definition
+            cached = definitions[id(operation)] = (operation, None)
+        definition = cached[1]
+    return (
+        name,
+        tuple(circuit.find_bit(bit).index for bit in qubits),
+        tuple(circuit.find_bit(bit).index for bit in clbits),
+        condition,
+        extra,
+        definition,
+    )
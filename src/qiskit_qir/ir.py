@@ -0,0 +1,533 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+"""Columnar intermediate representation of a circuit.
+
+A ``CircuitIR`` holds a circuit as NumPy columns, one row per emitted
+operation: composite instructions are expanded and gates from the lowering
+table are lowered while the IR is built. Qubits and clbits are numbered in
+register order, as ``BasicQisVisitor`` numbers them.
+
+The IR is a standalone representation for analysing, rewriting and emitting
+single circuits; ``to_qir_module`` and the circuit fingerprint walk the
+circuit data directly and do not build one.
+"""
+import hashlib
+import io
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import numpy as np
+
+from qiskit_qir.capability import Capability, CapabilityError
+from qiskit_qir.lowering import LOWERINGS
+
+if TYPE_CHECKING:
+    from pyqir import Module
+    from qiskit.circuit.quantumcircuit import QuantumCircuit
+
+OPCODES = {
+    "barrier": 0,
+    "ccx": 1,
+    "cx": 2,
+    "cz": 3,
+    "h": 4,
+    "s": 5,
+    "sdg": 6,
+    "swap": 7,
+    "t": 8,
+    "tdg": 9,
+    "x": 10,
+    "y": 11,
+    "z": 12,
+    "rx": 13,
+    "ry": 14,
+    "rz": 15,
+    "mz": 16,
+    "reset": 17,
+    "id": 18,
+}
+NAMES = {opcode: name for name, opcode in OPCODES.items()}
+
+# Widest instruction that gets its own row, barriers are stored without
+# operands.
+MAX_OPERANDS = 3
+
+_MEASUREMENT_INSTRUCTIONS = ["measure", "m", "mz"]
+_ROTATIONS = ["rx", "ry", "rz"]
+# Instructions the builder handles without expanding their definition
+_BUILT_INSTRUCTIONS = (
+    set(OPCODES) | set(LOWERINGS) | {"delay"} | set(_MEASUREMENT_INSTRUCTIONS)
+)
+_INVERSES = {
+    "ccx": "ccx",
+    "cx": "cx",
+    "cz": "cz",
+    "h": "h",
+    "s": "sdg",
+    "sdg": "s",
+    "swap": "swap",
+    "t": "tdg",
+    "tdg": "t",
+    "x": "x",
+    "y": "y",
+    "z": "z",
+}
+
+_COLUMNS = [
+    "opcodes",
+    "qubits",
+    "clbits",
+    "angles",
+    "conditions",
+    "sources",
+    "condition_offsets",
+    "condition_bits",
+    "condition_values",
+]
+
+
+class CircuitIR:
+    """A circuit as NumPy columns.
+
+    Row ``i`` applies ``opcodes[i]`` to ``qubits[i]`` (padded with -1), writes
+    ``clbits[i]`` (-1 when none) and uses ``angles[i]`` (NaN when none).
+    ``conditions[i]`` is -1 or the index of a condition, whose clbits and
+    expected bit values are ``condition_bits`` and ``condition_values``
+    between ``condition_offsets[c]`` and ``condition_offsets[c + 1]``.
+    ``sources[i]`` is the index in ``circuit.data`` the row was built from.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        num_qubits: int,
+        num_clbits: int,
+        reg_sizes: List[int],
+        **columns: np.ndarray,
+    ):
+        self.name = name
+        self.num_qubits = num_qubits
+        self.num_clbits = num_clbits
+        self.reg_sizes = reg_sizes
+        self.opcodes: np.ndarray = columns["opcodes"]
+        self.qubits: np.ndarray = columns["qubits"]
+        self.clbits: np.ndarray = columns["clbits"]
+        self.angles: np.ndarray = columns["angles"]
+        self.conditions: np.ndarray = columns["conditions"]
+        self.sources: np.ndarray = columns["sources"]
+        self.condition_offsets: np.ndarray = columns["condition_offsets"]
+        self.condition_bits: np.ndarray = columns["condition_bits"]
+        self.condition_values: np.ndarray = columns["condition_values"]
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    @classmethod
+    def from_circuit(cls, circuit: "QuantumCircuit") -> "CircuitIR":
+        """Builds the IR in a single pass over the circuit data.
+
+        Raises ``ValueError`` for unbound parameters, instructions that are
+        neither supported nor composite, and conditions nested inside
+        conditioned composite instructions.
+        """
+        if circuit.parameters:
+            raise ValueError("CircuitIR requires a circuit without unbound parameters.")
+        builder = _Builder(circuit)
+        builder.add_circuit(
+            circuit,
+            [builder.qubit_labels[bit] for bit in circuit.qubits],
+            [builder.clbit_labels[bit] for bit in circuit.clbits],
+            -1,
+        )
+        return builder.build(circuit)
+
+    def _replace(self, rows: np.ndarray) -> "CircuitIR":
+        return CircuitIR(
+            self.name,
+            self.num_qubits,
+            self.num_clbits,
+            list(self.reg_sizes),
+            opcodes=self.opcodes[rows],
+            qubits=self.qubits[rows],
+            clbits=self.clbits[rows],
+            angles=self.angles[rows],
+            conditions=self.conditions[rows],
+            sources=self.sources[rows],
+            condition_offsets=self.condition_offsets,
+            condition_bits=self.condition_bits,
+            condition_values=self.condition_values,
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serialises the IR, see ``from_bytes``."""
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            name=np.array(self.name),
+            shape=np.array([self.num_qubits, self.num_clbits], dtype=np.int64),
+            reg_sizes=np.array(self.reg_sizes, dtype=np.int64),
+            **{column: getattr(self, column) for column in _COLUMNS},
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CircuitIR":
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            num_qubits, num_clbits = arrays["shape"].tolist()
+            return cls(
+                str(arrays["name"]),
+                num_qubits,
+                num_clbits,
+                arrays["reg_sizes"].tolist(),
+                **{column: arrays[column] for column in _COLUMNS},
+            )
+
+    def digest(self) -> bytes:
+        """128-bit structural hash of the IR, ignoring the circuit name and
+        the source indices."""
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(
+            np.array(
+                [self.num_qubits, self.num_clbits, len(self.reg_sizes)]
+                + self.reg_sizes,
+                dtype=np.int64,
+            ).tobytes()
+        )
+        for column in _COLUMNS:
+            if column != "sources":
+                array = getattr(self, column)
+                hasher.update(np.array(array.shape, dtype=np.int64).tobytes())
+                hasher.update(np.ascontiguousarray(array).tobytes())
+        return hasher.digest()
+
+    def violations(self, capabilities: Capability) -> List[Tuple[int, Capability]]:
+        """Returns the rows that require a capability outside of
+        ``capabilities``, with the missing capability, in row order."""
+        found = []
+        if not capabilities & Capability.CONDITIONAL_BRANCHING_ON_RESULT:
+            for row in np.flatnonzero(self.conditions >= 0).tolist():
+                found.append((row, Capability.CONDITIONAL_BRANCHING_ON_RESULT))
+        if not capabilities & Capability.QUBIT_USE_AFTER_MEASUREMENT:
+            rows = np.arange(len(self))
+            measured = self.opcodes == OPCODES["mz"]
+            first_measurement = np.full(self.num_qubits + 1, len(self))
+            np.minimum.at(first_measurement, self.qubits[measured, 0], rows[measured])
+            # Operand -1 indexes the sentinel entry that is never measured
+            after = rows[:, None] > first_measurement[self.qubits]
+            after &= (self.qubits >= 0) & ~measured[:, None]
+            after[self.opcodes == OPCODES["barrier"]] = False
+            for row in np.flatnonzero(after.any(axis=1)).tolist():
+                found.append((row, Capability.QUBIT_USE_AFTER_MEASUREMENT))
+        return sorted(found, key=lambda violation: violation[0])
+
+    def peephole(self) -> "CircuitIR":
+        """Returns the IR with adjacent inverse gates cancelled and adjacent
+        rotations about the same axis merged.
+
+        Only unconditioned gates acting on exactly the same qubits with no
+        other operation on any of those qubits in between are combined.
+        Rotations that merge to an angle of zero are removed.
+        """
+        keep = np.ones(len(self), dtype=bool)
+        angles = self.angles.copy()
+        # Rows still kept that touched each qubit, barriers touch every qubit
+        stacks = [[] for _ in range(self.num_qubits)]
+        opcodes = self.opcodes.tolist()
+        qubits = self.qubits.tolist()
+        conditions = self.conditions.tolist()
+        barrier = OPCODES["barrier"]
+        for row, opcode in enumerate(opcodes):
+            if opcode == barrier:
+                for stack in stacks:
+                    stack.append(row)
+                continue
+            operands = [q for q in qubits[row] if q >= 0]
+            previous = stacks[operands[0]][-1] if stacks[operands[0]] else None
+            if (
+                previous is not None
+                and conditions[row] < 0
+                and conditions[previous] < 0
+                and qubits[previous] == qubits[row]
+                and all(stacks[q] and stacks[q][-1] == previous for q in operands)
+            ):
+                name = NAMES[opcode]
+                if _INVERSES.get(name) == NAMES[opcodes[previous]]:
+                    keep[row] = keep[previous] = False
+                    for q in operands:
+                        stacks[q].pop()
+                    continue
+                if name in _ROTATIONS and opcodes[previous] == opcode:
+                    keep[row] = False
+                    angles[previous] += angles[row]
+                    if angles[previous] == 0.0:
+                        keep[previous] = False
+                        for q in operands:
+                            stacks[q].pop()
+                    continue
+            for q in operands:
+                stacks[q].append(row)
+        result = self._replace(keep)
+        result.angles = angles[keep]
+        return result
+
+    def emit(
+        self, module: "Module", profile: str = "AdaptiveExecution", **kwargs
+    ) -> str:
+        """Emits the IR as an entry point of ``module`` and returns its name.
+
+        Supports the ``record_output`` and ``emit_barrier_calls`` options of
+        ``to_qir_module``. Conditions are lowered with nested branches.
+        Raises ``CapabilityError`` when the profile does not support a row.
+        """
+        import pyqir
+        import pyqir.qis as qis
+        import pyqir.rt as rt
+        from pyqir import (
+            BasicBlock,
+            Builder,
+            Constant,
+            IntType,
+            PointerType,
+            Type,
+            const,
+        )
+        from qiskit_qir.visitor import (
+            _QIS_GATES,
+            _QIS_ROTATIONS,
+            _entry_point,
+            _profile_capabilities,
+        )
+
+        capabilities = _profile_capabilities(profile)
+        violations = self.violations(capabilities)
+        if violations:
+            row, capability = violations[0]
+            raise CapabilityError(
+                f"Instruction {self.sources[row]} ({NAMES[self.opcodes[row]]}) of "
+                f"circuit '{self.name}' requires {capability}"
+            )
+
+        context = module.context
+        entry = _entry_point(module, self.name, self.num_qubits, self.num_clbits)
+        builder = Builder(context)
+        builder.insert_at_end(BasicBlock(context, "entry", entry))
+        i8p = PointerType(IntType(context, 8))
+        rt.initialize(builder, Constant.null(i8p))
+
+        qubits = [pyqir.qubit(context, n) for n in range(self.num_qubits)]
+        results = [pyqir.result(context, n) for n in range(self.num_clbits)]
+        double = Type.double(context)
+        emit_barrier_calls = kwargs.get("emit_barrier_calls", False)
+        offsets = self.condition_offsets.tolist()
+        condition_bits = self.condition_bits.tolist()
+        condition_values = self.condition_values.tolist()
+
+        def emit_row(opcode, operands, clbit, angle):
+            name = NAMES[opcode]
+            if name in _QIS_GATES:
+                _QIS_GATES[name](builder, *operands)
+            elif name in _QIS_ROTATIONS:
+                _QIS_ROTATIONS[name](builder, const(double, angle), *operands)
+            elif name == "mz":
+                qis.mz(builder, operands[0], results[clbit])
+            elif name == "reset":
+                qis.reset(builder, operands[0])
+            elif name == "id":
+                qis.x(builder, operands[0])
+                qis.x(builder, operands[0])
+            elif emit_barrier_calls:
+                qis.barrier(builder)
+
+        def branch(bits, values, visit):
+            if not bits:
+                return visit
+            rest = branch(bits[1:], values[1:], visit)
+            return lambda: qis.if_result(
+                builder,
+                results[bits[0]],
+                one=rest if values[0] else None,
+                zero=None if values[0] else rest,
+            )
+
+        rows = zip(
+            self.opcodes.tolist(),
+            self.qubits.tolist(),
+            self.clbits.tolist(),
+            self.angles.tolist(),
+            self.conditions.tolist(),
+        )
+        for opcode, operands, clbit, angle, condition in rows:
+            operands = [qubits[q] for q in operands if q >= 0]
+            if condition < 0:
+                emit_row(opcode, operands, clbit, angle)
+                continue
+            start, end = offsets[condition], offsets[condition + 1]
+            branch(
+                condition_bits[start:end],
+                condition_values[start:end],
+                lambda: emit_row(opcode, operands, clbit, angle),
+            )()
+
+        if kwargs.get("record_output", True):
+            base = 0
+            for size in self.reg_sizes:
+                rt.array_record_output(
+                    builder, const(IntType(context, 64), size), Constant.null(i8p)
+                )
+                for index in range(size - 1, -1, -1):
+                    rt.result_record_output(
+                        builder, results[base + index], Constant.null(i8p)
+                    )
+                base += size
+        builder.ret(None)
+        return entry.name
+
+
+def _is_leaf(instruction) -> bool:
+    return (
+        getattr(instruction, "_condition", None) is not None
+        or instruction.name in _BUILT_INSTRUCTIONS
+        or instruction.definition is None
+    )
+
+
+class _Builder:
+    def __init__(self, circuit: "QuantumCircuit"):
+        self.qubit_labels = {
+            bit: n for n, bit in enumerate(b for r in circuit.qregs for b in r)
+        }
+        self.clbit_labels = {
+            bit: n for n, bit in enumerate(b for r in circuit.cregs for b in r)
+        }
+        if len(self.qubit_labels) != circuit.num_qubits or len(self.clbit_labels) != (
+            circuit.num_clbits
+        ):
+            raise ValueError("CircuitIR requires every bit to be in a register.")
+        self.source = 0
+        self.opcodes = []
+        self.qubits = []
+        self.clbits = []
+        self.angles = []
+        self.conditions = []
+        self.sources = []
+        self.condition_ids: Dict[Tuple, int] = {}
+        self.condition_offsets = [0]
+        self.condition_bits = []
+        self.condition_values = []
+        self.expansions: Dict = {}
+
+    def add_circuit(self, circuit, qubits, clbits, condition, top_level=True):
+        qubit_indices = {bit: n for n, bit in enumerate(circuit.qubits)}
+        clbit_indices = {bit: n for n, bit in enumerate(circuit.clbits)}
+        for source, instruction in enumerate(circuit._data):
+            if top_level:
+                self.source = source
+            self.add(
+                instruction.operation,
+                [qubits[qubit_indices[bit]] for bit in instruction.qubits],
+                [clbits[clbit_indices[bit]] for bit in instruction.clbits],
+                condition,
+                lambda bits: [clbits[clbit_indices[bit]] for bit in bits],
+            )
+
+    def add(self, instruction, operands, results, condition, map_clbits):
+        instruction_condition = getattr(instruction, "_condition", None)
+        if instruction_condition is not None:
+            if condition >= 0:
+                raise ValueError("CircuitIR does not support nested conditions.")
+            condition = self._condition(instruction_condition, map_clbits)
+
+        name = instruction.name
+        if name == "delay":
+            return
+        if name == "barrier":
+            self._append("barrier", [], -1, float("nan"), condition)
+        elif name in _MEASUREMENT_INSTRUCTIONS:
+            for qubit, clbit in zip(operands, results):
+                self._append("mz", [qubit], clbit, float("nan"), condition)
+        elif name in OPCODES:
+            angle = float(instruction.params[0]) if name in _ROTATIONS else float("nan")
+            self._append(name, operands, -1, angle, condition)
+        elif name in LOWERINGS:
+            for gate, step_indices, angle in LOWERINGS[name]:
+                self._append(
+                    gate,
+                    [operands[i] for i in step_indices],
+                    -1,
+                    float("nan") if angle is None else float(angle(instruction.params)),
+                    condition,
+                )
+        elif instruction.definition is not None:
+            self._add_composite(instruction, operands, results, condition)
+        else:
+            raise ValueError(f"Gate {name} is not supported.")
+
+    def _add_composite(self, instruction, operands, results, condition):
+        from qiskit_qir.visitor import _check_composite_arity, _expand_composite
+
+        _check_composite_arity(instruction, len(operands), len(results))
+        # Flattened with an explicit stack, so deep nesting does not hit the
+        # recursion limit
+        steps = _expand_composite(instruction, _is_leaf, self.expansions)
+        if any(getattr(step[0], "_condition", None) is not None for step in steps):
+            # Conditions refer to the bits of the definition they are in,
+            # which the flattened steps do not keep.
+            self.add_circuit(
+                instruction.definition, operands, results, condition, False
+            )
+            return
+        for operation, qubits, clbits in steps:
+            self.add(
+                operation,
+                [operands[i] for i in qubits],
+                [results[i] for i in clbits],
+                condition,
+                None,
+            )
+
+    def _condition(self, condition, map_clbits) -> int:
+        from qiskit.circuit import Clbit
+
+        if isinstance(condition[0], Clbit):
+            bits = [condition[0]]
+            values = [1 if condition[1] else 0]
+        else:
+            bits = list(condition[0])
+            values = [(int(condition[1]) >> i) & 1 for i in range(len(bits))]
+            if int(condition[1]) >> len(bits):
+                raise ValueError(
+                    f"Value {condition[1]} is larger than register width {len(bits)}."
+                )
+        key = (tuple(map_clbits(bits)), tuple(values))
+        if key not in self.condition_ids:
+            self.condition_ids[key] = len(self.condition_ids)
+            self.condition_bits.extend(key[0])
+            self.condition_values.extend(key[1])
+            self.condition_offsets.append(len(self.condition_bits))
+        return self.condition_ids[key]
+
+    def _append(self, name, operands, clbit, angle, condition):
+        self.opcodes.append(OPCODES[name])
+        self.qubits.append(operands + [-1] * (MAX_OPERANDS - len(operands)))
+        self.clbits.append(clbit)
+        self.angles.append(angle)
+        self.conditions.append(condition)
+        self.sources.append(self.source)
+
+    def build(self, circuit: "QuantumCircuit") -> CircuitIR:
+        return CircuitIR(
+            circuit.name,
+            circuit.num_qubits,
+            circuit.num_clbits,
+            [len(creg) for creg in circuit.cregs],
+            opcodes=np.array(self.opcodes, dtype=np.uint8),
+            qubits=np.array(self.qubits, dtype=np.int32).reshape(-1, MAX_OPERANDS),
+            clbits=np.array(self.clbits, dtype=np.int32),
+            angles=np.array(self.angles, dtype=np.float64),
+            conditions=np.array(self.conditions, dtype=np.int32),
+            sources=np.array(self.sources, dtype=np.int32),
+            condition_offsets=np.array(self.condition_offsets, dtype=np.int32),
+            condition_bits=np.array(self.condition_bits, dtype=np.int32),
+            condition_values=np.array(self.condition_values, dtype=np.uint8),
+        )
@@ -0,0 +1,154 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+from math import pi
+
+# Lowerings of common qiskit standard gates into the gates the visitor emits
+# directly, so that circuits using them do not need to be transpiled first.
+# Each step is (gate, qubit indices into the instruction's qubits, angle),
+# where angle maps the instruction parameters to the rotation angle of a
+# rx/ry/rz step and is None for all other gates. The lowerings are exact up to
+# a global phase.
+LOWERINGS = {
+    "p": [("rz", (0,), lambda p: p[0])],
+    "u1": [("rz", (0,), lambda p: p[0])],
+    "u2": [
+        ("rz", (0,), lambda p: p[1]),
+        ("ry", (0,), lambda p: pi / 2),
+        ("rz", (0,), lambda p: p[0]),
+    ],
+    "u": [
+        ("rz", (0,), lambda p: p[2]),
+        ("ry", (0,), lambda p: p[0]),
+        ("rz", (0,), lambda p: p[1]),
+    ],
+    "u3": [
+        ("rz", (0,), lambda p: p[2]),
+        ("ry", (0,), lambda p: p[0]),
+        ("rz", (0,), lambda p: p[1]),
+    ],
+    "r": [
+        ("rz", (0,), lambda p: -p[1]),
+        ("rx", (0,), lambda p: p[0]),
+        ("rz", (0,), lambda p: p[1]),
+    ],
+    "sx": [("rx", (0,), lambda p: pi / 2)],
+    "sxdg": [("rx", (0,), lambda p: -pi / 2)],
+    "cy": [("sdg", (1,), None), ("cx", (0, 1), None), ("s", (1,), None)],
+    "ch": [
+        ("s", (1,), None),
+        ("h", (1,), None),
+        ("t", (1,), None),
+        ("cx", (0, 1), None),
+        ("tdg", (1,), None),
+        ("h", (1,), None),
+        ("sdg", (1,), None),
+    ],
+    "cs": [
+        ("t", (0,), None),
+        ("cx", (0, 1), None),
+        ("tdg", (1,), None),
+        ("cx", (0, 1), None),
+        ("t", (1,), None),
+    ],
+    "csdg": [
+        ("tdg", (0,), None),
+        ("cx", (0, 1), None),
+        ("t", (1,), None),
+        ("cx", (0, 1), None),
+        ("tdg", (1,), None),
+    ],
+    "crx": [
+        ("s", (1,), None),
+        ("cx", (0, 1), None),
+        ("ry", (1,), lambda p: -p[0] / 2),
+        ("cx", (0, 1), None),
+        ("ry", (1,), lambda p: p[0] / 2),
+        ("sdg", (1,), None),
+    ],
+    "cry": [
+        ("ry", (1,), lambda p: p[0] / 2),
+        ("cx", (0, 1), None),
+        ("ry", (1,), lambda p: -p[0] / 2),
+        ("cx", (0, 1), None),
+    ],
+    "crz": [
+        ("rz", (1,), lambda p: p[0] / 2),
+        ("cx", (0, 1), None),
+        ("rz", (1,), lambda p: -p[0] / 2),
+        ("cx", (0, 1), None),
+    ],
+    "cp": [
+        ("rz", (0,), lambda p: p[0] / 2),
+        ("cx", (0, 1), None),
+        ("rz", (1,), lambda p: -p[0] / 2),
+        ("cx", (0, 1), None),
+        ("rz", (1,), lambda p: p[0] / 2),
+    ],
+    "cu1": [
+        ("rz", (0,), lambda p: p[0] / 2),
+        ("cx", (0, 1), None),
+        ("rz", (1,), lambda p: -p[0] / 2),
+        ("cx", (0, 1), None),
+        ("rz", (1,), lambda p: p[0] / 2),
+    ],
+    "rzz": [
+        ("cx", (0, 1), None),
+        ("rz", (1,), lambda p: p[0]),
+        ("cx", (0, 1), None),
+    ],
+    "rxx": [
+        ("h", (0,), None),
+        ("h", (1,), None),
+        ("cx", (0, 1), None),
+        ("rz", (1,), lambda p: p[0]),
+        ("cx", (0, 1), None),
+        ("h", (0,), None),
+        ("h", (1,), None),
+    ],
+    "ryy": [
+        ("rx", (0,), lambda p: pi / 2),
+        ("rx", (1,), lambda p: pi / 2),
+        ("cx", (0, 1), None),
+        ("rz", (1,), lambda p: p[0]),
+        ("cx", (0, 1), None),
+        ("rx", (0,), lambda p: -pi / 2),
+        ("rx", (1,), lambda p: -pi / 2),
+    ],
+    "rzx": [
+        ("h", (1,), None),
+        ("cx", (0, 1), None),
+        ("rz", (1,), lambda p: p[0]),
+        ("cx", (0, 1), None),
+        ("h", (1,), None),
+    ],
+    "ecr": [
+        ("h", (1,), None),
+        ("cx", (0, 1), None),
+        ("rz", (1,), lambda p: pi / 4),
+        ("cx", (0, 1), None),
+        ("h", (1,), None),
+        ("x", (0,), None),
+        ("h", (1,), None),
+        ("cx", (0, 1), None),
+        ("rz", (1,), lambda p: -pi / 4),
+        ("cx", (0, 1), None),
+        ("h", (1,), None),
+    ],
+    "dcx": [("cx", (0, 1), None), ("cx", (1, 0), None)],
+    "iswap": [
+        ("s", (0,), None),
+        ("s", (1,), None),
+        ("h", (0,), None),
+        ("cx", (0, 1), None),
+        ("cx", (1, 0), None),
+        ("h", (1,), None),
+    ],
+    "ccz": [("h", (2,), None), ("ccx", (0, 1, 2), None), ("h", (2,), None)],
+    "cswap": [
+        ("cx", (2, 1), None),
+        ("ccx", (0, 1, 2), None),
+        ("cx", (2, 1), None),
+    ],
+}
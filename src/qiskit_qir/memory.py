@@ -0,0 +1,81 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import os
+import tracemalloc
+from typing import Optional
+
+
+def _rss() -> Optional[int]:
+    # Resident set size in bytes, where /proc is available. It includes the
+    # memory LLVM allocates for the module, which tracemalloc does not see.
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryUsage:
+    """Memory used by one phase of a translation.
+
+    ``peak`` is the highest amount of Python memory allocated during the phase
+    and ``retained`` the amount still allocated at its end, both in bytes and
+    relative to the start of the phase, as traced by ``tracemalloc``.
+    ``rss`` is the change of the process resident set size over the phase,
+    which also covers the memory of pyqir and LLVM, or `None` where it cannot
+    be read.
+    """
+
+    def __init__(self, name: str, peak: int, retained: int, rss: Optional[int]):
+        self.name = name
+        self.peak = peak
+        self.retained = retained
+        self.rss = rss
+
+    def __repr__(self) -> str:
+        return (
+            f"MemoryUsage(name={self.name!r}, peak={self.peak}, "
+            f"retained={self.retained}, rss={self.rss})"
+        )
+
+
+class MemoryProfiler:
+    """Measures the memory used between ``begin`` and ``end`` of consecutive
+    phases.
+
+    Tracing is started when the profiler is created, unless it is already
+    running, and stopped again by ``stop``.
+    """
+
+    def __init__(self):
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+        self._name = None
+        self._current = 0
+        self._rss = None
+
+    def begin(self, name: str):
+        self._name = name
+        self._current, _ = tracemalloc.get_traced_memory()
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self._rss = _rss()
+
+    def end(self) -> MemoryUsage:
+        # Without reset_peak (Python 3.8) the peak covers earlier phases too
+        end, peak = tracemalloc.get_traced_memory()
+        rss = _rss()
+        return MemoryUsage(
+            self._name,
+            max(peak - self._current, 0),
+            end - self._current,
+            None if rss is None or self._rss is None else rss - self._rss,
+        )
+
+    def stop(self):
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
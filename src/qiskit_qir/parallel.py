@@ -0,0 +1,290 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import heapq
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pyqir import Context
+from qiskit.circuit.quantumcircuit import QuantumCircuit
+
+from qiskit_qir.lowering import LOWERINGS
+from qiskit_qir.translate import to_qir_module
+from qiskit_qir.visitor import _SUPPORTED_INSTRUCTIONS
+
+_log = logging.getLogger(name=__name__)
+
+# pyqir contexts are not thread-safe, each worker thread translates into
+# modules of its own context.
+_thread_state = threading.local()
+
+
+def estimate_cost(circuit: QuantumCircuit) -> int:
+    """Estimates the translation cost of a circuit as the number of gates
+    emitted once composite instructions are expanded."""
+    # Definitions are counted before the circuits using them on an explicit
+    # stack of [circuit, instructions, cost, cache key] frames, so the
+    # nesting depth is not bound by the recursion limit.
+    cache: Dict = {}
+    stack = [[circuit, iter(circuit._data), 0, None]]
+    while True:
+        frame = stack[-1]
+        for instruction in frame[1]:
+            name = instruction.name
+            if name in _SUPPORTED_INSTRUCTIONS:
+                frame[2] += 1
+                continue
+            if name in LOWERINGS:
+                frame[2] += len(LOWERINGS[name])
+                continue
+            if instruction.is_standard_gate():
+                # Standard gates get a new definition on every access, which
+                # their name and parameters determine
+                key = (name, tuple(str(param) for param in instruction.params))
+                definition = None
+            else:
+                # Different custom instructions can share a name. The cache
+                # keeps the definition alive so that its id cannot be reused.
+                definition = instruction.operation.definition
+                key = id(definition)
+            cached = cache.get(key)
+            if cached is not None:
+                frame[2] += cached[1]
+                continue
+            if definition is None:
+                definition = instruction.operation.definition
+            if definition is None:
+                cache[key] = (None, 1)
+                frame[2] += 1
+                continue
+            stack.append([definition, iter(definition._data), 0, key])
+            break
+        else:
+            stack.pop()
+            if not stack:
+                return frame[2]
+            cache[frame[3]] = (frame[0], frame[2])
+            stack[-1][2] += frame[2]
+
+
+def schedule(costs: Sequence[int], num_workers: int) -> List[List[int]]:
+    """Assigns the indices of ``costs`` to ``num_workers`` workers, longest
+    first, always to the worker with the least work so far."""
+    if num_workers < 1:
+        raise ValueError(f"At least one worker is required, got {num_workers}.")
+    assignment: List[List[int]] = [[] for _ in range(num_workers)]
+    loads = [(0, worker) for worker in range(num_workers)]
+    for index in sorted(range(len(costs)), key=lambda i: costs[i], reverse=True):
+        load, worker = heapq.heappop(loads)
+        assignment[worker].append(index)
+        heapq.heappush(loads, (load + costs[index], worker))
+    return assignment
+
+
+class WorkerStats:
+    """Work done by one worker of a ``ParallelTranslation``."""
+
+    def __init__(self, worker: int, num_circuits: int, estimated_cost: int):
+        self.worker = worker
+        self.num_circuits = num_circuits
+        self.estimated_cost = estimated_cost
+        self.completed = 0
+        self.busy_time = 0.0
+        self.wall_time = 0.0
+
+    @property
+    def utilisation(self) -> float:
+        """Fraction of the batch wall time this worker spent translating."""
+        if self.wall_time == 0.0:
+            return 0.0
+        return self.busy_time / self.wall_time
+
+
+def _translate_to_bitcode(
+    circuit: QuantumCircuit, profile: str, options: Dict
+) -> Tuple[Tuple, float]:
+    start = time.perf_counter()
+    result = to_qir_module(circuit, profile, **options)
+    # pyqir modules cannot be pickled, so the module crosses the process
+    # boundary as bitcode.
+    result = (result[0].bitcode,) + tuple(result[1:])
+    return result, time.perf_counter() - start
+
+
+def _thread_context() -> Context:
+    context = getattr(_thread_state, "context", None)
+    if context is None:
+        context = _thread_state.context = Context()
+    return context
+
+
+def _translate_in_thread(circuit: QuantumCircuit, profile: str, options: Dict):
+    try:
+        result = to_qir_module(circuit, profile, context=_thread_context(), **options)
+    except Exception as error:
+        # The traceback holds the frames of the translation and with them
+        # pyqir objects, which must not be released on the calling thread.
+        raise error.with_traceback(None) from None
+    # The module stays in the worker's context, only its bitcode leaves the
+    # thread.
+    return (result[0].bitcode,) + tuple(result[1:])
+
+
+class ParallelTranslation:
+    """Translates a batch of circuits in worker processes.
+
+    Circuits are assigned to workers by ``schedule`` using ``estimate_cost``.
+    Iterating yields, in input order, the result of ``to_qir_module`` for each
+    circuit with the module replaced by its bitcode. ``worker_stats`` is
+    updated as results are consumed.
+    """
+
+    def __init__(
+        self,
+        circuits: List[QuantumCircuit],
+        profile: str,
+        num_workers: int,
+        options: Dict,
+    ):
+        self._circuits = circuits
+        self._profile = profile
+        self._options = options
+        self.costs = [estimate_cost(circuit) for circuit in circuits]
+        self.assignment = schedule(self.costs, num_workers)
+        self.worker_stats = [
+            WorkerStats(worker, len(indices), sum(self.costs[i] for i in indices))
+            for worker, indices in enumerate(self.assignment)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._circuits)
+
+    def __iter__(self) -> Iterator[Tuple]:
+        start = time.perf_counter()
+        # One single-process pool per worker keeps the scheduled assignment,
+        # a shared pool would hand tasks to whichever process is idle.
+        executors = [
+            ProcessPoolExecutor(max_workers=1) for _ in range(len(self.assignment))
+        ]
+        futures = [None] * len(self._circuits)
+        workers = [0] * len(self._circuits)
+        try:
+            for worker, indices in enumerate(self.assignment):
+                for index in indices:
+                    futures[index] = executors[worker].submit(
+                        _translate_to_bitcode,
+                        self._circuits[index],
+                        self._profile,
+                        self._options,
+                    )
+                    workers[index] = worker
+            for index, future in enumerate(futures):
+                result, elapsed = future.result()
+                stats = self.worker_stats[workers[index]]
+                stats.completed += 1
+                stats.busy_time += elapsed
+                wall_time = time.perf_counter() - start
+                for worker_stats in self.worker_stats:
+                    worker_stats.wall_time = wall_time
+                yield result
+        finally:
+            for future in futures:
+                if future is not None:
+                    future.cancel()
+            for executor in executors:
+                executor.shutdown(wait=True)
+            _log.debug(
+                "Worker utilisation: "
+                + ", ".join(f"{s.utilisation:.0%}" for s in self.worker_stats)
+            )
+
+
+def translate_parallel(
+    circuits: List[QuantumCircuit],
+    profile: str = "AdaptiveExecution",
+    num_workers: Optional[int] = None,
+    **kwargs,
+) -> ParallelTranslation:
+    r"""Translates each circuit into its own QIR module in worker processes.
+
+    :param circuits:
+        Qiskit circuits to be converted to QIR
+    :type circuits: ``List[QuantumCircuit]``
+    :param profile:
+        The target profile for capability verification
+    :type profile: ``str``
+    :param num_workers:
+        Number of worker processes, defaults to the number of CPUs
+    :type num_workers: ``Optional[int]``
+    :param \**kwargs:
+        Keyword arguments of ``to_qir_module``
+    :returns:
+        A ``ParallelTranslation`` yielding one ``to_qir_module`` result per
+        circuit, in input order, with the module given as bitcode.
+    """
+    if not isinstance(circuits, list) or not all(
+        isinstance(value, QuantumCircuit) for value in circuits
+    ):
+        raise ValueError("Input must be List[QuantumCircuit]")
+    if len(circuits) == 0:
+        raise ValueError("No QuantumCircuits provided")
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = max(1, min(num_workers, len(circuits)))
+    return ParallelTranslation(circuits, profile, num_workers, kwargs)
+
+
+def translate_threaded(
+    circuits: List[QuantumCircuit],
+    profile: str = "AdaptiveExecution",
+    num_threads: Optional[int] = None,
+    **kwargs,
+) -> List[Tuple]:
+    r"""Translates each circuit into its own QIR module on a thread pool.
+
+    Every worker thread creates its modules in a pyqir context of its own, so
+    no context is ever used by two threads. Circuits are only read and can be
+    shared between threads, but must not be modified during the call. The
+    work runs in parallel on free-threaded CPython builds and wherever pyqir
+    releases the GIL.
+
+    :param circuits:
+        Qiskit circuits to be converted to QIR
+    :type circuits: ``List[QuantumCircuit]``
+    :param profile:
+        The target profile for capability verification
+    :type profile: ``str``
+    :param num_threads:
+        Number of worker threads, defaults to the number of CPUs
+    :type num_threads: ``Optional[int]``
+    :param \**kwargs:
+        Keyword arguments of ``to_qir_module`` except ``context``
+    :returns:
+        One ``to_qir_module`` result per circuit, in input order, with the
+        module given as bitcode.
+    """
+    if not isinstance(circuits, list) or not all(
+        isinstance(value, QuantumCircuit) for value in circuits
+    ):
+        raise ValueError("Input must be List[QuantumCircuit]")
+    if len(circuits) == 0:
+        raise ValueError("No QuantumCircuits provided")
+    if "context" in kwargs:
+        raise ValueError("Worker threads use their own contexts.")
+    if num_threads is None:
+        num_threads = os.cpu_count() or 1
+    num_threads = max(1, min(num_threads, len(circuits)))
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        return list(
+            executor.map(
+                _translate_in_thread,
+                circuits,
+                [profile] * len(circuits),
+                [kwargs] * len(circuits),
+            )
+        )
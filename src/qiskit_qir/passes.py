@@ -0,0 +1,67 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+from qiskit.circuit import Clbit
+from qiskit.circuit.quantumcircuit import QuantumCircuit
+
+from qiskit_qir.visitor import _MEASUREMENT_INSTRUCTIONS, _condition
+
+# Instructions that neither act on nor order the qubits they list
+_TRANSPARENT_INSTRUCTIONS = ["barrier", "delay"]
+
+
+def defer_measurements(circuit: QuantumCircuit) -> QuantumCircuit:
+    """Returns a copy of the circuit with its terminal measurements moved to
+    the end, in their original order.
+
+    A measurement is terminal when it is unconditioned and no later
+    instruction, other than a deferred measurement, barrier or delay, acts on
+    its qubit, writes its clbit or is conditioned on it. Moving such a
+    measurement past the instructions that follow it does not change the
+    outcome of the circuit. The circuit is returned unchanged when nothing
+    can be deferred.
+    """
+    data = circuit._data
+    deferred = [False] * len(data)
+    touched_qubits = set()
+    touched_clbits = set()
+    # Backward scan: a measurement is deferred if nothing after it that stays
+    # in place touches its bits.
+    for index in range(len(data) - 1, -1, -1):
+        circuit_instruction = data[index]
+        instruction = circuit_instruction.operation
+        if instruction.name in _TRANSPARENT_INSTRUCTIONS:
+            continue
+        condition = _condition(instruction)
+        if (
+            instruction.name in _MEASUREMENT_INSTRUCTIONS
+            and condition is None
+            and touched_qubits.isdisjoint(circuit_instruction.qubits)
+            and touched_clbits.isdisjoint(circuit_instruction.clbits)
+        ):
+            deferred[index] = True
+            continue
+        touched_qubits.update(circuit_instruction.qubits)
+        touched_clbits.update(circuit_instruction.clbits)
+        if condition is not None:
+            if isinstance(condition[0], Clbit):
+                touched_clbits.add(condition[0])
+            else:
+                touched_clbits.update(condition[0])
+
+    # Measurements that are already at the end stay where they are
+    last_kept = max(
+        (index for index, is_deferred in enumerate(deferred) if not is_deferred),
+        default=-1,
+    )
+    if not any(deferred[:last_kept]):
+        return circuit
+    result = circuit.copy_empty_like()
+    for index, circuit_instruction in enumerate(data):
+        if not deferred[index]:
+            result._append(circuit_instruction)
+    for index, circuit_instruction in enumerate(data):
+        if deferred[index]:
+            result._append(circuit_instruction)
+    return result
@@ -0,0 +1,61 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+from typing import List, Tuple
+
+from qiskit.circuit.quantumcircuit import QuantumCircuit
+
+from qiskit_qir.resources import ResourceCountingVisitor
+
+
+class BatchValidationError(ValueError):
+    """Raised by ``validate_batch`` with every problem found in a batch.
+
+    ``errors`` lists the index of the offending circuit with the error
+    translating it would raise, in batch order.
+    """
+
+    def __init__(self, errors: List[Tuple[int, Exception]]):
+        self.errors = errors
+        lines = [f"circuit {index}: {error}" for index, error in errors]
+        super().__init__(
+            f"{len(errors)} circuit(s) cannot be translated:\n" + "\n".join(lines)
+        )
+
+
+def validate_batch(
+    circuits: List[QuantumCircuit], profile: str = "AdaptiveExecution", **kwargs
+) -> None:
+    r"""Checks that every circuit of a batch can be translated before any of
+    them is emitted.
+
+    Each circuit is walked once without building LLVM IR, which finds
+    unsupported gates, including those inside composite instructions,
+    violations of the profile's capabilities and condition values wider than
+    their register. Circuits may share a name, their entry points are given
+    unique names by ``to_qir_module``.
+
+    :param circuits:
+        Qiskit circuits to validate
+    :type circuits: ``List[QuantumCircuit]``
+    :param profile:
+        The target profile for capability verification
+    :type profile: ``str``
+    :param \**kwargs:
+        Keyword arguments of ``to_qir_module``
+    :raises BatchValidationError: listing every problem with its circuit index
+    """
+    if not kwargs.get("entry_point_metadata", False):
+        # Gate times are only required for the metadata
+        kwargs = {key: value for key, value in kwargs.items() if key != "gate_times"}
+    # Invalid options are reported as such rather than once per circuit
+    ResourceCountingVisitor(profile, **kwargs)
+    errors = []
+    for index, circuit in enumerate(circuits):
+        try:
+            ResourceCountingVisitor(profile, **kwargs).visit_circuit_data(circuit)
+        except Exception as error:
+            errors.append((index, error))
+    if errors:
+        raise BatchValidationError(errors)
@@ -0,0 +1,433 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import logging
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Union
+
+from qiskit import ClassicalRegister, QuantumRegister
+from qiskit.circuit import Clbit, ParameterExpression
+from qiskit.circuit.instruction import Instruction
+from qiskit.circuit.quantumcircuit import QuantumCircuit
+
+from qiskit_qir.capability import (
+    Capability,
+    ConditionalBranchingOnResultError,
+    QubitUseAfterMeasurementError,
+)
+from qiskit_qir.lowering import LOWERINGS
+from qiskit_qir.passes import defer_measurements
+from qiskit_qir.visitor import (
+    QuantumCircuitElementVisitor,
+    _CONDITION_LOWERINGS,
+    _MAX_COMPARE_WIDTH,
+    _MEASUREMENT_INSTRUCTIONS,
+    _QIS_GATES,
+    _QIS_ROTATIONS,
+    _SUPPORTED_INSTRUCTIONS,
+    _assign_physical_qubits,
+    _check_composite_arity,
+    _condition,
+    _expand_composite,
+    _find_active_bits,
+    _profile_capabilities,
+)
+
+_log = logging.getLogger(name=__name__)
+
+_T_GATES = ["t", "tdg"]
+
+# Instructions counted as a single operation of the same name
+_PLAIN_GATES = frozenset(_QIS_GATES) | {"reset"}
+
+# Instructions counted without expanding their definition
+_COUNTED_INSTRUCTIONS = (
+    _PLAIN_GATES
+    | frozenset(_QIS_ROTATIONS)
+    | frozenset(LOWERINGS)
+    | frozenset(_MEASUREMENT_INSTRUCTIONS)
+    | {"id", "barrier", "delay"}
+)
+
+# Every conditional branch adds a then, an else and a continuation block
+_BLOCKS_PER_BRANCH = 3
+
+
+class ResourceEstimate:
+    """Resources of the QIR ``to_qir_module`` would emit for a circuit.
+
+    ``gate_counts`` counts the QIS operations by gate name after composite
+    instructions are expanded and table gates lowered, with measurements
+    counted as ``mz``. ``depth`` is the depth of that operation sequence,
+    where measurements and conditions also order the clbits they use.
+    ``branches`` is the number of conditional branches emitted for
+    conditions and ``blocks`` the resulting number of basic blocks of the
+    entry point. ``duration`` is the length of the critical path when gate
+    times were given, and `None` otherwise.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.num_qubits = 0
+        self.num_results = 0
+        self.gate_counts: Dict[str, int] = {}
+        self.depth = 0
+        self.branches = 0
+        self.duration: Optional[float] = None
+
+    @property
+    def num_gates(self) -> int:
+        return sum(self.gate_counts.values())
+
+    @property
+    def t_count(self) -> int:
+        return sum(self.gate_counts.get(gate, 0) for gate in _T_GATES)
+
+    @property
+    def two_qubit_gate_count(self) -> int:
+        return sum(self.gate_counts.get(gate, 0) for gate in ("cx", "cz", "swap"))
+
+    @property
+    def measurement_count(self) -> int:
+        return self.gate_counts.get("mz", 0)
+
+    @property
+    def blocks(self) -> int:
+        return 1 + _BLOCKS_PER_BRANCH * self.branches
+
+    def __repr__(self) -> str:
+        return (
+            f"ResourceEstimate(name={self.name!r}, num_qubits={self.num_qubits}, "
+            f"num_results={self.num_results}, num_gates={self.num_gates}, "
+            f"t_count={self.t_count}, "
+            f"two_qubit_gate_count={self.two_qubit_gate_count}, "
+            f"depth={self.depth}, branches={self.branches})"
+        )
+
+
+class ResourceCountingVisitor(QuantumCircuitElementVisitor):
+    """Walks a circuit the way ``BasicQisVisitor`` does and counts what it
+    would emit, without creating any pyqir objects."""
+
+    def __init__(self, profile: str = "AdaptiveExecution", **kwargs):
+        self._profile = profile
+        self._capabilities = _profile_capabilities(profile)
+        self._condition_lowering = kwargs.get("condition_lowering", "nested")
+        if self._condition_lowering not in _CONDITION_LOWERINGS:
+            raise ValueError(
+                f"Condition lowering {self._condition_lowering} is not supported. \
+    Please use one of: {_CONDITION_LOWERINGS}."
+            )
+        self._prune_unused = kwargs.get("prune_unused", False)
+        self._reuse_qubits = kwargs.get("reuse_qubits", False)
+        if (
+            self._reuse_qubits
+            and not self._capabilities & Capability.QUBIT_USE_AFTER_MEASUREMENT
+        ):
+            raise ValueError(
+                "Qubit reuse requires Capability.QUBIT_USE_AFTER_MEASUREMENT"
+            )
+        self._angle_precision = kwargs.get("angle_precision", None)
+        if self._angle_precision is not None and not self._angle_precision > 0:
+            raise ValueError(
+                f"Angle precision must be positive, got {self._angle_precision}."
+            )
+        self._circuit = None
+        self._qubit_labels = {}
+        self._measured_qubits = set()
+        self._pending_resets = set()
+        self._qubit_levels = {}
+        self._clbit_levels = {}
+        self._gate_counts = Counter()
+        self._expansions = {}
+        self._max_expansion_depth = kwargs.get("max_expansion_depth", None)
+        self._gate_times = kwargs.get("gate_times", None)
+        self._qubit_times = {}
+        self._clbit_times = {}
+        self._estimate = None
+
+    @property
+    def estimate(self) -> ResourceEstimate:
+        self._estimate.gate_counts = dict(self._gate_counts)
+        self._estimate.depth = max(
+            list(self._qubit_levels.values()) + list(self._clbit_levels.values()),
+            default=0,
+        )
+        if self._gate_times is not None:
+            self._estimate.duration = max(
+                list(self._qubit_times.values()) + list(self._clbit_times.values()),
+                default=0.0,
+            )
+        return self._estimate
+
+    def visit_circuit_data(self, circuit: QuantumCircuit):
+        self._circuit = circuit
+        self._estimate = ResourceEstimate(circuit.name)
+        self._estimate.num_qubits = circuit.num_qubits
+        self._estimate.num_results = circuit.num_clbits
+        active_qubits = None
+        if self._prune_unused:
+            active_qubits, active_clbits = _find_active_bits(circuit)
+            self._estimate.num_qubits = sum(
+                1 for qreg in circuit.qregs for bit in qreg if bit in active_qubits
+            )
+            # Classical registers without an active bit are dropped entirely
+            self._estimate.num_results = sum(
+                len(creg)
+                for creg in circuit.cregs
+                if any(bit in active_clbits for bit in creg)
+            )
+        if self._reuse_qubits:
+            assignment, self._pending_resets = _assign_physical_qubits(circuit)
+            self._qubit_labels = dict(assignment)
+            self._estimate.num_qubits = len(set(assignment.values()))
+        else:
+            self._qubit_labels = {
+                bit: n
+                for n, bit in enumerate(
+                    bit
+                    for register in circuit.qregs
+                    for bit in register
+                    if active_qubits is None or bit in active_qubits
+                )
+            }
+        for register in circuit.qregs:
+            self.visit_register(register)
+        for register in circuit.cregs:
+            self.visit_register(register)
+        self._visit_instructions(circuit._data)
+
+    def _visit_instructions(self, instructions):
+        # Counts plain gates straight from the circuit data, as the fused
+        # loop of BasicQisVisitor emits them. Anything else goes through
+        # visit_instruction.
+        counts = self._gate_counts
+        levels = self._qubit_levels
+        labels = self._qubit_labels
+        measured = self._measured_qubits
+        check_measured = not self._capabilities & Capability.QUBIT_USE_AFTER_MEASUREMENT
+        timed = self._gate_times is not None
+        for circuit_instruction in instructions:
+            name = circuit_instruction.name
+            qargs = circuit_instruction.qubits
+            if (
+                (name not in _PLAIN_GATES and name not in _QIS_ROTATIONS)
+                or self._pending_resets
+                or circuit_instruction.condition is not None
+                or (
+                    check_measured
+                    and measured
+                    and any(labels[bit] in measured for bit in qargs)
+                )
+            ):
+                self.visit_instruction(
+                    circuit_instruction.operation,
+                    list(qargs),
+                    list(circuit_instruction.clbits),
+                )
+                continue
+            if (
+                self._angle_precision is not None
+                and name in _QIS_ROTATIONS
+                and self._is_dropped(circuit_instruction.params[0])
+            ):
+                continue
+            if timed:
+                self._count(name, qargs)
+                continue
+            counts[name] += 1
+            if len(qargs) == 1:
+                bit = qargs[0]
+                levels[bit] = levels.get(bit, 0) + 1
+            else:
+                level = 1 + max([levels.get(bit, 0) for bit in qargs])
+                for bit in qargs:
+                    levels[bit] = level
+
+    def visit_register(self, register):
+        if not isinstance(register, (QuantumRegister, ClassicalRegister)):
+            raise ValueError(f"Register of type {type(register)} not supported.")
+
+    def visit_instruction(
+        self,
+        instruction: Instruction,
+        qargs: List,
+        cargs: List,
+        skip_condition=False,
+    ):
+        if self._pending_resets and instruction.name != "barrier":
+            # Reused qubit ids are reset before the first instruction of the
+            # qubit taking them over
+            for bit in qargs:
+                if bit in self._pending_resets:
+                    self._pending_resets.discard(bit)
+                    self._count("reset", [bit])
+
+        condition = _condition(instruction)
+        if (
+            condition is not None
+        ) and not self._capabilities & Capability.CONDITIONAL_BRANCHING_ON_RESULT:
+            raise ConditionalBranchingOnResultError(
+                self._circuit, instruction, qargs, cargs, self._profile
+            )
+        if condition is not None and not skip_condition:
+            bits = [condition[0]] if isinstance(condition[0], Clbit) else condition[0]
+            if int(condition[1]) >> len(bits):
+                raise ValueError(
+                    f"Value {condition[1]} is larger than register width {len(bits)}."
+                )
+            if (
+                self._condition_lowering == "compare"
+                and 1 < len(bits) <= _MAX_COMPARE_WIDTH
+            ):
+                self._estimate.branches += 1
+            else:
+                self._estimate.branches += len(bits)
+            # Everything emitted inside the branch waits for the bits read
+            level = max((self._clbit_levels.get(bit, 0) for bit in bits), default=0)
+            for bit in qargs:
+                self._qubit_levels[bit] = max(self._qubit_levels.get(bit, 0), level)
+            if self._gate_times is not None:
+                start = max(
+                    (self._clbit_times.get(bit, 0.0) for bit in bits), default=0.0
+                )
+                for bit in qargs:
+                    self._qubit_times[bit] = max(self._qubit_times.get(bit, 0.0), start)
+            self.visit_instruction(instruction, qargs, cargs, skip_condition=True)
+            return
+
+        name = instruction.name
+        qubits = [bit for bit in qargs if bit in self._qubit_labels]
+        if name in _MEASUREMENT_INSTRUCTIONS:
+            for qubit, clbit in zip(qubits, cargs):
+                self._measured_qubits.add(self._qubit_labels[qubit])
+                self._count("mz", [qubit], [clbit])
+            return
+        if not self._capabilities & Capability.QUBIT_USE_AFTER_MEASUREMENT and (
+            name in _SUPPORTED_INSTRUCTIONS or name in LOWERINGS
+        ):
+            if any(self._qubit_labels[bit] in self._measured_qubits for bit in qubits):
+                raise QubitUseAfterMeasurementError(
+                    self._circuit, instruction, qargs, cargs, self._profile
+                )
+        if name in _PLAIN_GATES:
+            self._count(name, qubits)
+        elif name in _QIS_ROTATIONS:
+            self._count_rotation(name, instruction.params[0], qubits)
+        elif name in LOWERINGS:
+            for gate, indices, angle in LOWERINGS[name]:
+                step_qubits = [qubits[i] for i in indices]
+                if angle is None:
+                    self._count(gate, step_qubits)
+                else:
+                    self._count_rotation(gate, angle(instruction.params), step_qubits)
+        elif name == "id":
+            self._count("x", qubits)
+            self._count("x", qubits)
+        elif name == "barrier" or name == "delay":
+            pass
+        elif instruction.definition:
+            _check_composite_arity(instruction, len(qargs), len(cargs))
+            steps = _expand_composite(
+                instruction, self._is_leaf, self._expansions, self._max_expansion_depth
+            )
+            for operation, qubits, clbits in steps:
+                self.visit_instruction(
+                    operation, [qargs[i] for i in qubits], [cargs[i] for i in clbits]
+                )
+        else:
+            raise ValueError(
+                f"Gate {name} is not supported. \
+    Please transpile using the list of supported gates: {_SUPPORTED_INSTRUCTIONS}."
+            )
+
+    def _is_leaf(self, instruction: Instruction) -> bool:
+        return (
+            _condition(instruction) is not None
+            or instruction.name in _COUNTED_INSTRUCTIONS
+            or not instruction.definition
+        )
+
+    def _is_dropped(self, theta) -> bool:
+        # Mirrors BasicQisVisitor._emit_rotation, which drops rotations by a
+        # multiple of 2π once rounded to the angle precision
+        if self._angle_precision is None or (
+            isinstance(theta, ParameterExpression) and theta.parameters
+        ):
+            return False
+        theta = round(float(theta) / self._angle_precision) * self._angle_precision
+        return abs(math.remainder(theta, 2 * math.pi)) < self._angle_precision / 2
+
+    def _count_rotation(self, gate: str, theta, qubits):
+        if not self._is_dropped(theta):
+            self._count(gate, qubits)
+
+    def _count(self, gate: str, qubits, clbits=()):
+        self._gate_counts[gate] += 1
+        level = 1 + max(
+            [self._qubit_levels.get(bit, 0) for bit in qubits]
+            + [self._clbit_levels.get(bit, 0) for bit in clbits],
+            default=0,
+        )
+        for bit in qubits:
+            self._qubit_levels[bit] = level
+        for bit in clbits:
+            self._clbit_levels[bit] = level
+        if self._gate_times is not None:
+            duration = self._gate_times.get(gate)
+            if duration is None:
+                raise ValueError(f"No gate time given for {gate}.")
+            end = duration + max(
+                [self._qubit_times.get(bit, 0.0) for bit in qubits]
+                + [self._clbit_times.get(bit, 0.0) for bit in clbits],
+                default=0.0,
+            )
+            for bit in qubits:
+                self._qubit_times[bit] = end
+            for bit in clbits:
+                self._clbit_times[bit] = end
+
+
+def estimate_resources(
+    circuits: Union[QuantumCircuit, List[QuantumCircuit]],
+    profile: str = "AdaptiveExecution",
+    **kwargs,
+) -> List[ResourceEstimate]:
+    r"""Counts the resources of the QIR ``to_qir_module`` would emit for the
+    circuits, without building any LLVM IR.
+
+    Raises the same errors as ``to_qir_module`` for circuits the profile does
+    not support.
+
+    :param circuits:
+        Qiskit circuit(s) to estimate
+    :type circuits: ``Union[QuantumCircuit, List[QuantumCircuit]]``
+    :param profile:
+        The target profile for capability verification
+    :type profile: ``str``
+    :param \**kwargs:
+        Keyword arguments of ``to_qir_module``. ``condition_lowering``,
+        ``prune_unused``, ``reuse_qubits``, ``angle_precision``,
+        ``defer_measurements`` and ``gate_times`` change the estimate, the
+        others are ignored.
+    :returns: One ``ResourceEstimate`` per circuit, in input order.
+    """
+    if isinstance(circuits, QuantumCircuit):
+        circuits = [circuits]
+    if not isinstance(circuits, list) or not all(
+        isinstance(value, QuantumCircuit) for value in circuits
+    ):
+        raise ValueError("Input must be Union[QuantumCircuit, List[QuantumCircuit]]")
+    if len(circuits) == 0:
+        raise ValueError("No QuantumCircuits provided")
+    estimates = []
+    for circuit in circuits:
+        if kwargs.get("defer_measurements", False):
+            circuit = defer_measurements(circuit)
+        visitor = ResourceCountingVisitor(profile, **kwargs)
+        visitor.visit_circuit_data(circuit)
+        estimates.append(visitor.estimate)
+        _log.debug(f"Estimated {visitor.estimate}")
+    return estimates
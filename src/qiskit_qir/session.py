@@ -0,0 +1,136 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import logging
+from typing import List, Optional, Tuple
+
+from pyqir import BasicBlock, Builder, Context, Instruction, Module, qir_module
+from qiskit.circuit.quantumcircuit import QuantumCircuit
+
+from qiskit_qir.elements import QiskitModule
+from qiskit_qir.visitor import BasicQisVisitor
+
+_log = logging.getLogger(name=__name__)
+
+# Options that need the complete circuit before the first instruction is
+# emitted, or that restructure the emitted body as a whole.
+_WHOLE_CIRCUIT_OPTIONS = [
+    "prune_unused",
+    "reuse_qubits",
+    "chunk_size",
+    "defer_measurements",
+]
+
+
+class TranslationSession:
+    """Translates a circuit that is built up by appending instructions.
+
+    Each ``update`` only emits the instructions appended to the circuit since
+    the previous one, keeping the builder position, bit labels and measured
+    qubits of the underlying ``BasicQisVisitor``. The recorded output and the
+    return are emitted into a separate block when ``result`` is requested and
+    the branch to it is removed again by the next ``update``, so requesting
+    results does not grow the cost of later updates.
+
+    Adding registers or parameters, or removing instructions, restarts the
+    translation from scratch on the next ``update``. Replacing instructions
+    that were already translated is not detected. The options
+    ``prune_unused``, ``reuse_qubits``, ``chunk_size`` and
+    ``defer_measurements`` work on the complete circuit and raise a
+    ``ValueError``.
+    """
+
+    def __init__(
+        self, circuit: QuantumCircuit, profile: str = "AdaptiveExecution", **kwargs
+    ):
+        for option in _WHOLE_CIRCUIT_OPTIONS:
+            if kwargs.get(option, False):
+                raise ValueError(f"Option {option} is not supported incrementally.")
+        self._circuit = circuit
+        self._profile = profile
+        self._kwargs = kwargs
+        self._start()
+
+    def _layout(self) -> Tuple:
+        circuit = self._circuit
+        return (
+            [len(register) for register in circuit.qregs],
+            [len(register) for register in circuit.cregs],
+            circuit.num_parameters,
+        )
+
+    def _start(self):
+        self._module = qir_module(Context(), self._circuit.name)
+        self._qiskit_module = QiskitModule.from_quantum_circuit(
+            self._circuit, self._module
+        )
+        self._visitor = BasicQisVisitor(self._profile, **self._kwargs)
+        self._visitor.visit_qiskit_module(self._qiskit_module)
+        for register in self._circuit.qregs:
+            self._visitor.visit_register(register)
+        for register in self._circuit.cregs:
+            self._visitor.visit_register(register)
+        self._entry = next(
+            function
+            for function in self._module.functions
+            if function.name == self._visitor.entry_point
+        )
+        self._layout_key = self._layout()
+        self._num_translated = 0
+        self._output: Optional[BasicBlock] = None
+        self._branch: Optional[Instruction] = None
+
+    @property
+    def num_translated(self) -> int:
+        """Number of circuit instructions translated so far."""
+        return self._num_translated
+
+    def update(self) -> int:
+        """Translates the instructions appended since the last update and
+        returns how many were translated."""
+        num_instructions = len(self._circuit._data)
+        if (
+            num_instructions < self._num_translated
+            or self._layout() != self._layout_key
+        ):
+            _log.debug(f"Restarting translation of '{self._circuit.name}'")
+            self._start()
+        if num_instructions == self._num_translated:
+            return 0
+        if self._branch is not None:
+            self._branch.erase()
+            self._branch = None
+        start = self._num_translated
+        self._visitor._visit_instructions(self._circuit._data[start:])
+        self._num_translated = num_instructions
+        return num_instructions - start
+
+    def result(self) -> Tuple[Module, List[str]]:
+        """Brings the translation up to date and returns the module with its
+        entry point name, as ``to_qir_module`` does.
+
+        The module belongs to the session and is updated in place by later
+        calls to ``update`` and ``result``.
+        """
+        self.update()
+        if self._output is None:
+            self._output = self._emit_output()
+        if self._branch is None:
+            self._branch = self._visitor._builder.br(self._output)
+        return (self._module, [self._visitor.entry_point])
+
+    def _emit_output(self) -> BasicBlock:
+        context = self._module.context
+        output = BasicBlock(context, "output", self._entry)
+        # The visitor emits through its builder, which stays positioned at
+        # the end of the circuit body.
+        body_builder = self._visitor._builder
+        self._visitor._builder = Builder(context)
+        self._visitor._builder.insert_at_end(output)
+        try:
+            self._visitor.record_output(self._qiskit_module)
+            self._visitor.finalize()
+        finally:
+            self._visitor._builder = body_builder
+        return output
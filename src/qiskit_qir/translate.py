@@ -2,17 +2,114 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 ##
-from qiskit_qir.visitor import BasicQisVisitor
+from qiskit_qir.visitor import (
+    BasicQisVisitor,
+    _SharedBodyQisVisitor,
+    _entry_point,
+)
 from qiskit.circuit.quantumcircuit import QuantumCircuit
-from typing import List, Tuple, Union
-from pyqir import Context, Module, qir_module
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+from pyqir import (
+    BasicBlock,
+    Builder,
+    Context,
+    Module,
+    add_string_attribute,
+    qir_module,
+)
 from qiskit_qir.elements import QiskitModule
 
+if TYPE_CHECKING:
+    from qiskit_qir.memory import MemoryProfiler, MemoryUsage
+
+
+class TranslationReport:
+    """Summary of a ``to_qir_module`` call, returned when ``return_report=True``."""
+
+    def __init__(self, num_circuits: int):
+        self.num_circuits = num_circuits
+        self.num_deduplicated = 0
+        self.body_functions: Dict[str, List[int]] = {}
+        self.qubit_maps: List[Dict[int, int]] = []
+        self.result_maps: List[Dict[int, int]] = []
+        self.parameters: List[List[str]] = []
+        self.entry_point_metadata: Dict[str, Dict[str, Any]] = {}
+        self.memory: List["MemoryUsage"] = []
+        self.circuit_memory: List["MemoryUsage"] = []
+        self.entry_point_names: Dict[int, str] = {}
+
+
+class _EntryPointNames:
+    """Assigns every circuit of a batch a unique entry point name.
+
+    A repeated name gets the lowest ``.<n>`` suffix not yet used for it,
+    skipping names that are already taken, so each name is chosen in
+    amortized constant time and does not depend on LLVM renaming clashes.
+    """
+
+    def __init__(self):
+        self._used = set()
+        self._next_suffix: Dict[str, int] = {}
+
+    def unique(self, name: str) -> str:
+        if name in self._used:
+            suffix = self._next_suffix.get(name, 1)
+            while f"{name}.{suffix}" in self._used:
+                suffix += 1
+            self._next_suffix[name] = suffix + 1
+            name = f"{name}.{suffix}"
+        self._used.add(name)
+        return name
+
+
+def _entry_point_metadata(
+    circuit: QuantumCircuit, fingerprint: bytes, profile: str, **kwargs
+) -> Dict[str, Any]:
+    from qiskit_qir.resources import ResourceCountingVisitor
+
+    visitor = ResourceCountingVisitor(profile, **kwargs)
+    visitor.visit_circuit_data(circuit)
+    estimate = visitor.estimate
+    metadata = {
+        "gate_counts": estimate.gate_counts,
+        "two_qubit_gate_count": estimate.two_qubit_gate_count,
+        "measurement_count": estimate.measurement_count,
+        "branch_count": estimate.branches,
+        "structural_hash": fingerprint.hex(),
+    }
+    if estimate.duration is not None:
+        metadata["estimated_duration"] = estimate.duration
+    return metadata
+
+
+def _metadata_attribute(value) -> str:
+    if isinstance(value, dict):
+        return ",".join(f"{key}:{count}" for key, count in sorted(value.items()))
+    return str(value)
+
+
+def _emit_entry_point_wrapper(
+    llvm_module: Module, name: str, body_visitor: BasicQisVisitor
+) -> str:
+    context = llvm_module.context
+    entry = _entry_point(
+        llvm_module,
+        name,
+        body_visitor.num_qubits,
+        body_visitor.num_results,
+        len(body_visitor.parameters),
+    )
+    builder = Builder(context)
+    builder.insert_at_end(BasicBlock(context, "entry", entry))
+    builder.call(body_visitor.body, entry.params)
+    builder.ret(None)
+    return entry.name
+
 
 def to_qir_module(
     circuits: Union[QuantumCircuit, List[QuantumCircuit]],
     profile: str = "AdaptiveExecution",
-    **kwargs
+    **kwargs,
 ) -> Tuple[Module, List[str]]:
     r"""Converts the Qiskit QuantumCircuit(s) to a QIR Module with
     its entry point names.
@@ -27,15 +124,124 @@ def to_qir_module(
         See below
     :returns:
         Tuple containing the the QIR ``pyqir.Module`` representation of the input and
-        the list of used entry point names generated from the input.
+        the list of used entry point names generated from the input. When
+        ``return_report`` is set, a ``TranslationReport`` is appended to the tuple.
+
+    Circuits with unbound parameters are translated into entry points taking one
+    ``double`` argument per parameter, ordered as in ``circuit.parameters``.
+    Rotation angles must be linear in the parameters.
+
+    Entry points are named after their circuits. Circuits sharing a name get
+    the suffixes ``.1``, ``.2`` and so on in batch order, and
+    ``TranslationReport.entry_point_names`` maps every circuit index to the
+    name of its entry point.
+
+    Concurrent calls from several threads are safe as long as they do not
+    share a ``context``: each call translates with its own visitors, and a
+    pyqir context and the modules created in it must only be used by one
+    thread at a time. ``qiskit_qir.parallel.translate_threaded`` keeps one
+    context per worker thread.
 
     :Keyword Arguments:
         * *record_output* (``bool``) --
           Whether to record output calls for registers, default `True`
         * *emit_barrier_calls* (``bool``) --
           Whether to emit barrier calls in the QIR, default `False`
+        * *condition_lowering* (``str``) --
+          How conditions on classical registers are lowered: ``"nested"``
+          branches once per register bit, ``"compare"`` reads the register
+          into an integer and branches once on its value, default `"nested"`
+        * *deduplicate_circuits* (``bool``) --
+          Whether structurally identical circuits in a batch share a single
+          body function called from thin entry point wrappers, default `False`
+        * *entry_point_metadata* (``bool``) --
+          Whether to attach resource metadata to every entry point as string
+          attributes: ``gate_counts`` (``"gate:count,..."``),
+          ``two_qubit_gate_count``, ``measurement_count``, ``branch_count``,
+          ``structural_hash`` (see ``circuit_fingerprint``) and, with
+          *gate_times*, ``estimated_duration``. The same values are available
+          without parsing the module from
+          ``TranslationReport.entry_point_metadata``, default `False`
+        * *gate_times* (``Dict[str, float]``) --
+          Duration of every emitted QIS operation by gate name, measurements
+          as ``"mz"``, used for the ``estimated_duration`` of the critical
+          path. A missing gate time is reported before any circuit is
+          emitted, default `None`
+        * *memory_profile* (``bool``) --
+          Whether to measure the memory used by translation with
+          ``tracemalloc`` and the process resident set size. The
+          ``TranslationReport`` lists a ``MemoryUsage`` for the
+          ``"prepare"``, ``"metadata"`` and ``"verify"`` phases in ``memory``
+          and one per circuit, named after it, in ``circuit_memory``.
+          Tracing slows translation down considerably and is process-wide,
+          so measurements of concurrent translations include each other,
+          default `False`
+        * *return_report* (``bool``) --
+          Whether to also return a ``TranslationReport``, default `False`
+        * *prune_unused* (``bool``) --
+          Whether to leave idle qubits and classical registers that are never
+          written or read out of the QIR, renumbering the remaining qubits and
+          results compactly. The mappings are available from the
+          ``TranslationReport``, default `False`
+        * *reuse_qubits* (``bool``) --
+          Whether a qubit whose last instruction is a measurement or reset
+          hands its id over to a qubit that is first used later, inserting a
+          reset where needed. Requires
+          ``Capability.QUBIT_USE_AFTER_MEASUREMENT``, default `False`
+        * *angle_precision* (``float``) --
+          When set, rotation angles are snapped to multiples of this value and
+          rotations by a multiple of 2π are not emitted, default `None`
+        * *composite_subroutines* (``bool``) --
+          Whether composite instructions are emitted once per distinct
+          definition as an internal function taking the qubits as arguments
+          and called at every use. Entry points of the same module share these
+          functions. Composite instructions containing measurements,
+          conditions or unbound parameters are always inlined,
+          default `False`
+        * *subroutine_inline_threshold* (``int``) --
+          Composite instructions expanding to at most this many instructions
+          are inlined even when *composite_subroutines* is set, default `8`
+        * *chunk_size* (``int``) --
+          When set, the circuit body is split into internal functions of this
+          many circuit instructions each, called in sequence from the entry
+          point, which keeps the size of each function bounded for
+          verification and backend compilation, default `None`
+        * *max_expansion_depth* (``int``) --
+          When set, composite instructions nested deeper than this many
+          definitions raise a ``ValueError`` instead of being expanded,
+          default `None`
+        * *preflight* (``bool``) --
+          Whether the whole batch is checked with
+          ``qiskit_qir.preflight.validate_batch`` before any circuit is
+          emitted, so that a batch with unsupported gates, capability
+          violations or oversized conditions fails with a
+          ``BatchValidationError`` listing every problem by circuit index,
+          default `False`
+        * *defer_measurements* (``bool``) --
+          Whether terminal measurements are moved to the end of the circuit
+          and emitted together before the output is recorded, see
+          ``qiskit_qir.passes.defer_measurements``, default `False`
+        * *context* (``pyqir.Context``) --
+          The context to create the module in, default a new context
     """
+    profiler = None
+    if kwargs.get("memory_profile", False):
+        from qiskit_qir.memory import MemoryProfiler
 
+        profiler = MemoryProfiler()
+    try:
+        return _translate(circuits, profile, profiler, **kwargs)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+
+
+def _translate(
+    circuits: Union[QuantumCircuit, List[QuantumCircuit]],
+    profile: str,
+    profiler: Optional["MemoryProfiler"],
+    **kwargs,
+) -> Tuple:
     name = "batch"
     if isinstance(circuits, QuantumCircuit):
         name = circuits.name
@@ -52,14 +258,108 @@ def to_qir_module(
     if len(circuits) == 0:
         raise ValueError("No QuantumCircuits provided")
 
-    llvm_module = qir_module(Context(), name)
+    report = TranslationReport(len(circuits))
+    if profiler is not None:
+        profiler.begin("prepare")
+
+    # Optional stages are imported when used, keeping their dependencies off
+    # the import of this module.
+    if kwargs.get("defer_measurements", False):
+        from qiskit_qir.passes import defer_measurements
+
+        circuits = [defer_measurements(circuit) for circuit in circuits]
+
+    if kwargs.get("preflight", False):
+        from qiskit_qir.preflight import validate_batch
+
+        validate_batch(circuits, profile, **kwargs)
+
+    # Group structurally identical circuits. Groups with a single member are
+    # emitted directly as entry points.
+    groups: Dict[bytes, List[int]] = {}
+    fingerprints: List[bytes] = []
+    if kwargs.get("deduplicate_circuits", False) or kwargs.get(
+        "entry_point_metadata", False
+    ):
+        from qiskit_qir.fingerprint import circuit_fingerprint
+
+        fingerprints = [circuit_fingerprint(circuit) for circuit in circuits]
+    if kwargs.get("deduplicate_circuits", False):
+        for index, fingerprint in enumerate(fingerprints):
+            groups.setdefault(fingerprint, []).append(index)
+    shared_groups = {
+        indices[0]: indices for indices in groups.values() if len(indices) > 1
+    }
+    shared_bodies: Dict[int, _SharedBodyQisVisitor] = {}
+    if profiler is not None:
+        report.memory.append(profiler.end())
+
+    metadata: List[Dict[str, Any]] = []
+    if kwargs.get("entry_point_metadata", False):
+        if profiler is not None:
+            profiler.begin("metadata")
+        # Counted without pyqir before any circuit is emitted, so that a
+        # missing gate time fails the batch early.
+        metadata = [
+            _entry_point_metadata(circuit, fingerprints[index], profile, **kwargs)
+            for index, circuit in enumerate(circuits)
+        ]
+        if profiler is not None:
+            report.memory.append(profiler.end())
+
+    context = kwargs.get("context")
+    llvm_module = qir_module(Context() if context is None else context, name)
     entry_points = []
-    for circuit in circuits:
-        module = QiskitModule.from_quantum_circuit(circuit, llvm_module)
-        visitor = BasicQisVisitor(profile, **kwargs)
-        module.accept(visitor)
-        entry_points.append(visitor.entry_point)
+    # Names are made unique up front, so that they can be reported by circuit
+    # index.
+    entry_point_names = _EntryPointNames()
+    for index, circuit in enumerate(circuits):
+        if profiler is not None:
+            profiler.begin(circuit.name)
+        entry_point_name = entry_point_names.unique(circuit.name)
+        if index in shared_groups:
+            module = QiskitModule.from_quantum_circuit(
+                circuit, llvm_module, entry_point_name
+            )
+            visitor = _SharedBodyQisVisitor(profile, **kwargs)
+            module.accept(visitor)
+            report.body_functions[visitor.body.name] = shared_groups[index]
+            report.num_deduplicated += len(shared_groups[index]) - 1
+            for member in shared_groups[index]:
+                shared_bodies[member] = visitor
+        if index in shared_bodies:
+            visitor = shared_bodies[index]
+            entry_points.append(
+                _emit_entry_point_wrapper(llvm_module, entry_point_name, visitor)
+            )
+        else:
+            module = QiskitModule.from_quantum_circuit(
+                circuit, llvm_module, entry_point_name
+            )
+            visitor = BasicQisVisitor(profile, **kwargs)
+            module.accept(visitor)
+            entry_points.append(visitor.entry_point)
+        report.entry_point_names[index] = entry_points[-1]
+        report.qubit_maps.append(visitor.qubit_map)
+        report.result_maps.append(visitor.result_map)
+        report.parameters.append(visitor.parameters)
+        if profiler is not None:
+            report.circuit_memory.append(profiler.end())
+    if metadata:
+        # Attached in one pass over the module functions
+        report.entry_point_metadata = dict(zip(entry_points, metadata))
+        for function in llvm_module.functions:
+            attributes = report.entry_point_metadata.get(function.name)
+            if attributes is not None:
+                for key, value in attributes.items():
+                    add_string_attribute(function, key, _metadata_attribute(value))
+    if profiler is not None:
+        profiler.begin("verify")
     err = llvm_module.verify()
     if err is not None:
         raise Exception(err)
+    if profiler is not None:
+        report.memory.append(profiler.end())
+    if kwargs.get("return_report", False):
+        return (llvm_module, entry_points, report)
     return (llvm_module, entry_points)
@@ -2,11 +2,15 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT License.
 ##
+from collections import deque
+import functools
+import hashlib
 from io import UnsupportedOperation
 import logging
+import math
 from abc import ABCMeta, abstractmethod
 from qiskit import ClassicalRegister, QuantumRegister
-from qiskit.circuit import Qubit, Clbit
+from qiskit.circuit import Qubit, Clbit, ParameterExpression
 from qiskit.circuit.instruction import Instruction
 from qiskit.circuit.bit import Bit
 import pyqir.qis as qis
@@ -18,15 +22,20 @@ from pyqir import (
     Constant,
     Function,
     FunctionType,
+    IntPredicate,
     IntType,
     Linkage,
     Module,
     PointerType,
+    Type,
+    add_string_attribute,
     const,
     entry_point,
     qubit_id,
+    qubit_type,
+    result_type,
 )
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 
 from qiskit_qir.capability import (
     Capability,
@@ -34,6 +43,7 @@ from qiskit_qir.capability import (
     QubitUseAfterMeasurementError,
 )
 from qiskit_qir.elements import QiskitModule
+from qiskit_qir.lowering import LOWERINGS
 
 _log = logging.getLogger(name=__name__)
 
@@ -92,6 +102,263 @@ _NOOP_INSTRUCTIONS = ["delay"]
 
 _SUPPORTED_INSTRUCTIONS = _QUANTUM_INSTRUCTIONS + _NOOP_INSTRUCTIONS
 
+# Gates used by the steps of the lowering table
+_QIS_GATES = {
+    "ccx": qis.ccx,
+    "cx": qis.cx,
+    "cz": qis.cz,
+    "h": qis.h,
+    "s": qis.s,
+    "sdg": qis.s_adj,
+    "swap": qis.swap,
+    "t": qis.t,
+    "tdg": qis.t_adj,
+    "x": qis.x,
+    "y": qis.y,
+    "z": qis.z,
+}
+_QIS_ROTATIONS = {"rx": qis.rx, "ry": qis.ry, "rz": qis.rz}
+
+_MEASUREMENT_INSTRUCTIONS = ["measure", "m", "mz"]
+
+# Instructions a composite instruction may consist of to be emitted as a
+# subroutine taking only qubit arguments
+_SUBROUTINE_INSTRUCTIONS = (
+    frozenset(_QIS_GATES)
+    | frozenset(_QIS_ROTATIONS)
+    | frozenset(LOWERINGS)
+    | {"reset", "barrier", "delay"}
+)
+
+
+def _condition(instruction: Instruction):
+    # Instruction.condition is deprecated since qiskit 1.3 and every access
+    # goes through the deprecation machinery, which costs more than emitting
+    # the gate itself.
+    return getattr(instruction, "_condition", None)
+
+
+def _profile_capabilities(profile: str) -> Capability:
+    value = profile.strip().lower()
+    if "BasicExecution".lower() == value:
+        return Capability.NONE
+    elif "AdaptiveExecution".lower() == value:
+        return Capability.ALL
+    else:
+        raise UnsupportedOperation(f"The supplied profile is not supported: {profile}.")
+
+
+# Ways of lowering a condition on a classical register:
+# - "nested": one nested branch per bit of the register
+# - "compare": read every bit, assemble an integer and branch once on an
+#   integer comparison. Registers wider than 64 bits fall back to "nested".
+_CONDITION_LOWERINGS = ["nested", "compare"]
+_MAX_COMPARE_WIDTH = 64
+
+
+def _entry_point(
+    module: Module,
+    name: str,
+    num_qubits: int,
+    num_results: int,
+    num_parameters: int = 0,
+) -> Function:
+    """Creates an entry point taking one double argument per circuit parameter."""
+    if num_parameters == 0:
+        return entry_point(module, name, num_qubits, num_results)
+    # pyqir.entry_point only creates functions without arguments, so the
+    # attributes it would add are set here directly.
+    context = module.context
+    function = Function(
+        FunctionType(Type.void(context), [Type.double(context)] * num_parameters),
+        Linkage.EXTERNAL,
+        name,
+        module,
+    )
+    add_string_attribute(function, "entry_point", "")
+    add_string_attribute(function, "output_labeling_schema", "")
+    add_string_attribute(function, "qir_profiles", "custom")
+    add_string_attribute(function, "required_num_qubits", str(num_qubits))
+    add_string_attribute(function, "required_num_results", str(num_results))
+    return function
+
+
+def _find_active_bits(circuit):
+    """Returns the qubits and clbits touched by any instruction of the circuit.
+
+    Barriers and delays do not make a qubit active. Classical bits are active
+    when they are written by an instruction or read by a condition.
+    """
+    active_qubits = set()
+    active_clbits = set()
+    for instruction in circuit._data:
+        if instruction.name not in _NOOP_INSTRUCTIONS and instruction.name != "barrier":
+            active_qubits.update(instruction.qubits)
+        active_clbits.update(instruction.clbits)
+        condition = instruction.condition
+        if condition is not None:
+            if isinstance(condition[0], Clbit):
+                active_clbits.add(condition[0])
+            else:
+                active_clbits.update(condition[0])
+    return active_qubits, active_clbits
+
+
+def _assign_physical_qubits(circuit):
+    """Assigns circuit qubits to physical qubit ids, reusing the id of a qubit
+    once its last instruction was an unconditional measurement or reset.
+
+    Returns the assignment and the qubits that need a reset before their first
+    instruction because their id was last used by a measured qubit.
+    """
+    first_use = {}
+    last_use = {}
+    for index, instruction in enumerate(circuit._data):
+        if instruction.name in _NOOP_INSTRUCTIONS or instruction.name == "barrier":
+            continue
+        for bit in instruction.qubits:
+            first_use.setdefault(bit, index)
+            last_use[bit] = index
+
+    starting = {}
+    for bit, index in first_use.items():
+        starting.setdefault(index, []).append(bit)
+
+    assignment = {}
+    needs_reset = set()
+    free = deque()
+    num_physical = 0
+    for index, instruction in enumerate(circuit._data):
+        for bit in starting.get(index, []):
+            if free:
+                assignment[bit], measured = free.popleft()
+                if measured:
+                    needs_reset.add(bit)
+            else:
+                assignment[bit] = num_physical
+                num_physical += 1
+        if instruction.condition is not None or instruction.name not in (
+            "measure",
+            "m",
+            "mz",
+            "reset",
+        ):
+            continue
+        for bit in instruction.qubits:
+            if last_use.get(bit) == index:
+                free.append((assignment[bit], instruction.name != "reset"))
+    return assignment, needs_reset
+
+
+def _branch_on_result(builder: Builder, result, one: bool, visit):
+    if one:
+        qis.if_result(builder, result, one=visit)
+    else:
+        qis.if_result(builder, result, zero=visit)
+
+
+def _check_composite_arity(instruction: Instruction, num_qubits: int, num_clbits: int):
+    definition = instruction.definition
+    if num_qubits != definition.num_qubits:
+        raise ValueError(
+            f"Composite instruction {instruction.name} called with the wrong number of qubits; \
+{definition.num_qubits} expected, {num_qubits} provided"
+        )
+    if num_clbits != definition.num_clbits:
+        raise ValueError(
+            f"Composite instruction {instruction.name} called with the wrong number of classical bits; \
+{definition.num_clbits} expected, {num_clbits} provided"
+        )
+
+
+class _ExpansionFrame:
+    __slots__ = ["definition", "instructions", "steps", "depth", "qubits", "clbits"]
+
+    def __init__(self, definition, qubits, clbits):
+        self.definition = definition
+        self.instructions = iter(definition._data)
+        self.steps = []
+        self.depth = 1
+        # Positions of the definition's bits in the enclosing definition
+        self.qubits = qubits
+        self.clbits = clbits
+
+
+def _expand_composite(
+    instruction: Instruction, is_leaf, expansions: Dict, max_depth=None
+) -> List:
+    """Expands a composite instruction down to the instructions for which
+    ``is_leaf`` holds.
+
+    Returns ``(operation, qubit positions, clbit positions)`` steps, where the
+    positions index the qubits and clbits of ``instruction``. Definitions are
+    walked with an explicit stack, so the nesting depth is not bound by the
+    Python recursion limit but by ``max_depth``, if given. The expansion of
+    every definition met on the way is cached in ``expansions`` as
+    ``(definition, steps, depth)``, keyed by the definition's id; keeping the
+    definition in the cache prevents the id from being reused.
+    """
+
+    def check_depth(name, depth):
+        if max_depth is not None and depth > max_depth:
+            raise ValueError(
+                f"Composite instruction {name} exceeds the maximum expansion depth of {max_depth}."
+            )
+
+    root = instruction.definition
+    cached = expansions.get(id(root))
+    if cached is not None:
+        check_depth(instruction.name, cached[2])
+        return cached[1]
+    check_depth(instruction.name, 1)
+    stack = [_ExpansionFrame(root, None, None)]
+    while True:
+        frame = stack[-1]
+        inner = next(frame.instructions, None)
+        if inner is None:
+            stack.pop()
+            expansions[id(frame.definition)] = (
+                frame.definition,
+                frame.steps,
+                frame.depth,
+            )
+            if not stack:
+                return frame.steps
+            parent = stack[-1]
+            parent.depth = max(parent.depth, frame.depth + 1)
+            parent.steps.extend(
+                (
+                    operation,
+                    [frame.qubits[i] for i in qubits],
+                    [frame.clbits[i] for i in clbits],
+                )
+                for operation, qubits, clbits in frame.steps
+            )
+            continue
+        definition = frame.definition
+        qubits = [definition.find_bit(bit).index for bit in inner.qubits]
+        clbits = [definition.find_bit(bit).index for bit in inner.clbits]
+        operation = inner.operation
+        if is_leaf(operation):
+            frame.steps.append((operation, qubits, clbits))
+            continue
+        _check_composite_arity(operation, len(qubits), len(clbits))
+        cached = expansions.get(id(operation.definition))
+        if cached is None:
+            check_depth(operation.name, len(stack) + 1)
+            stack.append(_ExpansionFrame(operation.definition, qubits, clbits))
+            continue
+        check_depth(operation.name, len(stack) + cached[2])
+        frame.depth = max(frame.depth, cached[2] + 1)
+        frame.steps.extend(
+            (
+                inner_operation,
+                [qubits[i] for i in inner_qubits],
+                [clbits[i] for i in inner_clbits],
+            )
+            for inner_operation, inner_qubits, inner_clbits in cached[1]
+        )
+
 
 class QuantumCircuitElementVisitor(metaclass=ABCMeta):
     @abstractmethod
@@ -102,6 +369,15 @@ class QuantumCircuitElementVisitor(metaclass=ABCMeta):
     def visit_instruction(self, instruction):
         raise NotImplementedError
 
+    def visit_circuit_data(self, circuit):
+        """Visits the registers and then the instructions of a circuit."""
+        for register in circuit.qregs:
+            self.visit_register(register)
+        for register in circuit.cregs:
+            self.visit_register(register)
+        for instruction, qargs, cargs in circuit._data:
+            self.visit_instruction(instruction, qargs, cargs)
+
 
 class BasicQisVisitor(QuantumCircuitElementVisitor):
     def __init__(self, profile: str = "AdaptiveExecution", **kwargs):
@@ -116,6 +392,53 @@ class BasicQisVisitor(QuantumCircuitElementVisitor):
         self._measured_qubits = {}
         self._emit_barrier_calls = kwargs.get("emit_barrier_calls", False)
         self._record_output = kwargs.get("record_output", True)
+        self._condition_lowering = kwargs.get("condition_lowering", "nested")
+        if self._condition_lowering not in _CONDITION_LOWERINGS:
+            raise ValueError(
+                f"Condition lowering {self._condition_lowering} is not supported. \
+    Please use one of: {_CONDITION_LOWERINGS}."
+            )
+        self._declarations = {}
+        self._parameters = []
+        self._parameter_arguments = {}
+        self._prune_unused = kwargs.get("prune_unused", False)
+        self._active_qubits = None
+        self._active_cregs = None
+        self._num_qubits = 0
+        self._num_results = 0
+        self._output_reg_sizes = []
+        self._num_visited_qubits = 0
+        self._num_visited_clbits = 0
+        self._qubit_map = {}
+        self._result_map = {}
+        self._reuse_qubits = kwargs.get("reuse_qubits", False)
+        if (
+            self._reuse_qubits
+            and not self._capabilities & Capability.QUBIT_USE_AFTER_MEASUREMENT
+        ):
+            raise ValueError(
+                "Qubit reuse requires Capability.QUBIT_USE_AFTER_MEASUREMENT"
+            )
+        self._qubit_assignment = None
+        self._pending_resets = set()
+        self._angle_precision = kwargs.get("angle_precision", None)
+        if self._angle_precision is not None and not self._angle_precision > 0:
+            raise ValueError(
+                f"Angle precision must be positive, got {self._angle_precision}."
+            )
+        self._angles = {}
+        self._emitters = {}
+        self._expansions = {}
+        self._composite_subroutines = kwargs.get("composite_subroutines", False)
+        self._subroutine_inline_threshold = kwargs.get("subroutine_inline_threshold", 8)
+        self._chunk_size = kwargs.get("chunk_size", None)
+        if self._chunk_size is not None and self._chunk_size < 1:
+            raise ValueError(f"Chunk size must be at least 1, got {self._chunk_size}.")
+        self._max_expansion_depth = kwargs.get("max_expansion_depth", None)
+        if self._max_expansion_depth is not None and self._max_expansion_depth < 1:
+            raise ValueError(
+                f"Maximum expansion depth must be at least 1, got {self._max_expansion_depth}."
+            )
 
     def visit_qiskit_module(self, module: QiskitModule):
         _log.debug(
@@ -123,10 +446,20 @@ class BasicQisVisitor(QuantumCircuitElementVisitor):
         )
         self._module = module.module
         self._qiskitModule = module
+        self._num_qubits = module.num_qubits
+        self._num_results = module.num_clbits
+        self._output_reg_sizes = module.reg_sizes
+        self._parameters = list(module.circuit.parameters)
+        if self._prune_unused:
+            self._prune(module)
+        if self._reuse_qubits:
+            self._qubit_assignment, self._pending_resets = _assign_physical_qubits(
+                module.circuit
+            )
+            self._num_qubits = len(set(self._qubit_assignment.values()))
         context = self._module.context
-        entry = entry_point(
-            self._module, module.name, module.num_qubits, module.num_clbits
-        )
+        entry = self._create_function(module)
+        self._parameter_arguments = dict(zip(self._parameters, entry.params))
 
         self._entry_point = entry.name
         self._builder = Builder(context)
@@ -135,11 +468,107 @@ class BasicQisVisitor(QuantumCircuitElementVisitor):
         i8p = PointerType(IntType(context, 8))
         nullptr = Constant.null(i8p)
         rt.initialize(self._builder, nullptr)
+        self._emitters = self._build_emitters()
+
+    def _build_emitters(self):
+        # Emitters take (visitor, instruction, qubits, results) and are
+        # resolved once per module rather than by comparing names for every
+        # instruction. They do not close over the visitor: a reference cycle
+        # would leave the pyqir objects of the visitor to the garbage
+        # collector, which may run on another thread than the one that
+        # created them.
+        builder = self._builder
+        visitor_type = type(self)
+        emitters = {}
+        for name, gate in _QIS_GATES.items():
+            emitters[name] = (
+                lambda visitor, instruction, qubits, results, gate=gate: gate(
+                    builder, *qubits
+                )
+            )
+        for name, gate in _QIS_ROTATIONS.items():
+            emitters[name] = lambda visitor, instruction, qubits, results, gate=gate: (
+                visitor._emit_rotation(gate, *instruction.params, *qubits)
+            )
+        for name, steps in LOWERINGS.items():
+            emitters[name] = (
+                lambda visitor, instruction, qubits, results, steps=steps: (
+                    visitor._emit_lowering(steps, instruction.params, qubits)
+                )
+            )
+        for name in _MEASUREMENT_INSTRUCTIONS:
+            emitters[name] = visitor_type._emit_measurement
+        emitters["reset"] = lambda visitor, instruction, qubits, results: qis.reset(
+            builder, qubits[0]
+        )
+        emitters["id"] = visitor_type._emit_identity
+        emitters["barrier"] = visitor_type._emit_barrier
+        emitters["delay"] = lambda visitor, instruction, qubits, results: None
+        return emitters
+
+    def _create_function(self, module: QiskitModule) -> Function:
+        return _entry_point(
+            self._module,
+            module.name,
+            self._num_qubits,
+            self._num_results,
+            len(self._parameters),
+        )
+
+    def _prune(self, module: QiskitModule):
+        # Only active qubits get labels, and classical registers without any
+        # active bit are dropped from both the results and the recorded output.
+        circuit = module.circuit
+        active_qubits, active_clbits = _find_active_bits(circuit)
+        self._active_qubits = active_qubits
+        self._active_cregs = {
+            creg for creg in circuit.cregs if any(bit in active_clbits for bit in creg)
+        }
+        self._num_qubits = sum(
+            1 for qreg in circuit.qregs for bit in qreg if bit in active_qubits
+        )
+        self._output_reg_sizes = [
+            len(creg) for creg in circuit.cregs if creg in self._active_cregs
+        ]
+        self._num_results = sum(self._output_reg_sizes)
+        _log.debug(
+            f"Pruned module '{module.name}' to ({self._num_qubits}, {self._num_results})"
+        )
 
     @property
     def entry_point(self) -> str:
         return self._entry_point
 
+    @property
+    def num_qubits(self) -> int:
+        return self._num_qubits
+
+    @property
+    def num_results(self) -> int:
+        return self._num_results
+
+    @property
+    def parameters(self) -> List[str]:
+        """Names of the circuit parameters, in the order of the entry point
+        arguments."""
+        return [parameter.name for parameter in self._parameters]
+
+    @property
+    def qubit_map(self) -> Dict[int, int]:
+        """Maps qubit indices of the circuit to the qubit ids used in the QIR.
+
+        Only populated when pruning unused bits or reusing qubits.
+        """
+        return self._qubit_map
+
+    @property
+    def result_map(self) -> Dict[int, int]:
+        """Maps clbit indices of the circuit to the result ids used in the QIR.
+
+        Only populated when pruning unused bits or reusing qubits.
+        """
+        return self._result_map
+
     def finalize(self):
         self._builder.ret(None)
 
@@ -155,7 +584,7 @@ class BasicQisVisitor(QuantumCircuitElementVisitor):
         # invert the register output. The second parameter is an exclusive
         # range so we need to go to -1 instead of 0
         logical_id_base = 0
-        for size in module.reg_sizes:
+        for size in self._output_reg_sizes:
             rt.array_record_output(
                 self._builder,
                 const(IntType(self._module.context, 64), size),
@@ -168,7 +597,9 @@ class BasicQisVisitor(QuantumCircuitElementVisitor):
 
     def visit_register(self, register):
         _log.debug(f"Visiting register '{register.name}'")
-        if isinstance(register, QuantumRegister):
+        if self._prune_unused or self._reuse_qubits:
+            self._visit_pruned_register(register)
+        elif isinstance(register, QuantumRegister):
             self._qubit_labels.update(
                 {bit: n + len(self._qubit_labels) for n, bit in enumerate(register)}
             )
@@ -182,31 +613,132 @@ class BasicQisVisitor(QuantumCircuitElementVisitor):
         else:
             raise ValueError(f"Register of type {type(register)} not supported.")
 
+    def _visit_pruned_register(self, register):
+        if isinstance(register, QuantumRegister):
+            for bit in register:
+                if self._qubit_assignment is not None:
+                    label = self._qubit_assignment.get(bit)
+                elif bit in self._active_qubits:
+                    label = len(self._qubit_labels)
+                else:
+                    label = None
+                if label is not None:
+                    self._qubit_labels[bit] = label
+                    self._qubit_map[self._num_visited_qubits] = label
+                self._num_visited_qubits += 1
+        elif isinstance(register, ClassicalRegister):
+            for bit in register:
+                if self._active_cregs is None or register in self._active_cregs:
+                    label = len(self._clbit_labels)
+                    self._clbit_labels[bit] = label
+                    self._result_map[self._num_visited_clbits] = label
+                self._num_visited_clbits += 1
+        else:
+            raise ValueError(f"Register of type {type(register)} not supported.")
+
     def process_composite_instruction(
         self, instruction: Instruction, qargs: List[Qubit], cargs: List[Clbit]
     ):
-        subcircuit = instruction.definition
         _log.debug(
             f"Processing composite instruction {instruction.name} with qubits {qargs}"
         )
-        if len(qargs) != subcircuit.num_qubits:
-            raise ValueError(
-                f"Composite instruction {instruction.name} called with the wrong number of qubits; \
-{subcircuit.num_qubits} expected, {len(qargs)} provided"
-            )
-        if len(cargs) != subcircuit.num_clbits:
-            raise ValueError(
-                f"Composite instruction {instruction.name} called with the wrong number of classical bits; \
-{subcircuit.num_clbits} expected, {len(cargs)} provided"
-            )
-        for inst, i_qargs, i_cargs in subcircuit.data:
-            mapped_qbits = [qargs[subcircuit.qubits.index(i)] for i in i_qargs]
-            mapped_clbits = [cargs[subcircuit.clbits.index(i)] for i in i_cargs]
+        _check_composite_arity(instruction, len(qargs), len(cargs))
+        # Nested composite instructions are expanded up front, only the
+        # instructions visit_instruction emits directly are visited.
+        steps = _expand_composite(
+            instruction, self._is_leaf, self._expansions, self._max_expansion_depth
+        )
+        if (
+            self._composite_subroutines
+            and len(steps) > self._subroutine_inline_threshold
+        ):
+            subroutine = self._subroutine(instruction, qargs, steps)
+            if subroutine is not None:
+                context = self._module.context
+                self._builder.call(
+                    subroutine,
+                    [pyqir.qubit(context, self._qubit_labels[bit]) for bit in qargs],
+                )
+                return
+        for inst, qubits, clbits in steps:
+            mapped_qbits = [qargs[i] for i in qubits]
+            mapped_clbits = [cargs[i] for i in clbits]
             _log.debug(
                 f"Processing sub-instruction {inst.name} with mapped qubits {mapped_qbits}"
             )
             self.visit_instruction(inst, mapped_qbits, mapped_clbits)
 
+    def _subroutine(
+        self, instruction: Instruction, qargs: List[Qubit], steps: List
+    ) -> Optional[Function]:
+        # Returns the internal function applying the steps to its qubit
+        # arguments, or None when they have to be inlined. Functions are
+        # named after a digest of what they emit, so entry points of the same
+        # module share them.
+        if not self._capabilities & Capability.QUBIT_USE_AFTER_MEASUREMENT and any(
+            self._measured_qubits.get(self._qubit_labels[bit]) for bit in qargs
+        ):
+            # Inlining raises the error for the step using the measured qubit
+            return None
+        key = [
+            len(qargs),
+            self._angle_precision,
+            self._emit_barrier_calls,
+        ]
+        for operation, qubits, _ in steps:
+            if (
+                operation.name not in _SUBROUTINE_INSTRUCTIONS
+                or _condition(operation) is not None
+            ):
+                return None
+            try:
+                params = [float(param) for param in operation.params]
+            except TypeError:
+                # Unbound parameters are only available in the entry point
+                return None
+            key.append((operation.name, qubits, params))
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
+        name = f"{instruction.name}__{digest}"
+        function = self._declarations.get(name)
+        if function is None:
+            function = next((f for f in self._module.functions if f.name == name), None)
+            if function is None:
+                function = self._emit_subroutine(name, len(qargs), steps)
+            self._declarations[name] = function
+        return function
+
+    def _emit_subroutine(self, name: str, num_qubits: int, steps: List) -> Function:
+        context = self._module.context
+        function = Function(
+            FunctionType(Type.void(context), [qubit_type(context)] * num_qubits),
+            Linkage.INTERNAL,
+            name,
+            self._module,
+        )
+        _log.debug(f"Emitting subroutine '{name}'")
+        # The emitters capture the builder they emit with, the ones of the
+        # entry point are restored afterwards.
+        entry_builder = self._builder
+        self._builder = Builder(context)
+        self._builder.insert_at_end(BasicBlock(context, "entry", function))
+        try:
+            emitters = self._build_emitters()
+            for operation, qubits, _ in steps:
+                emitters[operation.name](
+                    self, operation, [function.params[i] for i in qubits], []
+                )
+            self._builder.ret(None)
+        finally:
+            self._builder = entry_builder
+        return function
+
+    def _is_leaf(self, instruction: Instruction) -> bool:
+        return (
+            _condition(instruction) is not None
+            or instruction.name in self._emitters
+            or not instruction.definition
+        )
+
     def visit_instruction(
         self,
         instruction: Instruction,
@@ -216,32 +748,49 @@ class BasicQisVisitor(QuantumCircuitElementVisitor):
     ):
         qlabels = [self._qubit_labels.get(bit) for bit in qargs]
         clabels = [self._clbit_labels.get(bit) for bit in cargs]
-        qubits = [pyqir.qubit(self._module.context, n) for n in qlabels]
+        # Qubits pruned away can still be listed by barriers and delays
+        qubits = [
+            pyqir.qubit(self._module.context, n) for n in qlabels if n is not None
+        ]
         results = [pyqir.result(self._module.context, n) for n in clabels]
 
+        if self._pending_resets and instruction.name != "barrier":
+            # The qubit id was released by a measured qubit and has to be
+            # returned to |0> before this qubit's first instruction.
+            for bit in qargs:
+                if bit in self._pending_resets:
+                    self._pending_resets.discard(bit)
+                    qis.reset(
+                        self._builder,
+                        pyqir.qubit(self._module.context, self._qubit_labels[bit]),
+                    )
+
+        condition = _condition(instruction)
         if (
-            instruction.condition is not None
+            condition is not None
         ) and not self._capabilities & Capability.CONDITIONAL_BRANCHING_ON_RESULT:
             raise ConditionalBranchingOnResultError(
                 self._qiskitModule.circuit, instruction, qargs, cargs, self._profile
             )
 
-        labels = ", ".join([str(l) for l in qlabels + clabels])
-        if instruction.condition is None or skip_condition:
-            _log.debug(f"Visiting instruction '{instruction.name}' ({labels})")
+        if _log.isEnabledFor(logging.DEBUG):
+            labels = ", ".join([str(l) for l in qlabels + clabels])
+            if condition is None or skip_condition:
+                _log.debug(f"Visiting instruction '{instruction.name}' ({labels})")
+            else:
+                _log.debug(
+                    f"Visiting condition for instruction '{instruction.name}' ({labels})"
+                )
 
-        if instruction.condition is not None and skip_condition is False:
-            _log.debug(
-                f"Visiting condition for instruction '{instruction.name}' ({labels})"
-            )
+        if condition is not None and skip_condition is False:
 
-            if isinstance(instruction.condition[0], Clbit):
-                bit_label = self._clbit_labels.get(instruction.condition[0])
+            if isinstance(condition[0], Clbit):
+                bit_label = self._clbit_labels.get(condition[0])
                 conditions = [pyqir.result(self._module.context, bit_label)]
             else:
                 conditions = [
                     pyqir.result(self._module.context, self._clbit_labels.get(bit))
-                    for bit in instruction.condition[0]
+                    for bit in condition[0]
                 ]
 
             # Convert value into a bitstring of the same length as classical register
@@ -249,62 +798,53 @@ class BasicQisVisitor(QuantumCircuitElementVisitor):
             # - tuple (ClassicalRegister, int)
             # - tuple (Clbit, bool)
             # - tuple (Clbit, int)
-            if isinstance(instruction.condition[0], Clbit):
-                bit: Clbit = instruction.condition[0]
-                value: Union[int, bool] = instruction.condition[1]
+            if isinstance(condition[0], Clbit):
+                bit: Clbit = condition[0]
+                value: Union[int, bool] = condition[1]
                 if value:
                     values = "1"
                 else:
                     values = "0"
             else:
-                register: ClassicalRegister = instruction.condition[0]
-                value: int = instruction.condition[1]
+                register: ClassicalRegister = condition[0]
+                value: int = condition[1]
                 values = format(value, f"0{register.size}b")
 
-            # Add branches recursively for each bit in the bitstring
             def __visit():
                 self.visit_instruction(instruction, qargs, cargs, skip_condition=True)
 
-            def _branch(conditions_values):
-                try:
-                    cond, val = next(conditions_values)
-
-                    def __branch():
-                        qis.if_result(
-                            self._builder,
-                            cond,
-                            one=_branch(conditions_values) if val == "1" else None,
-                            zero=_branch(conditions_values) if val == "0" else None,
-                        )
-
-                except StopIteration:
-                    return __visit
-                else:
-                    return __branch
-
             if len(conditions) < len(values):
                 raise ValueError(
                     f"Value {value} is larger than register width {len(conditions)}."
                 )
 
-            # qiskit has the most significant bit on the right, so we
-            # must reverse the bit array for comparisons.
-            _branch(zip(conditions, values[::-1]))()
-        elif (
-            "measure" == instruction.name
-            or "m" == instruction.name
-            or "mz" == instruction.name
-        ):
-            for qubit, result in zip(qubits, results):
-                self._measured_qubits[qubit_id(qubit)] = True
-                qis.mz(self._builder, qubit, result)
+            if (
+                self._condition_lowering == "compare"
+                and 1 < len(conditions) <= _MAX_COMPARE_WIDTH
+            ):
+                self._branch_on_register_value(conditions, value, __visit)
+            else:
+                # One nested branch per bit, built from the innermost one
+                # outwards. qiskit has the most significant bit on the right,
+                # so we must reverse the bit array for comparisons.
+                branch = __visit
+                for cond, val in reversed(list(zip(conditions, values[::-1]))):
+                    branch = functools.partial(
+                        _branch_on_result, self._builder, cond, val == "1", branch
+                    )
+                branch()
+        elif instruction.name in _MEASUREMENT_INSTRUCTIONS:
+            self._emit_measurement(instruction, qubits, results)
         else:
             if not self._capabilities & Capability.QUBIT_USE_AFTER_MEASUREMENT:
                 # If we have a supported instruction, apply the capability
                 # check. If we have a composite instruction then it will call
                 # back into this function with a supported name and we'll
                 # verify at that time
-                if instruction.name in _SUPPORTED_INSTRUCTIONS:
+                if (
+                    instruction.name in _SUPPORTED_INSTRUCTIONS
+                    or instruction.name in LOWERINGS
+                ):
                     if any(map(self._measured_qubits.get, map(qubit_id, qubits))):
                         raise QubitUseAfterMeasurementError(
                             self._qiskitModule.circuit,
@@ -313,48 +853,9 @@ class BasicQisVisitor(QuantumCircuitElementVisitor):
                             cargs,
                             self._profile,
                         )
-            if "barrier" == instruction.name:
-                if self._emit_barrier_calls:
-                    qis.barrier(self._builder)
-            elif "delay" == instruction.name:
-                pass
-            elif "swap" == instruction.name:
-                qis.swap(self._builder, *qubits)
-            elif "ccx" == instruction.name:
-                qis.ccx(self._builder, *qubits)
-            elif "cx" == instruction.name:
-                qis.cx(self._builder, *qubits)
-            elif "cz" == instruction.name:
-                qis.cz(self._builder, *qubits)
-            elif "h" == instruction.name:
-                qis.h(self._builder, *qubits)
-            elif "reset" == instruction.name:
-                qis.reset(self._builder, qubits[0])
-            elif "rx" == instruction.name:
-                qis.rx(self._builder, *instruction.params, *qubits)
-            elif "ry" == instruction.name:
-                qis.ry(self._builder, *instruction.params, *qubits)
-            elif "rz" == instruction.name:
-                qis.rz(self._builder, *instruction.params, *qubits)
-            elif "s" == instruction.name:
-                qis.s(self._builder, *qubits)
-            elif "sdg" == instruction.name:
-                qis.s_adj(self._builder, *qubits)
-            elif "t" == instruction.name:
-                qis.t(self._builder, *qubits)
-            elif "tdg" == instruction.name:
-                qis.t_adj(self._builder, *qubits)
-            elif "x" == instruction.name:
-                qis.x(self._builder, *qubits)
-            elif "y" == instruction.name:
-                qis.y(self._builder, *qubits)
-            elif "z" == instruction.name:
-                qis.z(self._builder, *qubits)
-            elif "id" == instruction.name:
-                # See: https://github.com/qir-alliance/pyqir/issues/74
-                qubit = pyqir.qubit(self._module.context, qubit_id(*qubits))
-                qis.x(self._builder, qubit)
-                qis.x(self._builder, qubit)
+            emitter = self._emitters.get(instruction.name)
+            if emitter is not None:
+                emitter(self, instruction, qubits, results)
             elif instruction.definition:
                 _log.debug(
                     f"About to process composite instruction {instruction.name} with qubits {qargs}"
@@ -366,6 +867,212 @@ class BasicQisVisitor(QuantumCircuitElementVisitor):
     Please transpile using the list of supported gates: {_SUPPORTED_INSTRUCTIONS}."
                 )
 
+    def visit_circuit_data(self, circuit):
+        fused = type(self).visit_instruction is BasicQisVisitor.visit_instruction
+        if not fused and self._chunk_size is None:
+            # Subclasses customising visit_instruction get every instruction
+            super().visit_circuit_data(circuit)
+            return
+        for register in circuit.qregs:
+            self.visit_register(register)
+        for register in circuit.cregs:
+            self.visit_register(register)
+        visit = self._visit_instructions if fused else self._visit_each_instruction
+        if self._chunk_size is None:
+            visit(circuit._data)
+            return
+        for start in range(0, len(circuit._data), self._chunk_size):
+            self._visit_chunk(
+                circuit._data[start : start + self._chunk_size],
+                start // self._chunk_size,
+                visit,
+            )
+
+    def _visit_each_instruction(self, instructions):
+        for instruction, qargs, cargs in instructions:
+            self.visit_instruction(instruction, qargs, cargs)
+
+    def _visit_chunk(self, instructions, index: int, visit):
+        # Emits the instructions into an internal function taking the same
+        # arguments as the entry point, and calls it from the entry point.
+        # Emitters, the builder and the parameter values are switched to the
+        # chunk's own while it is emitted.
+        context = self._module.context
+        arguments = [self._parameter_arguments[p] for p in self._parameters]
+        chunk = Function(
+            FunctionType(Type.void(context), [Type.double(context)] * len(arguments)),
+            Linkage.INTERNAL,
+            f"{self._entry_point}__chunk{index}",
+            self._module,
+        )
+        entry_builder = self._builder
+        entry_emitters = self._emitters
+        entry_parameter_arguments = self._parameter_arguments
+        self._builder = Builder(context)
+        self._builder.insert_at_end(BasicBlock(context, "entry", chunk))
+        self._emitters = self._build_emitters()
+        self._parameter_arguments = dict(zip(self._parameters, chunk.params))
+        try:
+            visit(instructions)
+            self._builder.ret(None)
+        finally:
+            self._builder = entry_builder
+            self._emitters = entry_emitters
+            self._parameter_arguments = entry_parameter_arguments
+        self._builder.call(chunk, arguments)
+
+    def _visit_instructions(self, instructions):
+        # Single pass over the circuit data with the bit values and emitters
+        # resolved up front. Anything needing more than a plain emission
+        # (conditions, composite instructions, pending resets, capability
+        # errors, barriers over pruned qubits) goes through visit_instruction.
+        context = self._module.context
+        labels = self._qubit_labels
+        qubit_values = {bit: pyqir.qubit(context, n) for bit, n in labels.items()}
+        result_values = {
+            bit: pyqir.result(context, n) for bit, n in self._clbit_labels.items()
+        }
+        emitters = {
+            name: emitter
+            for name, emitter in self._emitters.items()
+            if name not in ("barrier", "delay")
+        }
+        measured = self._measured_qubits
+        check_measured = not self._capabilities & Capability.QUBIT_USE_AFTER_MEASUREMENT
+        pending_resets = self._pending_resets
+        for circuit_instruction in instructions:
+            instruction = circuit_instruction.operation
+            qargs = circuit_instruction.qubits
+            emitter = emitters.get(instruction.name)
+            if (
+                emitter is None
+                or pending_resets
+                or _condition(instruction) is not None
+                or (
+                    check_measured
+                    and measured
+                    and any(labels[bit] in measured for bit in qargs)
+                )
+            ):
+                self.visit_instruction(
+                    instruction, list(qargs), list(circuit_instruction.clbits)
+                )
+                continue
+            emitter(
+                self,
+                instruction,
+                [qubit_values[bit] for bit in qargs],
+                [result_values[bit] for bit in circuit_instruction.clbits],
+            )
+
+    def _emit_measurement(self, instruction, qubits, results):
+        for qubit, result in zip(qubits, results):
+            self._measured_qubits[qubit_id(qubit)] = True
+            qis.mz(self._builder, qubit, result)
+
+    def _emit_identity(self, instruction, qubits, results):
+        # See: https://github.com/qir-alliance/pyqir/issues/74
+        qubit = pyqir.qubit(self._module.context, qubit_id(*qubits))
+        qis.x(self._builder, qubit)
+        qis.x(self._builder, qubit)
+
+    def _emit_barrier(self, instruction, qubits, results):
+        if self._emit_barrier_calls:
+            qis.barrier(self._builder)
+
+    def _emit_lowering(self, steps, params, qubits):
+        for gate, indices, angle in steps:
+            if angle is None:
+                _QIS_GATES[gate](self._builder, *[qubits[i] for i in indices])
+            else:
+                self._emit_rotation(
+                    _QIS_ROTATIONS[gate], angle(params), *[qubits[i] for i in indices]
+                )
+
+    def _angle(self, theta: float):
+        # LLVM already uniques floating point constants, interning here saves
+        # creating a new pyqir constant for every rotation.
+        angle = self._angles.get(theta)
+        if angle is None:
+            angle = const(Type.double(self._module.context), theta)
+            self._angles[theta] = angle
+        return angle
+
+    def _emit_rotation(self, gate, theta, qubit):
+        if isinstance(theta, ParameterExpression) and theta.parameters:
+            gate(self._builder, self._parameter_angle(theta), qubit)
+            return
+        theta = float(theta)
+        if self._angle_precision is not None:
+            theta = round(theta / self._angle_precision) * self._angle_precision
+            # Rotations by a multiple of 2π only contribute a global phase
+            if abs(math.remainder(theta, 2 * math.pi)) < self._angle_precision / 2:
+                return
+        gate(self._builder, self._angle(theta), qubit)
+
+    def _parameter_angle(self, expression: ParameterExpression):
+        # Angles are computed at runtime from the entry point arguments as
+        # offset + sum(coefficient * parameter), which covers linear
+        # expressions only.
+        offset = float(expression.bind({p: 0 for p in expression.parameters}))
+        terms = []
+        for parameter in sorted(expression.parameters, key=lambda p: p.name):
+            coefficient = expression.gradient(parameter)
+            if isinstance(coefficient, ParameterExpression):
+                if coefficient.parameters:
+                    raise ValueError(
+                        f"Angle {expression} is not linear in its parameters."
+                    )
+                coefficient = float(coefficient)
+            terms.append((coefficient, self._parameter_arguments[parameter]))
+        if offset == 0.0 and len(terms) == 1 and terms[0][0] == 1.0:
+            return terms[0][1]
+        context = self._module.context
+        double = Type.double(context)
+        fmuladd = self._declare(
+            "llvm.fmuladd.f64", FunctionType(double, [double, double, double])
+        )
+        angle = self._angle(offset)
+        for coefficient, argument in terms:
+            angle = self._builder.call(
+                fmuladd, [self._angle(coefficient), argument, angle]
+            )
+        return angle
+
+    def _declare(self, name: str, function_type: FunctionType) -> Function:
+        # Reuse declarations that pyqir or previous entry points already added
+        # to the module, a second declaration would be renamed by LLVM.
+        function = self._declarations.get(name)
+        if function is None:
+            function = next((f for f in self._module.functions if f.name == name), None)
+            if function is None:
+                function = Function(function_type, Linkage.EXTERNAL, name, self._module)
+            self._declarations[name] = function
+        return function
+
+    def _branch_on_register_value(self, conditions, value: int, visit):
+        # Bit i of the register becomes bit i of the integer, matching the
+        # little-endian ordering qiskit uses for register values.
+        width = IntType(self._module.context, len(conditions))
+        read_result = self._declare(
+            "__quantum__qis__read_result__body",
+            FunctionType(
+                IntType(self._module.context, 1), [result_type(self._module.context)]
+            ),
+        )
+        register_value = None
+        for index, result in enumerate(conditions):
+            bit = self._builder.zext(self._builder.call(read_result, [result]), width)
+            if index > 0:
+                bit = self._builder.shl(bit, const(width, index))
+            register_value = (
+                bit
+                if register_value is None
+                else self._builder.or_(register_value, bit)
+            )
+        cond = self._builder.icmp(IntPredicate.EQ, register_value, const(width, value))
+        self._builder.if_(cond, true=visit)
+
     def ir(self) -> str:
         return str(self._module)
 
@@ -373,12 +1080,21 @@ class BasicQisVisitor(QuantumCircuitElementVisitor):
         return self._module.bitcode()
 
     def _map_profile_to_capabilities(self, profile: str):
-        value = profile.strip().lower()
-        if "BasicExecution".lower() == value:
-            return Capability.NONE
-        elif "AdaptiveExecution".lower() == value:
-            return Capability.ALL
-        else:
-            raise UnsupportedOperation(
-                f"The supplied profile is not supported: {profile}."
-            )
+        return _profile_capabilities(profile)
+
+
+class _SharedBodyQisVisitor(BasicQisVisitor):
+    """Emits the circuit body into an internal function instead of an entry
+    point so that several entry points can call into the same body."""
+
+    def _create_function(self, module: QiskitModule) -> Function:
+        context = self._module.context
+        self.body = Function(
+            FunctionType(
+                Type.void(context), [Type.double(context)] * len(self._parameters)
+            ),
+            Linkage.INTERNAL,
+            f"{module.name}__body",
+            self._module,
+        )
+        return self.body
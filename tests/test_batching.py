@@ -74,6 +74,31 @@ def test_batch_entry_points_make_unique_names_on_duplicates() -> None:
     assert entry_points == list([x.name for x in functions])
 
 
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"deduplicate_circuits": True},
+    ],
+)
+def test_batch_entry_point_names_are_reported_by_index(options) -> None:
+    names = ["a", "a", "a.1", "b", "a", "a.1"]
+    circuits = []
+    for name in names:
+        circuit = QuantumCircuit(1, 1, name=name)
+        circuit.h(0)
+        circuit.measure(0, 0)
+        circuits.append(circuit)
+    module, entry_points, report = to_qir_module(
+        circuits, return_report=True, **options
+    )
+    expected = ["a", "a.1", "a.1.1", "b", "a.2", "a.1.2"]
+    assert entry_points == expected
+    assert report.entry_point_names == dict(enumerate(expected))
+    functions = [f.name for f in filter(is_entry_point, module.functions)]
+    assert sorted(functions) == sorted(expected)
+
+
 def test_batch_entry_points_have_appropriate_attributes() -> None:
     qc1 = QuantumCircuit(1, 2, name="first")
     qc2 = QuantumCircuit(1, name="second")
@@ -111,3 +136,89 @@ def test_passing_non_quantum_circuits_raises_value_error() -> None:
 def test_passing_empty_list_of_quantum_circuits_raises_value_error() -> None:
     with pytest.raises(ValueError):
         _ = to_qir_module(list([]))
+
+
+def test_deduplication_shares_body_between_identical_circuits() -> None:
+    circuits = get_parameterized_circuit(2, 3)
+    circuits += [circuits[0].copy(name="retry"), circuits[1].copy(name="retry")]
+    module, entry_points, report = to_qir_module(
+        circuits, deduplicate_circuits=True, return_report=True
+    )
+    mod = Module.from_bitcode(Context(), module.bitcode)
+    functions = list(filter(is_entry_point, mod.functions))
+    assert len(functions) == 5
+    assert entry_points == list([x.name for x in functions])
+    assert report.num_deduplicated == 2
+    assert len(report.body_functions) == 2
+    assert sorted(report.body_functions.values()) == [[0, 3], [1, 4]]
+    for function in functions:
+        test_utils.check_attributes_on_entrypoint(function, 2, 1)
+    body_names = set(report.body_functions)
+    bodies = [f for f in mod.functions if f.name in body_names]
+    assert len(bodies) == 2
+    assert "call void @" + bodies[0].name + "()" in str(functions[0]) + str(
+        functions[1]
+    )
+
+
+def test_deduplication_keeps_distinct_circuits_separate() -> None:
+    qc1 = QuantumCircuit(1, 1, name="first")
+    qc1.x(0)
+    qc2 = QuantumCircuit(1, 1, name="second")
+    qc2.y(0)
+    qc3 = QuantumCircuit(1, 2, name="third")
+    qc3.x(0)
+    module, entry_points, report = to_qir_module(
+        [qc1, qc2, qc3], deduplicate_circuits=True, return_report=True
+    )
+    assert report.num_deduplicated == 0
+    assert report.body_functions == {}
+    assert len(entry_points) == 3
+
+
+def get_unbound_circuit(num_qubits: int) -> QuantumCircuit:
+    theta = Parameter("θ")
+    phi = Parameter("φ")
+    circuit = QuantumCircuit(num_qubits, 1, name="unbound")
+    circuit.h(0)
+    circuit.rz(theta, range(num_qubits))
+    circuit.rx(2 * theta - phi / 2 + 1, 0)
+    circuit.measure(0, 0)
+    return circuit
+
+
+def test_unbound_parameters_become_entry_point_arguments() -> None:
+    module, entry_points, report = to_qir_module(
+        get_unbound_circuit(2), return_report=True
+    )
+    mod = Module.from_bitcode(Context(), module.bitcode)
+    functions = list(filter(is_entry_point, mod.functions))
+    assert len(functions) == 1
+    test_utils.check_attributes_on_entrypoint(functions[0], 2, 1)
+    assert len(functions[0].params) == 2
+    assert report.parameters == [["θ", "φ"]]
+
+    ir = str(functions[0])
+    assert "define void @unbound(double %0, double %1)" in ir
+    assert "call void @__quantum__qis__rz__body(double %0, %Qubit* null)" in ir
+    assert ir.count("call double @llvm.fmuladd.f64") == 2
+
+
+def test_unbound_parameters_with_deduplication() -> None:
+    circuits = [get_unbound_circuit(2), get_unbound_circuit(2)]
+    module, entry_points, report = to_qir_module(
+        circuits, deduplicate_circuits=True, return_report=True
+    )
+    assert report.num_deduplicated == 1
+    mod = Module.from_bitcode(Context(), module.bitcode)
+    functions = list(filter(is_entry_point, mod.functions))
+    assert all(len(function.params) == 2 for function in functions)
+    assert "call void @unbound__body(double %0, double %1)" in str(functions[0])
+
+
+def test_nonlinear_parameter_expressions_raise_value_error() -> None:
+    theta = Parameter("θ")
+    circuit = QuantumCircuit(1)
+    circuit.rx(theta * theta, 0)
+    with pytest.raises(ValueError):
+        _ = to_qir_module(circuit)
@@ -216,3 +216,39 @@ def test_two_bit_register_invalid_variations(value: int) -> None:
         _ = circuit.measure(2, 2).c_if(cr, value)
 
     assert exc_info is not None
+
+
+def test_compare_lowering_branches_once_on_wide_register() -> None:
+    circuit = QuantumCircuit(33, 0, name="test_compare_lowering")
+    cr = ClassicalRegister(32, "creg")
+    circuit.add_register(cr)
+    for index in range(32):
+        circuit.measure(index, index)
+    circuit.x(32).c_if(cr, 2**31 + 5)
+
+    ir = str(
+        to_qir_module(circuit, record_output=False, condition_lowering="compare")[0]
+    )
+    assert ir.count("br i1") == 1
+    assert ir.count("call i1 @__quantum__qis__read_result__body") == 32
+    assert "icmp eq i32" in ir
+    assert ir.count("declare i1 @__quantum__qis__read_result__body") == 1
+
+
+def test_compare_lowering_keeps_nested_branches_for_single_bits() -> None:
+    circuit = QuantumCircuit(2, 0, name=f"test_single_clbit_variations")
+    cr = ClassicalRegister(2, "creg")
+    circuit.add_register(cr)
+    circuit.measure(0, 0)
+    circuit.measure(1, 1).c_if(cr[0], True)
+
+    generated_bitcode = to_qir_module(
+        circuit, record_output=False, condition_lowering="compare"
+    )[0].bitcode
+    compare_reference_ir(generated_bitcode, "test_single_clbit_variations_truthy")
+
+
+def test_unknown_condition_lowering_raises_value_error() -> None:
+    circuit = QuantumCircuit(1, 1)
+    with pytest.raises(ValueError):
+        _ = to_qir_module(circuit, condition_lowering="unrolled")
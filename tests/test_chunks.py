@@ -0,0 +1,96 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import re
+
+import pytest
+from qiskit import QuantumCircuit
+from qiskit.circuit import Parameter
+
+from qiskit_qir.translate import to_qir_module
+
+import test_utils
+
+
+def _qis_calls(module):
+    return sorted(re.findall(r"call void @__quantum__qis__\w+\(.*\)", str(module)))
+
+
+def _functions(module):
+    return {function.name: function for function in module.functions}
+
+
+def _circuit(num_gates):
+    circuit = QuantumCircuit(3, 3, name="chunked")
+    for n in range(num_gates):
+        circuit.h(n % 3)
+        circuit.cx(n % 3, (n + 1) % 3)
+    circuit.measure([0, 1, 2], [0, 1, 2])
+    return circuit
+
+
+def test_body_is_split_into_chunks():
+    circuit = _circuit(10)
+    module, entry_points = to_qir_module(circuit, chunk_size=7)
+    assert module.verify() is None
+    functions = _functions(module)
+    chunks = [f"chunked__chunk{index}" for index in range(4)]
+    assert all(name in functions for name in chunks)
+    assert "chunked__chunk4" not in functions
+
+    body = test_utils.get_entry_point_body(str(module).splitlines())
+    assert [line for line in body if "__chunk" in line] == [
+        f"call void @{name}()" for name in chunks
+    ]
+    assert len(re.findall(r"call void @__quantum__qis__", str(functions[chunks[0]])))
+    assert _qis_calls(module) == _qis_calls(to_qir_module(circuit)[0])
+    # Output is still recorded in the entry point after the last chunk
+    assert body.index(f"call void @{chunks[-1]}()") < body.index(
+        test_utils.array_record_output_string(3)
+    )
+
+
+def test_chunks_receive_the_entry_point_arguments():
+    theta = Parameter("theta")
+    circuit = QuantumCircuit(1, name="parameterized")
+    circuit.rx(theta, 0)
+    circuit.h(0)
+    circuit.rx(2 * theta, 0)
+    module, _ = to_qir_module(circuit, chunk_size=2, record_output=False)
+    assert module.verify() is None
+    functions = _functions(module)
+    assert "call void @parameterized__chunk0(double %0)" in str(
+        functions["parameterized"]
+    )
+    assert "call void @__quantum__qis__rx__body(double %0," in str(
+        functions["parameterized__chunk0"]
+    )
+    assert "double 2.000000e+00, double %0" in str(functions["parameterized__chunk1"])
+
+
+def test_conditions_and_measurements_across_chunks(teleport):
+    module, _ = to_qir_module(teleport, chunk_size=2)
+    assert module.verify() is None
+    assert _qis_calls(module) == _qis_calls(to_qir_module(teleport)[0])
+    reused = QuantumCircuit(1, 1)
+    reused.measure(0, 0)
+    reused.h(0)
+    with pytest.raises(Exception, match="Qubit was used after being measured"):
+        to_qir_module(reused, "BasicExecution", chunk_size=1)
+
+
+def test_deduplicated_bodies_are_chunked():
+    circuits = [_circuit(4), _circuit(4).copy("copy")]
+    module, entry_points = to_qir_module(
+        circuits, chunk_size=5, deduplicate_circuits=True
+    )
+    assert module.verify() is None
+    functions = _functions(module)
+    assert "chunked__body__chunk2" in functions
+    assert "chunked__body__chunk0" in str(functions["chunked__body"])
+
+
+def test_invalid_chunk_size():
+    with pytest.raises(ValueError):
+        to_qir_module(_circuit(1), chunk_size=0)
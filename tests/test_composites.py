@@ -0,0 +1,171 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import sys
+
+import pytest
+from qiskit import QuantumCircuit
+from qiskit.circuit import Gate, Instruction
+
+from qiskit_qir.elements import QiskitModule
+from qiskit_qir.ir import OPCODES, CircuitIR
+from qiskit_qir.resources import estimate_resources
+from qiskit_qir.translate import to_qir_module
+from qiskit_qir.visitor import BasicQisVisitor
+
+import test_utils
+
+
+def _gate(definition: QuantumCircuit) -> Gate:
+    # Setting the definition directly avoids the copies made by
+    # to_instruction, which recurse through every nesting level.
+    gate = Gate(definition.name, definition.num_qubits, [])
+    gate.definition = definition
+    return gate
+
+
+def _gate_with_clbits(definition: QuantumCircuit) -> Instruction:
+    instruction = Instruction(
+        definition.name, definition.num_qubits, definition.num_clbits, []
+    )
+    instruction.definition = definition
+    return instruction
+
+
+def _nested(depth: int) -> Gate:
+    # Every level applies the level below with its two qubits swapped
+    circuit = QuantumCircuit(2, name="level0")
+    circuit.x(0)
+    gate = _gate(circuit)
+    for level in range(1, depth):
+        circuit = QuantumCircuit(2, name=f"level{level}")
+        circuit.append(gate, [1, 0])
+        gate = _gate(circuit)
+    return gate
+
+
+def _flatten(target, circuit, qubits, clbits):
+    # Reference expansion in program order, unlike decompose which reorders
+    # commuting instructions
+    for instruction in circuit.data:
+        mapped_qubits = [
+            qubits[circuit.find_bit(bit).index] for bit in instruction.qubits
+        ]
+        mapped_clbits = [
+            clbits[circuit.find_bit(bit).index] for bit in instruction.clbits
+        ]
+        if instruction.operation.name in ("block", "oracle"):
+            _flatten(
+                target, instruction.operation.definition, mapped_qubits, mapped_clbits
+            )
+        else:
+            target.append(instruction.operation, mapped_qubits, mapped_clbits)
+
+
+def test_nesting_deeper_than_the_recursion_limit():
+    depth = 3 * sys.getrecursionlimit()
+    circuit = QuantumCircuit(2)
+    circuit.append(_nested(depth), [0, 1])
+    module, _ = to_qir_module(circuit, record_output=False)
+    body = test_utils.get_entry_point_body(str(module).splitlines())
+    assert test_utils.single_op_call_string("x", (depth - 1) % 2) in body
+    (estimate,) = estimate_resources(circuit)
+    assert estimate.gate_counts == {"x": 1}
+
+
+def test_deep_nesting_is_built_without_recursion():
+    depth = 3 * sys.getrecursionlimit()
+    circuit = QuantumCircuit(2)
+    circuit.append(_nested(depth), [0, 1])
+    ir = CircuitIR.from_circuit(circuit)
+    assert ir.opcodes.tolist() == [OPCODES["x"]]
+    assert ir.qubits.tolist() == [[(depth - 1) % 2, -1, -1]]
+
+
+def test_conditions_inside_composites_are_built():
+    inner = QuantumCircuit(2, 2, name="inner")
+    inner.measure(0, 0)
+    inner.x(1).c_if(inner.clbits[0], True)
+    outer = QuantumCircuit(2, 2, name="outer")
+    outer.append(_gate_with_clbits(inner), [0, 1], [0, 1])
+    circuit = QuantumCircuit(2, 2)
+    circuit.append(_gate_with_clbits(outer), [1, 0], [1, 0])
+    ir = CircuitIR.from_circuit(circuit)
+    assert ir.opcodes.tolist() == [OPCODES["mz"], OPCODES["x"]]
+    assert ir.clbits.tolist() == [1, -1]
+    assert ir.conditions.tolist() == [-1, 0]
+    assert ir.condition_bits.tolist() == [1]
+
+
+def test_max_expansion_depth():
+    circuit = QuantumCircuit(2)
+    circuit.append(_nested(5), [0, 1])
+    to_qir_module(circuit, max_expansion_depth=5)
+    with pytest.raises(ValueError, match="maximum expansion depth of 4"):
+        to_qir_module(circuit, max_expansion_depth=4)
+    with pytest.raises(ValueError, match="maximum expansion depth of 4"):
+        estimate_resources(circuit, max_expansion_depth=4)
+    with pytest.raises(ValueError):
+        to_qir_module(circuit, max_expansion_depth=0)
+
+
+def test_cached_expansions_check_the_depth_where_they_are_used():
+    inner = _nested(3)
+    circuit = QuantumCircuit(2)
+    circuit.append(inner, [0, 1])
+    wrapper = QuantumCircuit(2, name="wrapper")
+    wrapper.append(inner, [0, 1])
+    circuit.append(_gate(wrapper), [1, 0])
+    with pytest.raises(ValueError, match="maximum expansion depth of 3"):
+        to_qir_module(circuit, max_expansion_depth=3)
+
+
+def test_expansion_matches_the_flattened_circuit():
+    oracle = QuantumCircuit(3, 1, name="oracle")
+    oracle.h(0)
+    oracle.ccx(0, 1, 2)
+    oracle.rz(0.5, 2)
+    oracle.measure(2, 0)
+    block = QuantumCircuit(3, 2, name="block")
+    block.append(oracle.to_instruction(), [2, 0, 1], [1])
+    block.cx(0, 1)
+    block.append(oracle.to_instruction(), [0, 1, 2], [0])
+
+    circuit = QuantumCircuit(4, 2)
+    circuit.append(block.to_instruction(), [3, 1, 0], [1, 0])
+    circuit.append(block.to_instruction(), [0, 1, 2], [0, 1])
+    flattened = QuantumCircuit(4, 2, name=circuit.name)
+    _flatten(flattened, circuit, flattened.qubits, flattened.clbits)
+
+    assert str(to_qir_module(circuit)[0]) == str(to_qir_module(flattened)[0])
+
+
+def test_each_definition_is_expanded_once():
+    oracle = QuantumCircuit(2, name="oracle")
+    oracle.cx(0, 1)
+    oracle_gate = _gate(oracle)
+    block = QuantumCircuit(2, name="block")
+    block.append(oracle_gate, [0, 1])
+    block.append(oracle_gate, [1, 0])
+    block_gate = _gate(block)
+    circuit = QuantumCircuit(3)
+    for qubits in [[0, 1], [1, 2], [2, 0]]:
+        circuit.append(block_gate, qubits)
+
+    module = QiskitModule.from_quantum_circuit(circuit=circuit)
+    visitor = BasicQisVisitor()
+    module.accept(visitor)
+    assert len(visitor._expansions) == 2
+    assert visitor.ir().count("call void @__quantum__qis__cnot__body") == 6
+
+
+def test_wrong_arity_is_reported():
+    definition = QuantumCircuit(2, name="pair")
+    definition.cx(0, 1)
+    instruction = Instruction("pair", 3, 0, [])
+    instruction.definition = definition
+    circuit = QuantumCircuit(3)
+    circuit.append(instruction, [0, 1, 2])
+    with pytest.raises(ValueError, match="wrong number of qubits"):
+        to_qir_module(circuit)
@@ -0,0 +1,125 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+from qiskit_qir.passes import defer_measurements
+from qiskit_qir.translate import to_qir_module
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Statevector
+import pytest
+
+import test_utils
+
+
+def _names(circuit):
+    return [
+        (
+            instruction.operation.name,
+            [circuit.find_bit(q).index for q in instruction.qubits],
+        )
+        for instruction in circuit.data
+    ]
+
+
+def test_terminal_measurements_move_to_the_end():
+    circuit = QuantumCircuit(3, 3)
+    circuit.h(0)
+    circuit.measure(0, 0)
+    circuit.cx(1, 2)
+    circuit.measure(1, 1)
+    circuit.barrier()
+    circuit.h(2)
+    circuit.measure(2, 2)
+    assert _names(defer_measurements(circuit)) == [
+        ("h", [0]),
+        ("cx", [1, 2]),
+        ("barrier", [0, 1, 2]),
+        ("h", [2]),
+        ("measure", [0]),
+        ("measure", [1]),
+        ("measure", [2]),
+    ]
+
+
+def test_measurements_in_use_stay_in_place():
+    circuit = QuantumCircuit(2, 2)
+    circuit.measure(0, 0)
+    circuit.x(0)
+    circuit.measure(1, 1)
+    circuit.h(0).c_if(circuit.clbits[1], 1)
+    circuit.h(1)
+    circuit.measure(0, 0)
+    deferred = defer_measurements(circuit)
+    assert _names(deferred) == [
+        ("measure", [0]),
+        ("x", [0]),
+        ("measure", [1]),
+        ("h", [0]),
+        ("h", [1]),
+        ("measure", [0]),
+    ]
+    assert deferred is circuit
+
+
+def test_measurements_into_the_same_clbit_keep_their_order():
+    circuit = QuantumCircuit(2, 1)
+    circuit.measure(0, 0)
+    circuit.h(1)
+    circuit.measure(1, 0)
+    circuit.h(0)
+    deferred = defer_measurements(circuit)
+    assert _names(deferred) == [
+        ("measure", [0]),
+        ("h", [1]),
+        ("h", [0]),
+        ("measure", [1]),
+    ]
+
+
+def test_composite_instructions_block_deferral():
+    inner = QuantumCircuit(1, 1, name="inner")
+    inner.measure(0, 0)
+    circuit = QuantumCircuit(2, 2)
+    circuit.measure(0, 0)
+    circuit.append(inner.to_instruction(), [1], [0])
+    circuit.h(1)
+    assert defer_measurements(circuit) is circuit
+
+
+def test_deferral_preserves_the_state_before_measurement():
+    circuit = QuantumCircuit(3, 3)
+    circuit.h(0)
+    circuit.measure(0, 0)
+    circuit.cx(1, 2)
+    circuit.ry(0.3, 1)
+    circuit.measure(1, 1)
+    circuit.h(2)
+    deferred = defer_measurements(circuit)
+    assert Statevector(deferred.remove_final_measurements(inplace=False)).equiv(
+        Statevector(circuit.remove_final_measurements(inplace=False))
+    )
+
+
+@pytest.mark.parametrize("profile", ["BasicExecution", "AdaptiveExecution"])
+def test_readouts_are_emitted_together(profile):
+    circuit = QuantumCircuit(3, 3, name="readout")
+    circuit.h(0)
+    circuit.measure(0, 0)
+    circuit.cx(1, 2)
+    circuit.measure(1, 1)
+    circuit.h(2)
+    circuit.measure(2, 2)
+    module, _ = to_qir_module(circuit, profile, defer_measurements=True)
+    calls = test_utils.get_entry_point_body(str(module).splitlines())
+    measurements = [index for index, call in enumerate(calls) if "__mz__" in call]
+    assert measurements == list(range(measurements[0], measurements[0] + 3))
+    assert "record_output" in calls[measurements[-1] + 1]
+
+
+def test_deferral_is_off_by_default():
+    circuit = QuantumCircuit(2, 1)
+    circuit.measure(0, 0)
+    circuit.h(1)
+    module, _ = to_qir_module(circuit)
+    calls = test_utils.get_entry_point_body(str(module).splitlines())
+    assert "__mz__" in calls[1]
@@ -0,0 +1,161 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import subprocess
+import sys
+
+from qiskit_qir.fingerprint import circuit_fingerprint
+from qiskit_qir.translate import to_qir_module
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
+from qiskit.circuit import Gate, Parameter
+
+
+def _circuit(name="circuit", angle=0.5):
+    circuit = QuantumCircuit(3, 2, name=name)
+    circuit.h(0)
+    circuit.rx(angle, 1)
+    circuit.cx(0, 2)
+    circuit.measure([0, 1], [0, 1])
+    return circuit
+
+
+def test_fingerprint_is_128_bits_and_ignores_the_name():
+    fingerprint = circuit_fingerprint(_circuit())
+    assert len(fingerprint) == 16
+    assert circuit_fingerprint(_circuit("other")) == fingerprint
+
+
+def test_fingerprint_is_stable_across_processes():
+    script = (
+        "from qiskit import QuantumCircuit\n"
+        "from qiskit_qir.fingerprint import circuit_fingerprint\n"
+        "circuit = QuantumCircuit(3, 2)\n"
+        "circuit.h(0)\n"
+        "circuit.rx(0.5, 1)\n"
+        "circuit.cx(0, 2)\n"
+        "circuit.measure([0, 1], [0, 1])\n"
+        "print(circuit_fingerprint(circuit).hex())\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert output == circuit_fingerprint(_circuit()).hex()
+
+
+def _variants():
+    base = _circuit()
+    yield base.copy()
+    yield _circuit(angle=0.25)
+    circuit = _circuit()
+    circuit.cx(2, 0)
+    yield circuit
+    circuit = QuantumCircuit(3, 2)
+    circuit.h(0)
+    circuit.rx(0.5, 1)
+    circuit.cx(0, 1)
+    circuit.measure([0, 1], [0, 1])
+    yield circuit
+    circuit = QuantumCircuit(3, 2)
+    circuit.h(0)
+    circuit.rx(0.5, 1)
+    circuit.cx(0, 2)
+    circuit.measure([0, 1], [1, 0])
+    yield circuit
+    circuit = _circuit()
+    circuit.x(2).c_if(circuit.cregs[0], 1)
+    yield circuit
+    circuit = _circuit()
+    circuit.x(2).c_if(circuit.cregs[0], 2)
+    yield circuit
+    circuit = QuantumCircuit(
+        QuantumRegister(3), ClassicalRegister(1), ClassicalRegister(1)
+    )
+    circuit.h(0)
+    circuit.rx(0.5, 1)
+    circuit.cx(0, 2)
+    circuit.measure([0, 1], [0, 1])
+    yield circuit
+
+
+def test_structural_changes_change_the_fingerprint():
+    fingerprints = [circuit_fingerprint(circuit) for circuit in _variants()]
+    assert fingerprints[0] == circuit_fingerprint(_circuit())
+    assert len(set(fingerprints[1:])) == len(fingerprints) - 1
+    assert fingerprints[0] not in fingerprints[1:]
+
+
+def test_parameter_precision():
+    a = circuit_fingerprint(_circuit(angle=0.5))
+    b = circuit_fingerprint(_circuit(angle=0.5 + 1e-12))
+    assert a != b
+    assert circuit_fingerprint(_circuit(angle=0.5), decimals=9) == circuit_fingerprint(
+        _circuit(angle=0.5 + 1e-12), decimals=9
+    )
+    assert circuit_fingerprint(_circuit(angle=0.0)) == circuit_fingerprint(
+        _circuit(angle=-0.0)
+    )
+
+
+def test_unbound_parameters():
+    theta = Parameter("theta")
+    phi = Parameter("phi")
+    assert circuit_fingerprint(_circuit(angle=theta)) == circuit_fingerprint(
+        _circuit(angle=theta)
+    )
+    assert circuit_fingerprint(_circuit(angle=theta)) != circuit_fingerprint(
+        _circuit(angle=phi)
+    )
+
+
+def test_options_are_covered():
+    circuit = _circuit()
+    assert circuit_fingerprint(circuit, record_output=True) == circuit_fingerprint(
+        circuit, record_output=True
+    )
+    assert circuit_fingerprint(circuit, record_output=False) != circuit_fingerprint(
+        circuit, record_output=True
+    )
+    assert circuit_fingerprint(circuit) != circuit_fingerprint(
+        circuit, record_output=True
+    )
+
+
+def test_composite_definitions_are_covered():
+    def composite(gate):
+        inner = QuantumCircuit(2, name="oracle")
+        getattr(inner, gate)(0, 1)
+        circuit = QuantumCircuit(2)
+        circuit.append(inner.to_gate(), [0, 1])
+        circuit.append(inner.to_gate(), [1, 0])
+        return circuit
+
+    assert circuit_fingerprint(composite("cx")) == circuit_fingerprint(composite("cx"))
+    assert circuit_fingerprint(composite("cx")) != circuit_fingerprint(composite("cz"))
+
+
+def _nested(depth: int) -> QuantumCircuit:
+    # Every level applies the level below with its two qubits swapped. The
+    # definitions are set directly, to_gate would copy them recursively.
+    circuit = QuantumCircuit(2, name="level0")
+    circuit.x(0)
+    for level in range(1, depth):
+        gate = Gate(circuit.name, 2, [])
+        gate.definition = circuit
+        circuit = QuantumCircuit(2, name=f"level{level}")
+        circuit.append(gate, [1, 0])
+    return circuit
+
+
+def test_nesting_deeper_than_the_recursion_limit():
+    depth = 3 * sys.getrecursionlimit()
+    fingerprint = circuit_fingerprint(_nested(depth))
+    assert fingerprint == circuit_fingerprint(_nested(depth))
+    assert fingerprint != circuit_fingerprint(_nested(depth + 1))
+    module, entry_points, report = to_qir_module(
+        [_nested(depth), _nested(depth)],
+        deduplicate_circuits=True,
+        entry_point_metadata=True,
+        return_report=True,
+    )
+    assert report.num_deduplicated == 1
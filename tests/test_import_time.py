@@ -0,0 +1,66 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import subprocess
+import sys
+
+import pytest
+
+
+def _modules_loaded_by(statement: str):
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"{statement}\nimport sys\nprint('\\n'.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(completed.stdout.splitlines())
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import qiskit_qir",
+        "from qiskit_qir.capability import Capability",
+        "from qiskit_qir.elements import QiskitModule",
+    ],
+)
+def test_import_does_not_load_qiskit_or_pyqir(statement):
+    modules = _modules_loaded_by(statement)
+    assert "qiskit" not in modules
+    assert "pyqir" not in modules
+
+
+def test_public_api_is_resolved_on_first_access():
+    modules = _modules_loaded_by(
+        "import qiskit_qir\nassert callable(qiskit_qir.to_qir_module)"
+    )
+    assert "qiskit_qir.translate" in modules
+    assert "pyqir" in modules
+
+
+def test_translation_does_not_load_optional_stages():
+    modules = _modules_loaded_by("from qiskit_qir.translate import to_qir_module")
+    for stage in ["fingerprint", "memory", "passes", "preflight", "resources"]:
+        assert f"qiskit_qir.{stage}" not in modules
+
+
+def test_submodules_are_reachable_as_attributes():
+    modules = _modules_loaded_by(
+        "import qiskit_qir\n"
+        "assert 'cx' in qiskit_qir.visitor.SUPPORTED_INSTRUCTIONS\n"
+        "assert callable(qiskit_qir.translate.to_qir_module)"
+    )
+    assert "qiskit_qir.visitor" in modules
+
+
+def test_missing_attributes_raise_attribute_error():
+    import qiskit_qir
+
+    with pytest.raises(AttributeError, match="no attribute 'unknown'"):
+        qiskit_qir.unknown
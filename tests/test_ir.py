@@ -0,0 +1,154 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import pickle
+
+import numpy as np
+
+from qiskit_qir.capability import Capability, CapabilityError
+from qiskit_qir.ir import OPCODES, CircuitIR
+from qiskit_qir.translate import to_qir_module
+from qiskit import QuantumCircuit
+from qiskit.circuit import Gate, Parameter
+from pyqir import Context, qir_module
+import pytest
+
+from test_circuits import core_tests, noop_tests
+
+
+def _functions(module):
+    return {function.name: str(function) for function in module.functions}
+
+
+@pytest.mark.parametrize("circuit_name", core_tests + noop_tests)
+def test_emission_matches_visitor(circuit_name, request):
+    circuit = request.getfixturevalue(circuit_name)
+    expected, _ = to_qir_module(circuit)
+    module = qir_module(Context(), circuit.name)
+    assert CircuitIR.from_circuit(circuit).emit(module) == circuit.name
+    assert module.verify() is None
+    assert _functions(module) == _functions(expected)
+
+
+def test_rows_are_lowered_and_expanded():
+    inner = QuantumCircuit(2, 1, name="inner")
+    inner.cy(0, 1)
+    inner.measure(1, 0)
+    circuit = QuantumCircuit(3, 2)
+    circuit.append(inner.to_instruction(), [2, 0], [1])
+    circuit.delay(10, 0)
+    circuit.rx(0.5, 1)
+    ir = CircuitIR.from_circuit(circuit)
+    assert ir.opcodes.tolist() == [
+        OPCODES[name] for name in ["sdg", "cx", "s", "mz", "rx"]
+    ]
+    assert ir.qubits.tolist() == [
+        [0, -1, -1],
+        [2, 0, -1],
+        [0, -1, -1],
+        [0, -1, -1],
+        [1, -1, -1],
+    ]
+    assert ir.clbits.tolist() == [-1, -1, -1, 1, -1]
+    assert ir.angles[-1] == 0.5 and np.isnan(ir.angles[:-1]).all()
+    assert ir.sources.tolist() == [0, 0, 0, 0, 2]
+
+
+def test_conditions_are_shared():
+    circuit = QuantumCircuit(2, 2)
+    circuit.measure([0, 1], [0, 1])
+    circuit.x(0).c_if(circuit.cregs[0], 2)
+    circuit.z(1).c_if(circuit.cregs[0], 2)
+    circuit.h(1).c_if(circuit.clbits[0], True)
+    ir = CircuitIR.from_circuit(circuit)
+    assert ir.conditions.tolist() == [-1, -1, 0, 0, 1]
+    assert ir.condition_offsets.tolist() == [0, 2, 3]
+    assert ir.condition_bits.tolist() == [0, 1, 0]
+    assert ir.condition_values.tolist() == [0, 1, 1]
+
+
+def test_unbound_parameters_and_unknown_gates_are_rejected():
+    circuit = QuantumCircuit(1)
+    circuit.rx(Parameter("theta"), 0)
+    with pytest.raises(ValueError):
+        CircuitIR.from_circuit(circuit)
+
+    circuit = QuantumCircuit(1)
+    circuit.append(Gate("opaque", 1, []), [0])
+    with pytest.raises(ValueError):
+        CircuitIR.from_circuit(circuit)
+
+
+def test_violations_match_profile():
+    circuit = QuantumCircuit(2, 1)
+    circuit.measure(0, 0)
+    circuit.barrier()
+    circuit.x(1)
+    circuit.cx(1, 0)
+    circuit.x(1).c_if(circuit.clbits[0], 1)
+    ir = CircuitIR.from_circuit(circuit)
+    assert ir.violations(Capability.ALL) == []
+    assert ir.violations(Capability.NONE) == [
+        (3, Capability.QUBIT_USE_AFTER_MEASUREMENT),
+        (4, Capability.CONDITIONAL_BRANCHING_ON_RESULT),
+    ]
+    with pytest.raises(CapabilityError):
+        ir.emit(qir_module(Context(), "test"), "BasicExecution")
+
+
+def test_peephole_cancels_and_merges():
+    circuit = QuantumCircuit(2, 1)
+    circuit.h(0)
+    circuit.x(1)
+    circuit.h(0)
+    circuit.s(1)
+    circuit.sdg(1)
+    circuit.x(1)
+    circuit.rz(0.25, 0)
+    circuit.rz(-0.25, 0)
+    circuit.cx(0, 1)
+    circuit.barrier()
+    circuit.cx(0, 1)
+    circuit.ry(0.5, 1)
+    circuit.ry(0.25, 1)
+    circuit.measure(1, 0)
+    circuit.ry(0.5, 1)
+    ir = CircuitIR.from_circuit(circuit).peephole()
+    assert ir.opcodes.tolist() == [
+        OPCODES[name] for name in ["cx", "barrier", "cx", "ry", "mz", "ry"]
+    ]
+    assert ir.angles[3] == 0.75
+
+
+def test_peephole_keeps_conditioned_gates():
+    circuit = QuantumCircuit(1, 1)
+    circuit.x(0)
+    circuit.x(0).c_if(circuit.clbits[0], 1)
+    assert len(CircuitIR.from_circuit(circuit).peephole()) == 2
+
+
+def test_serialisation_round_trip(request):
+    circuit = request.getfixturevalue("teleport")
+    ir = CircuitIR.from_circuit(circuit)
+    for copy in (CircuitIR.from_bytes(ir.to_bytes()), pickle.loads(pickle.dumps(ir))):
+        assert copy.name == ir.name
+        assert copy.reg_sizes == ir.reg_sizes
+        assert copy.digest() == ir.digest()
+        module = qir_module(Context(), "test")
+        copy.emit(module)
+        assert module.verify() is None
+
+
+def test_digest_is_structural():
+    def circuit(name, angle):
+        circuit = QuantumCircuit(2, 2, name=name)
+        circuit.rx(angle, 0)
+        circuit.cx(0, 1)
+        circuit.measure([0, 1], [0, 1])
+        return circuit
+
+    digest = CircuitIR.from_circuit(circuit("a", 0.5)).digest()
+    assert len(digest) == 16
+    assert CircuitIR.from_circuit(circuit("b", 0.5)).digest() == digest
+    assert CircuitIR.from_circuit(circuit("a", 0.25)).digest() != digest
@@ -0,0 +1,95 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import random
+
+from qiskit_qir.capability import QubitUseAfterMeasurementError
+from qiskit_qir.lowering import LOWERINGS
+from qiskit_qir.translate import to_qir_module
+from qiskit import QuantumCircuit
+from qiskit.circuit import Parameter
+from qiskit.circuit.library import (
+    CU1Gate,
+    U1Gate,
+    U2Gate,
+    U3Gate,
+    get_standard_gate_name_mapping,
+)
+from qiskit.quantum_info import Operator
+import pytest
+
+import test_utils
+
+# gate class and number of parameters of gates outside the standard mapping
+_legacy_gates = {
+    "u1": (U1Gate, 1),
+    "u2": (U2Gate, 2),
+    "u3": (U3Gate, 3),
+    "cu1": (CU1Gate, 1),
+}
+
+
+def _gate(name: str, params):
+    if name in _legacy_gates:
+        return _legacy_gates[name][0](*params)
+    return get_standard_gate_name_mapping()[name].base_class(*params)
+
+
+def _num_params(name: str) -> int:
+    if name in _legacy_gates:
+        return _legacy_gates[name][1]
+    return len(get_standard_gate_name_mapping()[name].params)
+
+
+@pytest.mark.parametrize("name", sorted(LOWERINGS))
+def test_lowering_matches_gate_up_to_global_phase(name):
+    rng = random.Random(name)
+    params = [rng.uniform(-3, 3) for _ in range(_num_params(name))]
+    gate = _gate(name, params)
+
+    reference = QuantumCircuit(gate.num_qubits)
+    reference.append(gate, range(gate.num_qubits))
+    lowered = QuantumCircuit(gate.num_qubits)
+    for step, indices, angle in LOWERINGS[name]:
+        if angle is None:
+            getattr(lowered, step)(*indices)
+        else:
+            getattr(lowered, step)(angle(params), *indices)
+
+    assert Operator(reference).equiv(Operator(lowered))
+
+
+def test_lowered_gates_are_emitted_without_transpiling():
+    circuit = QuantumCircuit(2)
+    circuit.name = "test_lowered_gates_are_emitted_without_transpiling"
+    circuit.sx(0)
+    circuit.cy(0, 1)
+    generated_qir = str(to_qir_module(circuit)[0]).splitlines()
+
+    func = test_utils.get_entry_point_body(generated_qir)
+    assert func[0] == test_utils.initialize_call_string()
+    assert func[1] == (
+        "call void @__quantum__qis__rx__body(double 0x3FF921FB54442D18, %Qubit* null)"
+    )
+    assert func[2] == test_utils.adj_op_call_string("s", 1)
+    assert func[3] == test_utils.double_op_call_string("cnot", 0, 1)
+    assert func[4] == test_utils.single_op_call_string("s", 1)
+    assert func[5] == test_utils.return_string()
+    assert len(func) == 6
+
+
+def test_lowered_gates_accept_unbound_parameters():
+    theta = Parameter("θ")
+    circuit = QuantumCircuit(2)
+    circuit.crz(theta, 0, 1)
+    ir = str(to_qir_module(circuit)[0])
+    assert ir.count("call double @llvm.fmuladd.f64") == 2
+
+
+def test_lowered_gates_are_checked_for_qubit_use_after_measurement():
+    circuit = QuantumCircuit(1, 1)
+    circuit.measure(0, 0)
+    circuit.sx(0)
+    with pytest.raises(QubitUseAfterMeasurementError):
+        _ = to_qir_module(circuit, "BasicExecution")
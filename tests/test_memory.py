@@ -0,0 +1,59 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import tracemalloc
+
+import pytest
+from qiskit import QuantumCircuit
+
+from qiskit_qir.translate import to_qir_module
+
+
+def _circuit(name, num_gates=3000):
+    circuit = QuantumCircuit(5, 5, name=name)
+    for i in range(num_gates):
+        circuit.rz(0.001 * i, i % 5)
+    circuit.measure(range(5), range(5))
+    return circuit
+
+
+def test_memory_is_reported_per_phase_and_circuit():
+    circuits = [_circuit("first"), _circuit("second", 10)]
+    _, _, report = to_qir_module(
+        circuits, memory_profile=True, entry_point_metadata=True, return_report=True
+    )
+    assert [usage.name for usage in report.memory] == ["prepare", "metadata", "verify"]
+    assert [usage.name for usage in report.circuit_memory] == ["first", "second"]
+    first, second = report.circuit_memory
+    # Every distinct angle is kept as a constant for the rest of the module
+    assert first.retained > second.retained
+    assert first.peak >= first.retained > 0
+    assert not tracemalloc.is_tracing()
+
+
+def test_memory_is_not_reported_by_default():
+    _, _, report = to_qir_module(_circuit("circuit"), return_report=True)
+    assert report.memory == []
+    assert report.circuit_memory == []
+
+
+def test_tracing_started_elsewhere_keeps_running():
+    tracemalloc.start()
+    try:
+        _, _, report = to_qir_module(
+            _circuit("circuit"), memory_profile=True, return_report=True
+        )
+        assert len(report.circuit_memory) == 1
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_tracing_stops_on_errors():
+    circuit = QuantumCircuit(1, 1)
+    circuit.measure(0, 0)
+    circuit.h(0)
+    with pytest.raises(Exception):
+        to_qir_module(circuit, "BasicExecution", memory_profile=True)
+    assert not tracemalloc.is_tracing()
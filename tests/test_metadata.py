@@ -0,0 +1,103 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import pytest
+from qiskit import QuantumCircuit
+from qiskit.circuit import Gate
+
+from qiskit_qir.fingerprint import circuit_fingerprint
+from qiskit_qir.translate import to_qir_module
+
+_GATE_TIMES = {"h": 1.0, "x": 1.0, "cx": 2.0, "mz": 5.0}
+
+
+def _attributes(module, name):
+    function = next(f for f in module.functions if f.name == name)
+    return {
+        attribute.string_kind: attribute.string_value
+        for attribute in function.attributes.func
+    }
+
+
+def _circuit(name="circuit"):
+    circuit = QuantumCircuit(3, 2, name=name)
+    circuit.h(0)
+    circuit.cx(0, 1)
+    circuit.x(2)
+    circuit.measure([0, 1], [0, 1])
+    circuit.x(2).c_if(circuit.cregs[0], 3)
+    return circuit
+
+
+def test_metadata_is_attached_and_reported():
+    circuit = _circuit()
+    module, entry_points, report = to_qir_module(
+        circuit, entry_point_metadata=True, gate_times=_GATE_TIMES, return_report=True
+    )
+    metadata = report.entry_point_metadata[entry_points[0]]
+    assert metadata == {
+        "gate_counts": {"h": 1, "cx": 1, "x": 2, "mz": 2},
+        "two_qubit_gate_count": 1,
+        "measurement_count": 2,
+        "branch_count": 2,
+        "structural_hash": circuit_fingerprint(circuit).hex(),
+        # h, cx, mz on qubit 1, then the conditioned x
+        "estimated_duration": 9.0,
+    }
+    attributes = _attributes(module, entry_points[0])
+    assert attributes["gate_counts"] == "cx:1,h:1,mz:2,x:2"
+    assert attributes["two_qubit_gate_count"] == "1"
+    assert attributes["measurement_count"] == "2"
+    assert attributes["branch_count"] == "2"
+    assert attributes["structural_hash"] == metadata["structural_hash"]
+    assert attributes["estimated_duration"] == "9.0"
+    assert attributes["required_num_qubits"] == "3"
+
+
+def test_duration_is_left_out_without_gate_times():
+    module, entry_points, report = to_qir_module(
+        _circuit(), entry_point_metadata=True, return_report=True
+    )
+    assert "estimated_duration" not in report.entry_point_metadata[entry_points[0]]
+    assert "estimated_duration" not in _attributes(module, entry_points[0])
+
+
+def test_metadata_of_deduplicated_entry_points():
+    circuits = [_circuit("first"), _circuit("second")]
+    module, entry_points, report = to_qir_module(
+        circuits,
+        entry_point_metadata=True,
+        deduplicate_circuits=True,
+        return_report=True,
+    )
+    assert report.num_deduplicated == 1
+    assert entry_points == ["first", "second"]
+    for name in entry_points:
+        assert _attributes(module, name)["gate_counts"] == "cx:1,h:1,mz:2,x:2"
+    assert report.entry_point_metadata["first"] == report.entry_point_metadata["second"]
+
+
+def test_metadata_is_off_by_default():
+    module, entry_points, report = to_qir_module(_circuit(), return_report=True)
+    assert report.entry_point_metadata == {}
+    assert "gate_counts" not in _attributes(module, entry_points[0])
+
+
+def test_missing_gate_time():
+    with pytest.raises(ValueError, match="No gate time given for x"):
+        to_qir_module(
+            _circuit(), entry_point_metadata=True, gate_times={"h": 1.0, "cx": 1.0}
+        )
+
+
+def test_missing_gate_time_fails_before_emitting():
+    unsupported = QuantumCircuit(1, name="unsupported")
+    unsupported.append(Gate("opaque", 1, []), [0])
+    # Emitting the second circuit would fail on its gate instead
+    with pytest.raises(ValueError, match="No gate time given for mz"):
+        to_qir_module(
+            [_circuit(), unsupported],
+            entry_point_metadata=True,
+            gate_times={"h": 1.0, "x": 1.0, "cx": 2.0},
+        )
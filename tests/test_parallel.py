@@ -0,0 +1,184 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import gc
+import random
+import sys
+
+from qiskit_qir.capability import QubitUseAfterMeasurementError
+from qiskit_qir.parallel import (
+    estimate_cost,
+    schedule,
+    translate_parallel,
+    translate_threaded,
+)
+from qiskit_qir.translate import to_qir_module
+from qiskit import QuantumCircuit
+from qiskit.circuit import Gate
+from qiskit.circuit.random import random_circuit
+from pyqir import Context, Module, is_entry_point
+import pytest
+
+
+def _line(name: str, num_gates: int) -> QuantumCircuit:
+    circuit = QuantumCircuit(2, 1, name=name)
+    for _ in range(num_gates):
+        circuit.h(0)
+    circuit.measure(0, 0)
+    return circuit
+
+
+def test_estimate_cost_expands_composite_instructions():
+    inner = QuantumCircuit(2, name="inner")
+    inner.h(0)
+    inner.cx(0, 1)
+    inner.h(1)
+    outer = QuantumCircuit(2, name="outer")
+    outer.append(inner.to_gate(), [0, 1])
+    outer.append(inner.to_gate(), [1, 0])
+    circuit = QuantumCircuit(3)
+    circuit.h(2)
+    circuit.append(outer.to_gate(), [0, 1])
+    circuit.append(outer.to_gate(), [2, 1])
+    assert estimate_cost(circuit) == 13
+    assert estimate_cost(_line("line", 4)) == 5
+
+
+def test_estimate_cost_tells_custom_gates_with_the_same_name_apart():
+    small = QuantumCircuit(1, name="g")
+    small.x(0)
+    large = QuantumCircuit(1, name="g")
+    for _ in range(1000):
+        large.x(0)
+    circuit = QuantumCircuit(1)
+    circuit.append(small.to_gate(), [0])
+    circuit.append(large.to_gate(), [0])
+    assert estimate_cost(circuit) == 1001
+    reversed_circuit = QuantumCircuit(1)
+    reversed_circuit.append(large.to_gate(), [0])
+    reversed_circuit.append(small.to_gate(), [0])
+    assert estimate_cost(reversed_circuit) == 1001
+
+
+def test_estimate_cost_of_deep_nesting():
+    depth = 3 * sys.getrecursionlimit()
+    circuit = QuantumCircuit(1, name="level0")
+    circuit.x(0)
+    for level in range(1, depth):
+        gate = Gate(circuit.name, 1, [])
+        gate.definition = circuit
+        circuit = QuantumCircuit(1, name=f"level{level}")
+        circuit.append(gate, [0])
+        circuit.append(gate, [0])
+    assert estimate_cost(circuit) == 2 ** (depth - 1)
+
+
+def test_estimate_cost_of_standard_gates_with_definitions():
+    single = QuantumCircuit(2)
+    single.csx(0, 1)
+    # h, the expansion of cu1 and h
+    assert estimate_cost(single) > 2
+    circuit = QuantumCircuit(2)
+    circuit.csx(0, 1)
+    circuit.csx(1, 0)
+    assert estimate_cost(circuit) == 2 * estimate_cost(single)
+
+
+def test_schedule_assigns_longest_first():
+    assignment = schedule([1, 8, 3, 7, 2, 5], 2)
+    assert assignment == [[1, 2, 4], [3, 5, 0]]
+    assert sorted(i for indices in assignment for i in indices) == list(range(6))
+
+
+def test_schedule_requires_a_worker():
+    with pytest.raises(ValueError):
+        _ = schedule([1], 0)
+
+
+def test_translate_parallel_streams_results_in_input_order():
+    circuits = [_line(f"circuit_{i}", 10 * (i % 3) + 1) for i in range(6)]
+    translation = translate_parallel(circuits, num_workers=2, record_output=False)
+    assert len(translation) == 6
+    entry_points = []
+    for bitcode, names in translation:
+        mod = Module.from_bitcode(Context(), bitcode)
+        assert [f.name for f in filter(is_entry_point, mod.functions)] == names
+        entry_points.extend(names)
+    assert entry_points == [circuit.name for circuit in circuits]
+
+    stats = translation.worker_stats
+    assert len(stats) == 2
+    assert sum(s.num_circuits for s in stats) == 6
+    assert all(s.completed == s.num_circuits for s in stats)
+    assert sum(s.estimated_cost for s in stats) == sum(translation.costs)
+    assert all(0.0 < s.utilisation <= 1.0 for s in stats)
+
+
+def test_translate_parallel_rejects_invalid_input():
+    with pytest.raises(ValueError):
+        _ = translate_parallel([])
+    with pytest.raises(ValueError):
+        _ = translate_parallel([QuantumCircuit(1), 2])
+
+
+def test_translate_threaded_matches_serial_translation(monkeypatch):
+    # pyqir objects released on another thread than the one that created
+    # them are reported through sys.unraisablehook
+    unraisable = []
+    monkeypatch.setattr(sys, "unraisablehook", unraisable.append)
+    random.seed(7)
+    circuits = []
+    for i in range(48):
+        circuit = random_circuit(
+            random.randint(2, 6), random.randint(2, 12), measure=True, seed=i
+        )
+        circuit.name = f"random_{i}"
+        circuits.append(circuit)
+    teleport = QuantumCircuit(3, 2, name="conditional")
+    teleport.h(1)
+    teleport.cx(1, 2)
+    teleport.measure([0, 1], [0, 1])
+    teleport.x(2).c_if(teleport.clbits[1], 1)
+    teleport.z(2).c_if(teleport.cregs[0], 1)
+    circuits.append(teleport)
+    # Every circuit is also translated concurrently with itself
+    circuits += circuits
+    # Bitcode does not keep the order of block predecessors in the IR text
+    expected = [
+        str(Module.from_bitcode(Context(), to_qir_module(c)[0].bitcode, c.name))
+        for c in circuits
+    ]
+
+    for _ in range(3):
+        results = translate_threaded(circuits, num_threads=8)
+        assert len(results) == len(circuits)
+        for (bitcode, names), circuit, ir in zip(results, circuits, expected):
+            assert names == [circuit.name]
+            module = Module.from_bitcode(Context(), bitcode, circuit.name)
+            assert str(module) == ir
+    gc.collect()
+    assert unraisable == []
+
+
+def test_translate_threaded_errors_are_raised(monkeypatch):
+    unraisable = []
+    monkeypatch.setattr(sys, "unraisablehook", unraisable.append)
+    circuit = QuantumCircuit(1, 1)
+    circuit.measure(0, 0)
+    circuit.x(0)
+    with pytest.raises(QubitUseAfterMeasurementError):
+        _ = translate_threaded([circuit] * 4, "BasicExecution", num_threads=2)
+    gc.collect()
+    assert unraisable == []
+
+
+def test_translate_threaded_options_and_input():
+    circuits = [_line(f"circuit_{i}", i + 1) for i in range(4)]
+    results = translate_threaded(circuits, num_threads=2, return_report=True)
+    assert [names for _, names, _ in results] == [[c.name] for c in circuits]
+    assert all(report.num_circuits == 1 for _, _, report in results)
+    with pytest.raises(ValueError):
+        _ = translate_threaded([])
+    with pytest.raises(ValueError):
+        _ = translate_threaded(circuits, context=Context())
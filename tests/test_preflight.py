@@ -0,0 +1,109 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import pytest
+from qiskit import QuantumCircuit
+from qiskit.circuit import Gate
+
+from qiskit_qir.capability import ConditionalBranchingOnResultError
+from qiskit_qir.preflight import BatchValidationError, validate_batch
+from qiskit_qir.translate import to_qir_module
+
+
+def _bell(name):
+    circuit = QuantumCircuit(2, 2, name=name)
+    circuit.h(0)
+    circuit.cx(0, 1)
+    circuit.measure([0, 1], [0, 1])
+    return circuit
+
+
+def _unsupported(name):
+    circuit = QuantumCircuit(1, name=name)
+    circuit.append(Gate("opaque", 1, []), [0])
+    return circuit
+
+
+def _unsupported_composite(name):
+    inner = QuantumCircuit(1)
+    inner.h(0)
+    inner.append(Gate("opaque", 1, []), [0])
+    gate = Gate("wrapped", 1, [])
+    gate.definition = inner
+    circuit = QuantumCircuit(1, name=name)
+    circuit.append(gate, [0])
+    return circuit
+
+
+def _conditioned(name, value):
+    circuit = QuantumCircuit(1, 2, name=name)
+    circuit.measure(0, 0)
+    circuit.x(0).c_if(circuit.cregs[0], value)
+    return circuit
+
+
+def test_valid_batch_passes():
+    validate_batch([_bell("a"), _bell("b"), _conditioned("c", 3)])
+
+
+def test_errors_are_reported_with_circuit_indices():
+    circuits = [
+        _bell("a"),
+        _unsupported("b"),
+        _bell("c"),
+        _unsupported_composite("d"),
+        _conditioned("e", 4),
+        _bell("a"),
+    ]
+    with pytest.raises(BatchValidationError) as info:
+        validate_batch(circuits)
+    errors = info.value.errors
+    assert [index for index, _ in errors] == [1, 3, 4]
+    assert "Gate opaque is not supported" in str(errors[0][1])
+    assert "Gate opaque is not supported" in str(errors[1][1])
+    assert "larger than register width 2" in str(errors[2][1])
+    message = str(info.value)
+    assert message.startswith("3 circuit(s) cannot be translated")
+    assert "circuit 3: Gate opaque is not supported" in message
+
+
+def test_capability_errors_keep_their_type():
+    with pytest.raises(BatchValidationError) as info:
+        validate_batch([_bell("a"), _conditioned("b", 1)], "BasicExecution")
+    ((index, error),) = info.value.errors
+    assert index == 1
+    assert isinstance(error, ConditionalBranchingOnResultError)
+
+
+def test_invalid_options_are_raised_directly():
+    with pytest.raises(ValueError, match="Condition lowering") as info:
+        validate_batch([_bell("a")], condition_lowering="unknown")
+    assert not isinstance(info.value, BatchValidationError)
+
+
+def test_gate_times_are_only_checked_for_metadata():
+    validate_batch([_bell("a")], gate_times={"h": 1.0})
+    with pytest.raises(BatchValidationError, match="No gate time given for cx"):
+        validate_batch([_bell("a")], gate_times={"h": 1.0}, entry_point_metadata=True)
+
+
+def test_translation_fails_before_emitting():
+    circuits = [_bell("a"), _unsupported("b")]
+    with pytest.raises(BatchValidationError):
+        to_qir_module(circuits, preflight=True)
+
+
+def test_preflight_does_not_change_translation():
+    circuits = [_bell("a"), _conditioned("b", 1)]
+    module, entry_points = to_qir_module(circuits, preflight=True)
+    expected, expected_entry_points = to_qir_module(circuits)
+    assert entry_points == expected_entry_points
+    assert str(module) == str(expected)
+
+
+def test_circuits_may_share_names():
+    circuits = [_bell("sweep"), _bell("sweep"), _bell("sweep")]
+    validate_batch(circuits)
+    _, entry_points = to_qir_module(circuits, preflight=True)
+    assert entry_points == ["sweep", "sweep.1", "sweep.2"]
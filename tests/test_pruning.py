@@ -0,0 +1,71 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+from qiskit_qir.translate import to_qir_module
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
+
+import test_utils
+
+
+def test_idle_qubits_and_unused_registers_are_pruned():
+    circuit = QuantumCircuit(5, 0)
+    circuit.name = "test_idle_qubits_and_unused_registers_are_pruned"
+    unused = ClassicalRegister(3, "unused")
+    used = ClassicalRegister(2, "used")
+    circuit.add_register(unused)
+    circuit.add_register(used)
+    circuit.h(1)
+    circuit.cx(1, 3)
+    circuit.barrier()
+    circuit.measure([1, 3], [used[1], used[0]])
+
+    module, _, report = to_qir_module(circuit, prune_unused=True, return_report=True)
+    generated_qir = str(module).splitlines()
+
+    test_utils.check_attributes(generated_qir, 2, 2)
+    func = test_utils.get_entry_point_body(generated_qir)
+
+    assert func[0] == test_utils.initialize_call_string()
+    assert func[1] == test_utils.single_op_call_string("h", 0)
+    assert func[2] == test_utils.double_op_call_string("cnot", 0, 1)
+    assert func[3] == test_utils.measure_call_string("mz", 1, 0)
+    assert func[4] == test_utils.measure_call_string("mz", 0, 1)
+    assert func[5] == test_utils.array_record_output_string(2)
+    assert func[6] == test_utils.result_record_output_string(1)
+    assert func[7] == test_utils.result_record_output_string(0)
+    assert func[8] == test_utils.return_string()
+    assert len(func) == 9
+
+    assert report.qubit_maps == [{1: 0, 3: 1}]
+    assert report.result_maps == [{3: 0, 4: 1}]
+
+
+def test_registers_with_any_active_bit_are_kept_whole():
+    qr = QuantumRegister(2, "q")
+    cr = ClassicalRegister(3, "c")
+    cond = ClassicalRegister(1, "cond")
+    circuit = QuantumCircuit(qr, cr, cond)
+    circuit.name = "test_registers_with_any_active_bit_are_kept_whole"
+    circuit.x(1).c_if(cond[0], 1)
+
+    module, _, report = to_qir_module(circuit, prune_unused=True, return_report=True)
+    generated_qir = str(module).splitlines()
+
+    test_utils.check_attributes(generated_qir, 1, 1)
+    assert report.qubit_maps == [{1: 0}]
+    assert report.result_maps == [{3: 0}]
+
+
+def test_pruning_is_disabled_by_default():
+    circuit = QuantumCircuit(4, 2)
+    circuit.name = "test_pruning_is_disabled_by_default"
+    circuit.h(3)
+
+    module, _, report = to_qir_module(circuit, return_report=True)
+    generated_qir = str(module).splitlines()
+
+    test_utils.check_attributes(generated_qir, 4, 2)
+    func = test_utils.get_entry_point_body(generated_qir)
+    assert func[1] == test_utils.single_op_call_string("h", 3)
+    assert report.qubit_maps == [{}]
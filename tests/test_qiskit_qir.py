@@ -157,3 +157,68 @@ def test_measurement(circuit_name, request):
     assert func[3] == test_utils.result_record_output_string(0)
     assert func[4] == test_utils.return_string()
     assert len(func) == 5
+
+
+@pytest.mark.parametrize("circuit_name", core_tests + noop_tests)
+def test_fused_translation_matches_element_dispatch(circuit_name, request):
+    circuit = request.getfixturevalue(circuit_name)
+    fused = QiskitModule.from_quantum_circuit(circuit=circuit)
+    fused_visitor = BasicQisVisitor()
+    fused.accept(fused_visitor)
+
+    dispatched = QiskitModule.from_quantum_circuit(circuit=circuit)
+    _ = dispatched.elements
+    dispatched_visitor = BasicQisVisitor()
+    dispatched.accept(dispatched_visitor)
+
+    assert fused_visitor.ir() == dispatched_visitor.ir()
+
+
+def test_visit_instruction_overrides_see_every_instruction(request):
+    class CountingVisitor(BasicQisVisitor):
+        def __init__(self):
+            super().__init__()
+            self.names = []
+
+        def visit_instruction(self, instruction, qargs, cargs, skip_condition=False):
+            if not skip_condition:
+                self.names.append(instruction.name)
+            super().visit_instruction(instruction, qargs, cargs, skip_condition)
+
+    circuit = request.getfixturevalue("teleport")
+    module = QiskitModule.from_quantum_circuit(circuit=circuit)
+    visitor = CountingVisitor()
+    module.accept(visitor)
+    assert visitor.names == [instruction.name for instruction, _, _ in circuit.data]
+
+
+def test_plain_visitors_are_dispatched_elements(request):
+    class PlainVisitor:
+        def __init__(self):
+            self.events = []
+
+        def visit_qiskit_module(self, module):
+            self.events.append(("module", module.name))
+
+        def visit_register(self, register):
+            self.events.append(("register", register.name))
+
+        def visit_instruction(self, instruction, qargs, cargs):
+            self.events.append(("instruction", instruction.name))
+
+        def record_output(self, module):
+            self.events.append(("output", module.name))
+
+        def finalize(self):
+            self.events.append(("finalize",))
+
+    circuit = request.getfixturevalue("teleport")
+    module = QiskitModule.from_quantum_circuit(circuit=circuit)
+    visitor = PlainVisitor()
+    module.accept(visitor)
+    assert visitor.events == (
+        [("module", circuit.name)]
+        + [("register", r.name) for r in circuit.qregs + circuit.cregs]
+        + [("instruction", instruction.name) for instruction, _, _ in circuit.data]
+        + [("output", circuit.name), ("finalize",)]
+    )
@@ -0,0 +1,65 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+from qiskit_qir.translate import to_qir_module
+from qiskit import QuantumCircuit
+import pytest
+
+import test_utils
+
+
+def test_measured_qubits_hand_over_their_ids():
+    circuit = QuantumCircuit(3, 3)
+    circuit.name = "test_measured_qubits_hand_over_their_ids"
+    circuit.h(0)
+    circuit.measure(0, 0)
+    circuit.barrier()
+    circuit.x(1)
+    circuit.measure(1, 1)
+    circuit.reset(1)
+    circuit.h(2)
+    circuit.measure(2, 2)
+
+    module, _, report = to_qir_module(circuit, reuse_qubits=True, return_report=True)
+    generated_qir = str(module).splitlines()
+
+    test_utils.check_attributes(generated_qir, 1, 3)
+    func = test_utils.get_entry_point_body(generated_qir)
+
+    assert func[0] == test_utils.initialize_call_string()
+    assert func[1] == test_utils.single_op_call_string("h", 0)
+    assert func[2] == test_utils.measure_call_string("mz", 0, 0)
+    assert func[3] == test_utils.single_op_call_string("reset", 0)
+    assert func[4] == test_utils.single_op_call_string("x", 0)
+    assert func[5] == test_utils.measure_call_string("mz", 1, 0)
+    assert func[6] == test_utils.single_op_call_string("reset", 0)
+    # the reset of qubit 1 already returned the id to |0>
+    assert func[7] == test_utils.single_op_call_string("h", 0)
+    assert func[8] == test_utils.measure_call_string("mz", 2, 0)
+    assert report.qubit_maps == [{0: 0, 1: 0, 2: 0}]
+
+
+def test_overlapping_qubits_are_not_reused():
+    circuit = QuantumCircuit(3, 3)
+    circuit.name = "test_overlapping_qubits_are_not_reused"
+    circuit.h(0)
+    circuit.cx(0, 1)
+    circuit.measure(0, 0)
+    circuit.cx(1, 2)
+    circuit.measure([1, 2], [1, 2])
+
+    module, _, report = to_qir_module(circuit, reuse_qubits=True, return_report=True)
+    generated_qir = str(module).splitlines()
+
+    test_utils.check_attributes(generated_qir, 2, 3)
+    func = test_utils.get_entry_point_body(generated_qir)
+    assert func[4] == test_utils.single_op_call_string("reset", 0)
+    assert func[5] == test_utils.double_op_call_string("cnot", 1, 0)
+    assert report.qubit_maps == [{0: 0, 1: 1, 2: 0}]
+
+
+def test_qubit_reuse_requires_use_after_measurement():
+    circuit = QuantumCircuit(2, 2)
+    with pytest.raises(ValueError):
+        _ = to_qir_module(circuit, "BasicExecution", reuse_qubits=True)
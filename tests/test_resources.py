@@ -0,0 +1,175 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import re
+from collections import Counter
+
+import pyqir
+import pytest
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
+from qiskit.circuit import Parameter
+
+import qiskit_qir.visitor
+from qiskit_qir.capability import (
+    ConditionalBranchingOnResultError,
+    QubitUseAfterMeasurementError,
+)
+from qiskit_qir.resources import estimate_resources
+from qiskit_qir.translate import to_qir_module
+import test_circuits
+import test_utils
+
+_ADJOINTS = {"s": "sdg", "t": "tdg"}
+_QIS_NAMES = {"cnot": "cx"}
+
+
+def _translated_resources(circuit, profile="AdaptiveExecution", **kwargs):
+    module, _ = to_qir_module(circuit, profile, **kwargs)
+    entry = test_utils.get_entry_point(module)
+    counts = Counter()
+    for name, functor in re.findall(
+        r"call void @__quantum__qis__(\w+?)__(body|adj)\(", str(entry)
+    ):
+        if functor == "adj":
+            name = _ADJOINTS[name]
+        name = _QIS_NAMES.get(name, name)
+        if name != "barrier":
+            counts[name] += 1
+    attributes = {
+        attribute.string_kind: attribute.string_value
+        for attribute in entry.attributes.func
+    }
+    return (
+        dict(counts),
+        len(entry.basic_blocks),
+        int(attributes["required_num_qubits"]),
+        int(attributes["required_num_results"]),
+    )
+
+
+def _check(circuit, profile="AdaptiveExecution", **kwargs):
+    (estimate,) = estimate_resources(circuit, profile, **kwargs)
+    assert (
+        estimate.gate_counts,
+        estimate.blocks,
+        estimate.num_qubits,
+        estimate.num_results,
+    ) == _translated_resources(circuit, profile, **kwargs)
+    return estimate
+
+
+@pytest.mark.parametrize("circuit_name", test_circuits.core_tests)
+def test_estimate_matches_translation(circuit_name, request):
+    circuit = request.getfixturevalue(circuit_name)
+    _check(circuit)
+
+
+def test_gate_counts_and_depth():
+    circuit = QuantumCircuit(3, 3)
+    circuit.h(0)
+    circuit.t(0)
+    circuit.tdg(1)
+    circuit.cx(0, 1)
+    circuit.ccx(0, 1, 2)
+    circuit.swap(1, 2)
+    circuit.cz(0, 2)
+    circuit.barrier()
+    circuit.id(2)
+    circuit.measure([0, 1, 2], [0, 1, 2])
+    estimate = _check(circuit)
+    assert estimate.t_count == 2
+    assert estimate.two_qubit_gate_count == 3
+    assert estimate.num_gates == 12
+    # h, t, cx, ccx, swap, cz, x, x, mz on qubit 2
+    assert estimate.depth == 9
+
+
+def test_lowered_gates_and_dropped_rotations_are_counted_as_emitted():
+    circuit = QuantumCircuit(2)
+    circuit.cp(0.5, 0, 1)
+    circuit.rz(2 * 3.141592653589793, 0)
+    circuit.rx(0.25, 1)
+    exact = _check(circuit)
+    rounded = _check(circuit, angle_precision=1e-9)
+    assert rounded.gate_counts["rz"] == exact.gate_counts["rz"] - 1
+
+
+@pytest.mark.parametrize("condition_lowering", ["nested", "compare"])
+def test_branches_match_condition_lowering(condition_lowering):
+    circuit = QuantumCircuit(2, 2)
+    circuit.h(0)
+    circuit.measure([0, 1], [0, 1])
+    circuit.x(0).c_if(circuit.cregs[0], 2)
+    circuit.z(1).c_if(circuit.cregs[0], 1)
+    circuit.y(1).c_if(circuit.clbits[0], 0)
+    estimate = _check(circuit, condition_lowering=condition_lowering)
+    assert estimate.branches == (5 if condition_lowering == "nested" else 3)
+    # The conditioned gates wait for the measurements they read
+    assert estimate.depth == 4
+
+
+def test_pruned_and_reused_qubits():
+    circuit = QuantumCircuit(QuantumRegister(4), ClassicalRegister(2))
+    circuit.add_register(ClassicalRegister(3))
+    circuit.h(0)
+    circuit.measure(0, 0)
+    circuit.h(2)
+    circuit.measure(2, 1)
+    circuit.barrier()
+    estimate = _check(circuit, prune_unused=True)
+    assert (estimate.num_qubits, estimate.num_results) == (2, 2)
+    estimate = _check(circuit, reuse_qubits=True)
+    assert estimate.num_qubits == 1
+    assert estimate.gate_counts["reset"] == 1
+
+
+def test_composite_instructions_and_parameters():
+    theta = Parameter("theta")
+    inner = QuantumCircuit(2, 1, name="inner")
+    inner.rx(theta, 0)
+    inner.cx(0, 1)
+    inner.measure(1, 0)
+    circuit = QuantumCircuit(3, 2)
+    circuit.append(inner.to_instruction(), [2, 0], [1])
+    circuit.append(inner.to_instruction(), [0, 1], [0])
+    _check(circuit)
+
+
+def test_deferred_measurements():
+    circuit = QuantumCircuit(2, 2)
+    circuit.h(0)
+    circuit.measure(0, 0)
+    circuit.h(1)
+    circuit.cx(1, 0)
+    circuit.measure(1, 1)
+    with pytest.raises(QubitUseAfterMeasurementError):
+        estimate_resources(circuit, "BasicExecution", defer_measurements=True)
+    circuit.data.pop(3)
+    estimate = _check(circuit, "BasicExecution", defer_measurements=True)
+    assert estimate.depth == 2
+
+
+def test_profile_errors_match_translation(teleport):
+    with pytest.raises(ConditionalBranchingOnResultError):
+        estimate_resources(teleport, "BasicExecution")
+    with pytest.raises(ValueError):
+        estimate_resources([])
+    with pytest.raises(ValueError):
+        estimate_resources(teleport, condition_lowering="unknown")
+
+
+def test_estimate_creates_no_pyqir_objects(monkeypatch, teleport):
+    expected = _translated_resources(teleport)[0]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("pyqir object created")
+
+    for name in ["qubit", "result", "const", "Context", "Builder", "qir_module"]:
+        monkeypatch.setattr(pyqir, name, fail)
+        if hasattr(qiskit_qir.visitor.pyqir, name):
+            monkeypatch.setattr(qiskit_qir.visitor.pyqir, name, fail)
+    for name in ["Builder", "BasicBlock", "const"]:
+        monkeypatch.setattr(qiskit_qir.visitor, name, fail)
+    (estimate,) = estimate_resources(teleport)
+    assert estimate.gate_counts == expected
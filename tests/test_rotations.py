@@ -0,0 +1,69 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import math
+
+from qiskit_qir.elements import QiskitModule
+from qiskit_qir.translate import to_qir_module
+from qiskit_qir.visitor import BasicQisVisitor
+from qiskit import QuantumCircuit
+import pytest
+
+import test_utils
+
+
+def test_repeated_angles_are_interned():
+    circuit = QuantumCircuit(2)
+    for _ in range(10):
+        circuit.rx(0.5, 0)
+        circuit.rz(0.25, 1)
+        circuit.ry(0.5, 1)
+    module = QiskitModule.from_quantum_circuit(circuit=circuit)
+    visitor = BasicQisVisitor()
+    module.accept(visitor)
+    assert sorted(visitor._angles) == [0.25, 0.5]
+
+
+def test_angles_are_snapped_to_precision():
+    circuit = QuantumCircuit(1)
+    circuit.name = "test_angles_are_snapped_to_precision"
+    circuit.rx(0.5000001, 0)
+    circuit.rz(0.4999999, 0)
+    generated_qir = str(to_qir_module(circuit, angle_precision=1e-3)[0]).splitlines()
+
+    func = test_utils.get_entry_point_body(generated_qir)
+    assert func[1] == test_utils.rotation_call_string("rx", 0.5, 0)
+    assert func[2] == test_utils.rotation_call_string("rz", 0.5, 0)
+    assert len(func) == 4
+
+
+def test_full_turns_are_dropped_with_precision():
+    circuit = QuantumCircuit(1)
+    circuit.name = "test_full_turns_are_dropped_with_precision"
+    circuit.rx(2 * math.pi, 0)
+    circuit.ry(-4 * math.pi + 1e-12, 0)
+    circuit.rz(0.0, 0)
+    circuit.rz(math.pi, 0)
+    generated_qir = str(to_qir_module(circuit, angle_precision=1e-9)[0]).splitlines()
+
+    func = test_utils.get_entry_point_body(generated_qir)
+    assert func[0] == test_utils.initialize_call_string()
+    assert func[1].startswith("call void @__quantum__qis__rz__body(double 0x400921FB")
+    assert func[2] == test_utils.return_string()
+    assert len(func) == 3
+
+
+def test_full_turns_are_kept_without_precision():
+    circuit = QuantumCircuit(1)
+    circuit.rx(2 * math.pi, 0)
+    generated_qir = str(to_qir_module(circuit)[0]).splitlines()
+
+    func = test_utils.get_entry_point_body(generated_qir)
+    assert len(func) == 3
+
+
+@pytest.mark.parametrize("precision", [0, -1e-3])
+def test_invalid_precision_raises_value_error(precision):
+    with pytest.raises(ValueError):
+        _ = to_qir_module(QuantumCircuit(1), angle_precision=precision)
@@ -0,0 +1,115 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+from qiskit_qir.capability import QubitUseAfterMeasurementError
+from qiskit_qir.session import TranslationSession
+from qiskit_qir.translate import to_qir_module
+from qiskit import ClassicalRegister, QuantumCircuit
+import pytest
+
+
+def _calls(module, name):
+    function = next(f for f in module.functions if f.name == name)
+    return [
+        str(instruction).strip()
+        for block in function.basic_blocks
+        for instruction in block.instructions
+        if not str(instruction).strip().startswith("br ")
+    ]
+
+
+def _append_layer(circuit, layer):
+    for qubit in range(circuit.num_qubits):
+        circuit.rx(0.1 * (layer + 1), qubit)
+    for qubit in range(circuit.num_qubits - 1):
+        circuit.cx(qubit, qubit + 1)
+
+
+def test_session_matches_full_translation():
+    circuit = QuantumCircuit(3, 3, name="layers")
+    session = TranslationSession(circuit)
+    for layer in range(3):
+        _append_layer(circuit, layer)
+        assert session.update() == 5
+        module, entry_points = session.result()
+        assert entry_points == ["layers"]
+        assert module.verify() is None
+        expected, _ = to_qir_module(circuit)
+        assert _calls(module, "layers") == _calls(expected, "layers")
+    circuit.measure([0, 1, 2], [0, 1, 2])
+    module, _ = session.result()
+    assert module.verify() is None
+    expected, _ = to_qir_module(circuit)
+    assert _calls(module, "layers") == _calls(expected, "layers")
+
+
+def test_only_appended_instructions_are_translated():
+    circuit = QuantumCircuit(2)
+    circuit.h(0)
+    session = TranslationSession(circuit)
+    assert session.update() == 1
+    assert session.update() == 0
+    session.result()
+    session.result()
+    circuit.cx(0, 1)
+    circuit.h(1)
+    assert session.update() == 2
+    assert session.num_translated == 3
+    module, _ = session.result()
+    assert module.verify() is None
+
+
+def test_conditions_across_updates():
+    circuit = QuantumCircuit(2, 2, name="adaptive")
+    circuit.h(0)
+    circuit.measure(0, 0)
+    session = TranslationSession(circuit)
+    session.result()
+    circuit.x(1).c_if(circuit.clbits[0], 1)
+    circuit.measure(1, 1)
+    module, _ = session.result()
+    assert module.verify() is None
+    circuit.h(0).c_if(circuit.clbits[1], 0)
+    module, _ = session.result()
+    assert module.verify() is None
+    expected, _ = to_qir_module(circuit)
+    assert sorted(_calls(module, "adaptive")) == sorted(_calls(expected, "adaptive"))
+
+
+def test_layout_changes_restart_the_translation():
+    circuit = QuantumCircuit(1, 1)
+    circuit.h(0)
+    circuit.measure(0, 0)
+    session = TranslationSession(circuit)
+    session.result()
+    circuit.add_register(ClassicalRegister(1, "extra"))
+    circuit.measure(0, 1)
+    assert session.update() == 3
+    module, _ = session.result()
+    assert module.verify() is None
+    assert '"required_num_results"="2"' in str(module)
+
+
+def test_profile_checks_span_updates():
+    circuit = QuantumCircuit(1, 1)
+    circuit.measure(0, 0)
+    session = TranslationSession(circuit, "BasicExecution")
+    session.result()
+    circuit.x(0)
+    with pytest.raises(QubitUseAfterMeasurementError):
+        session.update()
+
+
+@pytest.mark.parametrize(
+    "option, value",
+    [
+        ("prune_unused", True),
+        ("reuse_qubits", True),
+        ("chunk_size", 2),
+        ("defer_measurements", True),
+    ],
+)
+def test_whole_circuit_options_are_rejected(option, value):
+    with pytest.raises(ValueError, match=f"Option {option} is not supported"):
+        TranslationSession(QuantumCircuit(1), **{option: value})
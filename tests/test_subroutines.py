@@ -0,0 +1,111 @@
+##
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT License.
+##
+import pytest
+from qiskit import QuantumCircuit
+from qiskit.circuit import Parameter
+
+from qiskit_qir.capability import QubitUseAfterMeasurementError
+from qiskit_qir.translate import to_qir_module
+
+import test_utils
+
+
+def _oracle(num_gates: int = 10):
+    oracle = QuantumCircuit(3, name="oracle")
+    for n in range(num_gates):
+        oracle.cx(n % 3, (n + 1) % 3)
+    return oracle.to_gate()
+
+
+def _subroutines(module):
+    return [
+        function
+        for function in module.functions
+        if function.name.startswith("oracle__") and function.basic_blocks
+    ]
+
+
+def _calls(function, name):
+    return str(function).count(f"call void @{name}(")
+
+
+def test_repeated_composite_is_emitted_once():
+    oracle = _oracle()
+    circuit = QuantumCircuit(4)
+    for n in range(100):
+        circuit.append(oracle, [n % 4, (n + 1) % 4, (n + 2) % 4])
+
+    module, _ = to_qir_module(circuit, composite_subroutines=True)
+    assert module.verify() is None
+    (subroutine,) = _subroutines(module)
+    entry = test_utils.get_entry_point(module)
+    assert _calls(entry, subroutine.name) == 100
+    assert _calls(entry, "__quantum__qis__cnot__body") == 0
+    assert _calls(subroutine, "__quantum__qis__cnot__body") == 10
+    assert "call void @__quantum__qis__cnot__body(%Qubit* %0, %Qubit* %1)" in str(
+        subroutine
+    )
+    assert (
+        f"call void @{subroutine.name}(%Qubit* inttoptr (i64 1 to %Qubit*), "
+        "%Qubit* inttoptr (i64 2 to %Qubit*), %Qubit* inttoptr (i64 3 to %Qubit*))"
+        in str(entry)
+    )
+
+    inlined, _ = to_qir_module(circuit)
+    assert len(str(module)) * 5 < len(str(inlined))
+
+
+def test_entry_points_share_subroutines():
+    circuits = []
+    for n in range(3):
+        circuit = QuantumCircuit(3, name=f"circuit{n}")
+        circuit.append(_oracle(), [n % 3, (n + 1) % 3, (n + 2) % 3])
+        circuits.append(circuit)
+    module, entry_points = to_qir_module(circuits, composite_subroutines=True)
+    assert module.verify() is None
+    (subroutine,) = _subroutines(module)
+    for function in module.functions:
+        if function.name in entry_points:
+            assert _calls(function, subroutine.name) == 1
+
+
+def test_small_and_unsupported_composites_are_inlined():
+    theta = Parameter("theta")
+    parameterized = QuantumCircuit(1, name="oracle")
+    for _ in range(10):
+        parameterized.rx(theta, 0)
+    measuring = QuantumCircuit(1, 1, name="oracle")
+    for _ in range(10):
+        measuring.h(0)
+    measuring.measure(0, 0)
+    circuit = QuantumCircuit(3, 1)
+    circuit.append(_oracle(3), [0, 1, 2])
+    circuit.append(parameterized.to_gate(), [0])
+    circuit.append(measuring.to_instruction(), [1], [0])
+
+    module, _ = to_qir_module(
+        circuit, composite_subroutines=True, subroutine_inline_threshold=3
+    )
+    assert _subroutines(module) == []
+    assert str(module) == str(to_qir_module(circuit)[0])
+
+
+def test_measured_qubits_are_checked_at_the_call():
+    circuit = QuantumCircuit(3, 1)
+    circuit.measure(0, 0)
+    circuit.append(_oracle(), [0, 1, 2])
+    with pytest.raises(QubitUseAfterMeasurementError):
+        to_qir_module(circuit, "BasicExecution", composite_subroutines=True)
+
+
+def test_different_options_emit_different_subroutines():
+    oracle = QuantumCircuit(1, name="oracle")
+    for _ in range(10):
+        oracle.rz(0.1234, 0)
+    circuit = QuantumCircuit(1)
+    circuit.append(oracle.to_gate(), [0])
+    exact, _ = to_qir_module(circuit, composite_subroutines=True)
+    rounded, _ = to_qir_module(circuit, composite_subroutines=True, angle_precision=0.5)
+    assert _subroutines(exact)[0].name != _subroutines(rounded)[0].name